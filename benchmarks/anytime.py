@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Profile how fast the solution quality approaches the known optimum.
+
+Every configuration of the :class:`~pants.Solver` solves xqf131 (optimum
+564) and pma343 (optimum 1368) once per seed on the same wall-clock budget.
+The lengths of the edges are rounded as by TSPLIB's ``EUC_2D``, which the
+optima refer to, and every improvement is logged with its wall time since
+the start of the run, its iteration and its gap to the optimum in percent.
+The runs are then aggregated into:
+
+``improvements.csv``
+    every logged improvement of every run
+``curves.csv``
+    the anytime curves: the mean, median, best and worst gap of the best
+    solution found by every point of a logarithmic time grid, over the runs
+    that have a solution by then
+``ttt.csv``
+    time-to-target statistics: for every target gap, how many runs reached
+    it and the least, median, mean and greatest time they took
+``anytime.json``
+    all of the above, with the settings and the environment
+
+A configuration is a name followed by keyword arguments of the
+:class:`~pants.Solver`, which makes it easy to compare modes or parameter
+sets on equal budgets::
+
+    python benchmarks/anytime.py --seeds 10 --time-limit 5 \\
+        --config as --config mmas:mode=mmas,rho=0.02 \\
+        --config acs:mode=acs,rho=0.1,q0=0.9 --output-dir profiles
+
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import numpy as np
+
+from pants import World, Solver
+from pants.datasets import load
+from pants.io import euc_2d
+
+from suite import environment
+
+#: The instances with a known optimum.
+DATASETS = ('xqf131', 'pma343')
+
+#: The configurations compared when none is given.
+CONFIGS = {
+    'as': {},
+    'mmas': {'mode': 'mmas', 'rho': 0.02},
+    'acs': {'mode': 'acs', 'rho': 0.1},
+}
+
+#: The gaps to the optimum, in percent, of the time-to-target statistics.
+TARGETS = (10, 5, 2, 1, 0.5, 0)
+
+
+def parse_config(text):
+    """Parse a ``name:key=value,...`` configuration.
+
+    Values are read as JSON where possible (numbers, ``true``, ``null``),
+    and as strings otherwise.
+
+    :return: the name and the keyword arguments of the solver
+    :rtype: tuple
+    """
+    name, _, options = text.partition(':')
+    kwargs = dict(CONFIGS.get(name, {}))
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        try:
+            kwargs[key] = json.loads(value)
+        except ValueError:
+            kwargs[key] = value
+    return name, kwargs
+
+
+def run(world, optimum, kwargs, seed, time_limit, limit):
+    """Solve the *world* once and log every improvement.
+
+    :return: the (seconds, iteration, distance, gap) of every improvement
+    :rtype: list
+    """
+    solver = Solver(seed=seed, time_limit=time_limit, limit=limit,
+                    target_length=optimum, **kwargs)
+    log = []
+    start = time.perf_counter()
+    try:
+        for ant in solver.solutions(world):
+            log.append((time.perf_counter() - start, solver.iteration,
+                        ant.distance, gap(ant.distance, optimum)))
+    finally:
+        solver.close()
+    return log
+
+
+def gap(distance, optimum):
+    return 100.0 * (distance - optimum) / optimum
+
+
+def best_at(log, seconds):
+    """Return the gap of the best solution of a run at *seconds*, or None
+    if it has none by then."""
+    found = None
+    for elapsed, _, _, value in log:
+        if elapsed > seconds:
+            break
+        found = value
+    return found
+
+
+def curve(logs, grid):
+    """Aggregate the anytime curves of the runs *logs* over the *grid*.
+
+    :rtype: list
+    """
+    rows = []
+    for seconds in grid:
+        gaps = [g for g in (best_at(log, seconds) for log in logs)
+                if g is not None]
+        row = {'seconds': seconds, 'runs': len(gaps)}
+        if gaps:
+            row.update(mean_gap=statistics.fmean(gaps),
+                       median_gap=statistics.median(gaps),
+                       best_gap=min(gaps), worst_gap=max(gaps))
+        rows.append(row)
+    return rows
+
+
+def time_to_target(logs, targets=TARGETS):
+    """Return how many runs reached every target gap, and how fast.
+
+    :rtype: list
+    """
+    rows = []
+    for target in targets:
+        times = []
+        for log in logs:
+            reached = [elapsed for elapsed, _, _, value in log
+                       if value <= target + 1e-9]
+            if reached:
+                times.append(reached[0])
+        row = {'target_gap': target, 'runs': len(logs), 'hits': len(times)}
+        if times:
+            row.update(min_s=min(times), median_s=statistics.median(times),
+                       mean_s=statistics.fmean(times), max_s=max(times))
+        rows.append(row)
+    return rows
+
+
+def write_csv(path, rows, fields):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fields, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS),
+                        choices=DATASETS,
+                        help='the instances to solve (default is all)')
+    parser.add_argument('--config', action='append', default=None,
+                        help='a configuration as name:key=value,... (may be '
+                             'repeated; default is {})'.format(
+                                 ', '.join(CONFIGS)))
+    parser.add_argument('--seeds', type=int, default=5,
+                        help='number of runs, with seeds 0, 1, ... '
+                             '(default=5)')
+    parser.add_argument('--time-limit', type=float, default=5.0,
+                        help='seconds per run (default=5)')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='iterations per run (default is no limit)')
+    parser.add_argument('--candidates', type=int, default=15,
+                        help='length of the candidate lists (default=15)')
+    parser.add_argument('--points', type=int, default=40,
+                        help='number of points of the curves (default=40)')
+    parser.add_argument('--output-dir', default='.',
+                        help='the directory of the results (default is the '
+                             'current directory)')
+    args = parser.parse_args(argv)
+
+    configs = [parse_config(text) for text in args.config or CONFIGS]
+    grid = np.geomspace(1e-3, args.time_limit, args.points).tolist()
+    limit = math.inf if args.limit is None else args.limit
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    improvements, curves, targets, results = [], [], [], []
+    for dataset in args.datasets:
+        data = load(dataset)
+        world = World(data.coords, metric=euc_2d, candidates=args.candidates,
+                      name=dataset)
+        for name, kwargs in configs:
+            logs = []
+            for seed in range(args.seeds):
+                print('{} {} seed {}...'.format(dataset, name, seed),
+                      file=sys.stderr)
+                log = run(world, data.optimum, kwargs, seed, args.time_limit,
+                          limit)
+                logs.append(log)
+                key = {'dataset': dataset, 'config': name, 'seed': seed}
+                improvements.extend(
+                    dict(key, seconds=s, iteration=i, distance=d, gap=g)
+                    for s, i, d, g in log)
+            key = {'dataset': dataset, 'config': name}
+            anytime = curve(logs, grid)
+            ttt = time_to_target(logs)
+            curves.extend(dict(key, **row) for row in anytime)
+            targets.extend(dict(key, **row) for row in ttt)
+            results.append(dict(key, optimum=data.optimum, solver=kwargs,
+                                final_gaps=[log[-1][3] if log else None
+                                            for log in logs],
+                                curve=anytime, time_to_target=ttt))
+
+    write_csv(os.path.join(args.output_dir, 'improvements.csv'), improvements,
+              ['dataset', 'config', 'seed', 'seconds', 'iteration',
+               'distance', 'gap'])
+    write_csv(os.path.join(args.output_dir, 'curves.csv'), curves,
+              ['dataset', 'config', 'seconds', 'runs', 'mean_gap',
+               'median_gap', 'best_gap', 'worst_gap'])
+    write_csv(os.path.join(args.output_dir, 'ttt.csv'), targets,
+              ['dataset', 'config', 'target_gap', 'runs', 'hits', 'min_s',
+               'median_s', 'mean_s', 'max_s'])
+    summary = environment()
+    summary.update(seeds=args.seeds, time_limit=args.time_limit,
+                   limit=args.limit, candidates=args.candidates,
+                   results=results)
+    with open(os.path.join(args.output_dir, 'anytime.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+        f.write('\n')
+
+    for result in results:
+        gaps = [g for g in result['final_gaps'] if g is not None]
+        print('{dataset:<8} {config:<10} final gap {mean:6.2f}% mean, '
+              '{best:6.2f}% best'.format(mean=statistics.fmean(gaps),
+                                         best=min(gaps), **result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
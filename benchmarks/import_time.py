@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure how long ``import pants`` takes in a fresh interpreter.
+
+Every sample imports Pants in a new process, so nothing is cached in
+``sys.modules``. The script fails if Pants imports a module that only the
+optional :mod:`pants.viz`, the worker processes or the profiler should
+need, or if the median import time exceeds ``--max-ms``::
+
+    python benchmarks/import_time.py --repeat 20 --max-ms 300 --json
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#: Modules that importing Pants must not import.
+FORBIDDEN = ('matplotlib', 'pandas', 'asyncio', 'multiprocessing',
+             'concurrent', 'cProfile', 'pstats', 'tracemalloc')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                  'modules': sorted({{m.split('.')[0] for m in sys.modules}})}}))
+'''
+
+
+def sample(module='pants'):
+    """Import *module* in a new interpreter.
+
+    :return: the seconds the import took and the top-level modules that were
+             imported by then
+    :rtype: dict
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [ROOT, env.get('PYTHONPATH')]))
+    output = subprocess.check_output(
+        [sys.executable, '-c', _PROBE.format(module=module)], env=env)
+    return json.loads(output)
+
+
+def measure(repeat=10, module='pants'):
+    """Import *module* *repeat* times, each in a new interpreter.
+
+    :return: the fastest and median import time in milliseconds, and the
+             forbidden modules that were imported
+    :rtype: dict
+    """
+    samples = [sample(module) for _ in range(repeat)]
+    times = [1000 * s['seconds'] for s in samples]
+    return {
+        'module': module,
+        'repeat': repeat,
+        'min_ms': min(times),
+        'median_ms': statistics.median(times),
+        'forbidden': sorted(set(FORBIDDEN) & set(samples[0]['modules'])),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='number of fresh interpreters (default=10)')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if the median import time is higher')
+    parser.add_argument('--json', action='store_true',
+                        help='print the result as JSON')
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print('import pants: {min_ms:.1f} ms fastest, {median_ms:.1f} ms '
+              'median of {repeat}'.format(**result))
+        if result['forbidden']:
+            print('imported: {}'.format(', '.join(result['forbidden'])))
+    failed = bool(result['forbidden'])
+    if args.max_ms is not None and result['median_ms'] > args.max_ms:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
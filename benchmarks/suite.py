@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Benchmark building worlds and solving iterations on the bundled datasets.
+
+Every case builds a world from a dataset and runs a few iterations of the
+Ant System, timing each phase on its own:
+
+``build_s``
+    creating the :class:`~pants.World` (the median of ``--repeat`` builds)
+``construct_s``
+    :func:`~pants.Solver.find_solutions`, the tour construction
+``evaporate_s``
+    :func:`~pants.Solver.evaporate_pheromone_matrix`
+``update_s``
+    :func:`~pants.Solver.global_update`, the pheromone deposit
+``choice_info_s``
+    :func:`~pants.Solver.update_choice_info`
+
+The per-iteration phases are the median over ``--iterations`` iterations.
+``peak_bytes`` is the peak memory allocated while building the world and
+running one iteration, as traced by :mod:`tracemalloc`, in a separate pass
+so that tracing does not slow down the timings. The time of ``import pants``
+is measured in fresh interpreters by ``import_time.py``.
+
+The cases are xqf131 and pma343, and samples of 1,000 and 10,000 cities of
+usa115475 drawn with a pinned seed; the 10,000 city sample is solved on a
+:class:`~pants.SparseWorld`. Results are written as JSON, which a later run
+can be compared against::
+
+    python benchmarks/suite.py --output before.json
+    # ... change something ...
+    python benchmarks/suite.py --output after.json --compare before.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from pants import World, SparseWorld, Solver
+from pants.datasets import load
+
+import import_time
+
+#: The seed of the usa115475 samples and of the solvers.
+SEED = 20150101
+
+#: The name, dataset, sample size (None for all nodes) and world of every
+#: case.
+CASES = [
+    ('xqf131', 'xqf131', None, 'dense'),
+    ('pma343', 'pma343', None, 'dense'),
+    ('usa1k', 'usa115475', 1000, 'dense'),
+    ('usa10k', 'usa115475', 10000, 'sparse'),
+]
+
+#: The metrics compared by ``--compare``, all of which should go down.
+METRICS = ('build_s', 'construct_s', 'evaporate_s', 'update_s',
+           'choice_info_s', 'peak_bytes', 'median_ms')
+
+
+def coordinates(dataset, size=None):
+    """Return the coordinates of a *dataset*, or of a sample of *size* of
+    its nodes drawn with the pinned :data:`SEED`.
+
+    :rtype: :class:`ndarray`
+    """
+    coords = load(dataset).coords
+    if size is None:
+        return coords
+    rng = np.random.default_rng(SEED)
+    return coords[np.sort(rng.choice(len(coords), size, replace=False))]
+
+
+def build(coords, kind, candidates):
+    if kind == 'sparse':
+        return SparseWorld(coords, candidates=candidates)
+    return World(coords, candidates=candidates)
+
+
+def iterate(solver, world):
+    """Run one iteration of the Ant System, phase by phase.
+
+    :return: the seconds taken by each phase
+    :rtype: dict
+    """
+    ants = solver.ants
+    times = {}
+    clock = time.perf_counter
+    solver.reset_colony(ants)
+    start = clock()
+    solver.find_solutions(ants)
+    times['construct_s'] = clock() - start
+    start = clock()
+    solver.evaporate_pheromone_matrix(world)
+    times['evaporate_s'] = clock() - start
+    start = clock()
+    solver.global_update(ants)
+    times['update_s'] = clock() - start
+    start = clock()
+    solver.update_choice_info(world)
+    times['choice_info_s'] = clock() - start
+    return times
+
+
+def run_case(name, dataset, size, kind, args):
+    coords = coordinates(dataset, size)
+    builds = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        world = build(coords, kind, args.candidates)
+        builds.append(time.perf_counter() - start)
+    solver = Solver(seed=SEED, ant_count=args.ants)
+    solver.initialize(world)
+    samples = [iterate(solver, world) for _ in range(args.iterations)]
+    result = {
+        'nodes': len(coords),
+        'world': type(world).__name__,
+        'candidates': args.candidates,
+        'ants': args.ants,
+        'iterations': args.iterations,
+        'build_s': statistics.median(builds),
+    }
+    for phase in samples[0]:
+        result[phase] = statistics.median(s[phase] for s in samples)
+    result['best_distance'] = float(min(solver.ants).distance)
+    solver.close()
+    del solver, world
+
+    tracemalloc.start()
+    world = build(coords, kind, args.candidates)
+    solver = Solver(seed=SEED, ant_count=args.ants)
+    solver.initialize(world)
+    iterate(solver, world)
+    result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    solver.close()
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'seed': SEED,
+    }
+
+
+def compare(result, baseline, tolerance):
+    """Print the ratio of every metric to the *baseline* and return the
+    metrics that grew by more than *tolerance*.
+
+    :rtype: list
+    """
+    regressions = []
+    cases = dict(result['cases'])
+    cases['import'] = result['import']
+    baselines = dict(baseline.get('cases', {}))
+    baselines['import'] = baseline.get('import')
+    for case, metrics in cases.items():
+        before = baselines.get(case)
+        if before is None:
+            continue
+        for metric in METRICS:
+            if not before.get(metric) or metric not in metrics:
+                continue
+            ratio = metrics[metric] / before[metric]
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = '  REGRESSION'
+                regressions.append((case, metric, ratio))
+            print('{:<8} {:<14} {:>7.2f}x{}'.format(case, metric, ratio, flag),
+                  file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', nargs='+', default=None,
+                        choices=[case[0] for case in CASES],
+                        help='the cases to run (default is all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of world builds (default=3)')
+    parser.add_argument('--iterations', type=int, default=5,
+                        help='number of iterations (default=5)')
+    parser.add_argument('--ants', type=int, default=20,
+                        help='number of ants (default=20)')
+    parser.add_argument('--candidates', type=int, default=15,
+                        help='length of the candidate lists (default=15)')
+    parser.add_argument('--import-repeat', type=int, default=5,
+                        help='number of fresh interpreters that import '
+                             'pants (default=5)')
+    parser.add_argument('--output', default=None,
+                        help='the JSON file to write (default is stdout)')
+    parser.add_argument('--compare', default=None,
+                        help='a JSON file of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='the relative growth of a metric that counts '
+                             'as a regression (default=0.2)')
+    args = parser.parse_args(argv)
+
+    result = environment()
+    result['import'] = import_time.measure(args.import_repeat)
+    result['cases'] = {}
+    for name, dataset, size, kind in CASES:
+        if args.cases is None or name in args.cases:
+            print('running {}...'.format(name), file=sys.stderr)
+            result['cases'][name] = run_case(name, dataset, size, kind, args)
+
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,21 @@ Wikipedia <http://en.wikipedia.org/wiki/Ant_colony_optimization_algorithms>`_.
 """
 
 from .ant import Ant 
-from .world import World, Edge, Node, Position
-from .solver import Solver
+from .world import World, SparseWorld, Edge, Node, Position
+from .solver import Solver, CancellationToken
+from .stats import SolverStats
+from .colony import Colony
+from .cache import LengthCache
+from .localsearch import LocalSearch, improve
 from .selection import SelectionMechanism
+from .io import Problem, read_tsp, read_tour, write_tour
+
+
+def __getattr__(name):
+    # The island model needs multiprocessing, which is only imported once
+    # the MultiColonySolver is asked for.
+    if name == 'MultiColonySolver':
+        from .multicolony import MultiColonySolver
+        return MultiColonySolver
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
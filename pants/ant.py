@@ -9,11 +9,11 @@
 """
 
 import sys
+import copy
 import random
 import bisect
-import itertools
 import functools
-import matplotlib.pyplot as plt
+import numpy as np
 
 from .world import World
 
@@ -101,9 +101,34 @@ class Ant:
         self.beta = beta
         self.start = None
         self.distance = 0
-        self.visited = []
-        self.unvisited = []
-        self.traveled = []
+        # The tour so far fills the first _size slots of _tour, and the
+        # first _left slots of _unvisited hold the nodes not yet visited.
+        # _where is the slot of every node in _unvisited, so a node is
+        # visited exactly when its slot is past _left, and removing a node
+        # swaps it with the last unvisited one. _moves counts the edges
+        # traveled, which reaches _size once the tour is closed.
+        self._tour = None
+        self._unvisited = None
+        self._where = None
+        self._size = 0
+        self._left = 0
+        self._moves = 0
+
+    def allocate(self, n):
+        """Create the buffers for a tour of *n* nodes, unless they exist.
+
+        The buffers are kept by :func:`initialize` and :func:`record`, so
+        that an :class:`Ant` reused for every iteration, as by the
+        :class:`Solver`, never allocates them again.
+
+        :param int n: the number of nodes of the world
+        """
+        if self._tour is None or len(self._tour) != n:
+            self._tour = np.empty(n, dtype=np.int32)
+            self._unvisited = None
+        if self._unvisited is None:
+            self._unvisited = np.arange(n, dtype=np.int32)
+            self._where = np.arange(n, dtype=np.int32)
 
     def initialize(self, world, start=None):
         """Reset everything so that a new solution can be found.
@@ -114,16 +139,34 @@ class Ant:
         :rtype: :class:`Ant`
         """
         self.world = world
+        n = len(world.nodes)
         if start is None:
-            self.start = random.randrange(len(self.world.nodes))
+            self.start = random.randrange(n)
         else:
-            self.start = start
+            self.start = int(start)
+        self.allocate(n)
         self.distance = 0
-        self.visited = [self.start]
-        self.unvisited = [n for n in self.world.nodes if n != self.start]
-        self.traveled = []
+        self._size = self._moves = 0
+        # Every node is in _unvisited in some order, so making them all
+        # unvisited again only takes resetting the count.
+        self._left = n
+        self.visit(self.start)
         return self
 
+    def visit(self, node):
+        """Append *node* to the tour and remove it from the unvisited
+        nodes in constant time.
+
+        :param int node: the ID of the node
+        """
+        self._tour[self._size] = node
+        self._size += 1
+        unvisited, where = self._unvisited, self._where
+        self._left -= 1
+        slot, last = where[node], unvisited[self._left]
+        unvisited[slot], where[last] = last, slot
+        unvisited[self._left], where[node] = node, self._left
+
     def clone(self):
         """Return a shallow copy with a new UID.
         
@@ -133,22 +176,67 @@ class Ant:
         :return: a clone
         :rtype: :class:`Ant`
         """
-        ant = Ant(self.alpha, self.beta)
-        ant.world = self.world
-        ant.start = self.start
-        ant.visited = self.visited[:]
-        ant.unvisited = self.unvisited[:]
-        ant.traveled = self.traveled[:]
-        ant.distance = self.distance
+        ant = copy.copy(self)
+        ant.uid = Ant.uid
+        Ant.uid += 1
+        return ant
+
+    def __copy__(self):
+        """Return a copy that shares no buffer with this :class:`Ant`.
+
+        The copy of a complete tour, such as the best one kept by the
+        :class:`Solver`, only copies the tour; the other buffers are created
+        again if the copy is ever initialized.
+
+        :rtype: :class:`Ant`
+        """
+        ant = object.__new__(self.__class__)
+        ant.__dict__.update(self.__dict__)
+        if self._tour is not None:
+            ant._tour = self._tour.copy()
+            if self._left:
+                ant._unvisited = self._unvisited.copy()
+                ant._where = self._where.copy()
+            else:
+                ant._unvisited = ant._where = None
         return ant
 
+    @property
+    def ids(self):
+        """The IDs of the nodes visited in order, as a read-only view of the
+        tour buffer, which the next :func:`initialize` overwrites."""
+        if self._tour is None:
+            return np.zeros(0, dtype=np.int32)
+        view = self._tour[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def visited(self):
+        """IDs of the nodes visited in order, as a list."""
+        return self.ids.tolist()
+
+    @property
+    def unvisited(self):
+        """IDs of the nodes not yet visited, in no particular order."""
+        if self._unvisited is None:
+            return []
+        return self._unvisited[:self._left].tolist()
+
+    @property
+    def visited_mask(self):
+        """A boolean :class:`ndarray` that is ``True`` for every visited
+        node."""
+        if self._where is None:
+            return np.ones(self._size, dtype=bool)
+        return self._where >= self._left
+
     @property
     def node(self):
         """Most recently visited node."""
-        try:
-            return self.visited[-1]
-        except IndexError:
+        if self._size == 0:
             return None
+        return int(self._tour[self._size - 1])
 
     @property
     def tour(self):
@@ -158,8 +246,16 @@ class Ant:
     @property
     def path(self):
         """Edges traveled by the :class:`Ant` in order."""
-        return [edge for edge in self.traveled]
-        
+        visited = self.visited
+        ends = visited[1:] + visited[:1]
+        return [self.world.edges[a, b]
+                for a, b in zip(visited[:self._moves], ends[:self._moves])]
+
+    @property
+    def traveled(self):
+        """Edges traveled by the :class:`Ant` in order; see :attr:`path`."""
+        return self.path
+
     def __eq__(self, other):
         """Return ``True`` if the distance is equal to the other distance.
         
@@ -183,7 +279,7 @@ class Ant:
         """
         # This is only true after we have made the move back to the starting
         # node.
-        return len(self.traveled) != len(self.visited)
+        return self._moves != self._size
 
     def move(self):
         """Choose, make, and return a move from the remaining moves.
@@ -192,20 +288,30 @@ class Ant:
         :rtype: :class:`Edge`
         """
         remaining = self.remaining_moves()
-        choice = self.choose_move(remaining)
+        choice = self.choose_move(remaining, remaining=True)
         return self.make_move(choice)
 
     def remaining_moves(self):
         """Return the moves that remain to be made.
         
-        :rtype: list
+        :return: a view of the unvisited node IDs
+        :rtype: :class:`ndarray`
         """
-        return self.unvisited
+        return self._unvisited[:self._left]
 
-    def choose_move(self, choices):
+    def choose_move(self, choices, remaining=False):
         """Choose a move from all possible moves.
+
+        If the :class:`World` has candidate lists, only the candidates of the
+        current node that are among *choices* are considered. When none of
+        them are, the move of *choices* with the greatest weight is taken; if
+        *choices* are all of the :func:`remaining_moves`, only those returned
+        by :func:`World.remaining_moves` are weighed.
         
         :param list choices: a list of all possible moves
+        :param bool remaining: ``True`` if *choices* are all of the
+                               :func:`remaining_moves`, as passed by
+                               :func:`move` (default is ``False``)
         :return: the chosen element from *choices*
         :rtype: node
         """
@@ -213,18 +319,44 @@ class Ant:
             return None
         if len(choices) == 1:
             return choices[0]
-        
-        # Find the weight of the edges that take us to each of the choices.
-        weights = []
-        for move in choices:
-            edge = self.world.edges[self.node, move]
-            # weights.append(self.weight(edge))
-            weights.append(edge.weight(alpha=self.alpha, beta=self.beta))
+
+        candidates = self.world.candidates
+        if candidates is not None:
+            row = candidates[self.node]
+            if remaining:
+                # The choices are all of the remaining moves, so checking
+                # which candidates are unvisited is enough.
+                allowed = row[self._where[row] < self._left]
+            else:
+                allowed = row[np.isin(row, choices)]
+            if len(allowed) == 0:
+                if remaining:
+                    choices = self.world.remaining_moves(
+                        self.node, ~self.visited_mask).tolist()
+                return choices[int(np.argmax(self.weigh(choices)))]
+            choices = allowed.tolist()
 
         # Choose one of them using a weighted probability.
-        total = sum(weights)
-        cumdist = list(itertools.accumulate(weights)) + [total]
-        return choices[bisect.bisect(cumdist, random.random() * total)]
+        cumdist = np.cumsum(self.weigh(choices))
+        index = bisect.bisect(cumdist, random.random() * cumdist[-1])
+        return choices[min(index, len(choices) - 1)]
+
+    def weigh(self, moves):
+        """Return the weight of moving from the current node to each of
+        *moves*.
+
+        The weights are read from the rows of the world matrices that start
+        at the current node. As in :func:`Edge.weight`, edges without length
+        are treated as having a length of one.
+
+        :param list moves: the node IDs to weigh
+        :return: the weight of each move
+        :rtype: :class:`ndarray`
+        """
+        lengths = self.world.distances[self.node, moves]
+        lengths[lengths == 0] = 1
+        pheromone = self.world.pheromone[self.node, moves]
+        return pheromone ** self.alpha * (1 / lengths) ** self.beta
 
     def make_move(self, dest):
         """Move to the *dest* node and return the edge traveled.
@@ -237,8 +369,8 @@ class Ant:
         :return: the edge taken to get to *dest*
         :rtype: :class:`Edge`
         """
-        # Since self.node simply refers to self.visited[-1], which will be
-        # changed before we return to calling code, store a reference now.
+        # Since self.node simply refers to the last visited node, which will
+        # be changed before we return to calling code, store it now.
         ori = self.node
 
         # When dest is None, all nodes have been visited but we may not
@@ -251,33 +383,35 @@ class Ant:
                 return None
             dest = self.start   # last move is back to the start
         else:
-            self.visited.append(dest)
-            self.unvisited.remove(dest)
-        
-        edge = self.world.edges[ori, dest]
-        self.traveled.append(edge)
-        self.distance += edge.length
-        return edge
-
-    def plot_tour(self):
-        def iterate(iterable):
-            iterator = iter(iterable)
-            prev_item = None
-            current_item = next(iterator)  # throws StopIteration if empty.
-            first_item = current_item
-            for next_item in iterator:
-                yield (prev_item, current_item, next_item)
-                prev_item = current_item
-                current_item = next_item
-            yield (prev_item, current_item, first_item)
-
-        for prev_item, act_item, next_item in iterate(self.tour):
-            # points = [pos.position for pos in self._nodes]
-            plt.scatter(act_item.position[0], act_item.position[1], marker='o', color='r')
-
-            if next_item is not None:
-                plt.plot([act_item.position[0], next_item.position[0]], [act_item.position[1], next_item.position[1]], color='b')
-
-        plt.show()
+            dest = int(dest)
+            self.visit(dest)
+        self._moves += 1
+        self.distance += self.world.length(ori, dest)
+        return self.world.edges[ori, dest]
+
+    def record(self, tour, distance):
+        """Take over a complete *tour* that was constructed elsewhere.
+
+        This is used by the :class:`Solver` to hand the tours built by a
+        :class:`~pants.colony.Colony` back to the :class:`Ant`\s, so that
+        they look as if they had moved along *tour* themselves.
+
+        :param tour: the node IDs of the tour, starting at :attr:`start`
+        :param float distance: the total length of the closed tour
+        :return: `self`
+        :rtype: :class:`Ant`
+        """
+        self.allocate(len(tour))
+        self._tour[:] = tour
+        self.start = int(self._tour[0])
+        self._size = self._moves = len(tour)
+        self._left = 0
+        self.distance = float(distance)
+        return self
+
+    def plot_tour(self, **kwargs):
+        """Draw the tour; see :func:`pants.viz.plot_tour`."""
+        from . import viz
+        return viz.plot_tour(self.world, self.visited, **kwargs)
 
     
@@ -0,0 +1,80 @@
+"""
+.. module:: cache
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides memoization of expensive length functions.
+
+"""
+
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LengthCache:
+    """A memoizing wrapper around a length function.
+
+    A :class:`LengthCache` is called exactly like the length function it
+    wraps, with two node positions, and remembers the length of every pair it
+    has seen. If *maxsize* is given, only the most recently used *maxsize*
+    lengths are kept, which bounds the memory needed for very large worlds.
+    If the length function is *symmetric*, the pairs ``(a, b)`` and
+    ``(b, a)`` share a single entry.
+
+    .. code-block:: python
+
+        lfunc = LengthCache(road_distance, maxsize=1000000, symmetric=True)
+        world = World(nodes, lfunc)
+        print(lfunc.cache_info())
+
+    :param callable lfunc: the length function to memoize
+    :param int maxsize: the maximum number of lengths kept (default is None,
+                        which keeps every length)
+    :param bool symmetric: ``True`` if the length from *a* to *b* always
+                           equals the length from *b* to *a* (default is
+                           ``False``)
+    """
+    def __init__(self, lfunc, maxsize=None, symmetric=False):
+        self.lfunc = lfunc
+        self.maxsize = maxsize
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self._lengths = OrderedDict() if maxsize is not None else {}
+
+    def __call__(self, a, b):
+        """Return the length between positions *a* and *b*.
+
+        :param tuple a: the position of the start node
+        :param tuple b: the position of the end node
+        :rtype: float
+        """
+        key = (b, a) if self.symmetric and b < a else (a, b)
+        try:
+            length = self._lengths[key]
+        except KeyError:
+            self.misses += 1
+            length = self._lengths[key] = self.lfunc(a, b)
+            if self.maxsize is not None and len(self._lengths) > self.maxsize:
+                self._lengths.popitem(last=False)
+        else:
+            self.hits += 1
+            if self.maxsize is not None:
+                self._lengths.move_to_end(key)
+        return length
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def cache_info(self):
+        """Return the hits, misses, maximum and current size of the cache.
+
+        :rtype: :class:`CacheInfo`
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._lengths))
+
+    def cache_clear(self):
+        """Forget every length and reset the hit and miss counters."""
+        self._lengths.clear()
+        self.hits = 0
+        self.misses = 0
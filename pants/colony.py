@@ -0,0 +1,255 @@
+"""
+.. module:: colony
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for constructing the tours of a whole
+               colony of ants at once.
+
+"""
+
+import numpy as np
+
+
+class Colony:
+    """Constructs the tours of a whole colony of ants in lockstep.
+
+    Rather than letting each :class:`Ant` choose its moves one at a time, a
+    :class:`Colony` keeps the state of every ant in a few arrays: an
+    (ants x nodes) *visited* mask, the *current* node of every ant, the
+    *tours* built so far and the *distances* traveled. Each :func:`step`
+    gathers the rows of the choice info matrix (see
+    :func:`World.choice_info`) that start at the current nodes, which hold
+    the weight of every possible move of every ant, and samples the next node
+    of all ants at once. A complete construction therefore takes as many
+    vectorized steps as there are nodes.
+
+    .. code-block:: python
+
+        colony = Colony(world, 10, alpha=1, beta=3)
+        tours, distances = colony.construct(starts)
+
+    :param World world: the world to solve
+    :param int count: the number of ants in the colony
+    :param float alpha: the relative importance of pheromone (default=1)
+    :param float beta: the relative importance of distance (default=3)
+    :param rng: the random generator used for sampling (default is a new
+                :func:`numpy.random.default_rng`)
+    :param float q0: the probability of taking the best move (default=0)
+    :param float xi: the fraction of pheromone that decays from every edge
+                     taken (default=0)
+    :param float t0: the pheromone level that edges decay towards
+                     (default=0.01)
+    """
+    def __init__(self, world, count, alpha=1, beta=3, rng=None, q0=0, xi=0,
+                 t0=.01):
+        self.world = world
+        self.count = count
+        self.alpha = alpha
+        self.beta = beta
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.q0 = q0
+        self.xi = xi
+        self.t0 = t0
+        self.heuristic = None
+        n = len(world.nodes)
+        self.visited = np.zeros((count, n), dtype=bool)
+        self.current = np.zeros(count, dtype=np.intp)
+        self.tours = np.zeros((count, n), dtype=np.intp)
+        self.distances = np.zeros(count)
+        self.moves = 0
+        self._ants = np.arange(count)
+
+    def reset(self, starts, choice=None, heuristic=None):
+        """Place every ant on its starting node and forget all moves.
+
+        If the :class:`World` has candidate lists, the choice info of the
+        candidate edges is gathered here, once per construction.
+
+        :param list starts: the starting node ID of every ant
+        :param choice: the choice info matrix to read the weights of the
+                       moves from (default is None, which computes it from
+                       the current pheromone)
+        :param heuristic: the heuristic matrix that *choice* was computed
+                          from, which is only needed to decay the pheromone
+                          (default is None, which computes it if needed)
+        """
+        self.visited.fill(False)
+        self.distances.fill(0)
+        self.current[:] = starts
+        self.tours[:, 0] = self.current
+        self.visited[self._ants, self.current] = True
+        self.moves = 1
+        if choice is None or (self.xi and heuristic is None):
+            heuristic = self.world.heuristic(self.beta)
+        if choice is None:
+            choice = self.world.choice_info(self.alpha, heuristic)
+        self.choice = choice
+        self.heuristic = heuristic
+        if self.world.candidates is not None:
+            self._choice = self.world.gather_candidates(choice)
+
+    def weights(self):
+        """Return the weight of every move of every ant.
+
+        Moves to nodes that have already been visited weigh nothing.
+
+        :return: the (ants x nodes) weights
+        :rtype: :class:`ndarray`
+        """
+        weights = self.choice[self.current]
+        weights[self.visited] = 0
+        return weights
+
+    def candidate_weights(self):
+        """Return the weight of the moves to the candidates of every ant.
+
+        :return: the (ants x k) weights, aligned with the candidates of the
+                 current node of every ant
+        :rtype: :class:`ndarray`
+        """
+        moves = self.world.candidates[self.current]
+        weights = self._choice[self.current]
+        weights[self.visited[self._ants[:, None], moves]] = 0
+        return weights
+
+    def step(self):
+        """Move every ant to its next node.
+
+        If the :class:`World` has candidate lists, every ant samples among
+        the unvisited candidates of its current node, and an ant whose
+        candidates have all been visited takes the remaining move with the
+        greatest weight instead.
+
+        :return: the node ID each ant moved to
+        :rtype: :class:`ndarray`
+        """
+        candidates = self.world.candidates
+        if candidates is None:
+            choices = self.choose(self.weights(), self.visited)
+        else:
+            weights = self.candidate_weights()
+            columns = self.choose(weights)
+            choices = candidates[self.current, columns]
+            exhausted = ~weights.any(axis=1)
+            if exhausted.any():
+                choices[exhausted] = self.best_remaining(exhausted)
+        if self.xi:
+            self.decay(self.current, choices)
+        self.advance(choices)
+        return choices
+
+    def choose(self, weights, visited=None):
+        """Return the column of the move chosen from each row of *weights*.
+
+        With probability *q0*, a row takes the move with the greatest weight,
+        which needs no cumulative sum; the other rows are sampled by
+        :func:`sample`.
+
+        :param weights: the (ants x m) weights of the moves
+        :param visited: the (ants x m) mask of moves that may not be taken
+                        (default is None)
+        :return: the chosen column of every row
+        :rtype: :class:`ndarray`
+        """
+        if not self.q0:
+            return self.sample(weights, visited)
+        exploit = self.rng.random(len(weights)) < self.q0
+        exploit &= weights.any(axis=1)
+        columns = np.empty(len(weights), dtype=np.intp)
+        columns[exploit] = weights[exploit].argmax(axis=1)
+        explore = ~exploit
+        if explore.any():
+            columns[explore] = self.sample(
+                weights[explore], None if visited is None else visited[explore])
+        return columns
+
+    def decay(self, starts, ends):
+        """Decay the pheromone of the edges from *starts* to *ends* and
+        update their choice info.
+
+        :param starts: the node IDs the edges start at
+        :param ends: the node IDs the edges end at
+        """
+        levels = self.world.decay_pheromone(starts, ends, self.xi, self.t0)
+        weights = levels ** self.alpha * self.heuristic[starts, ends]
+        self.choice[starts, ends] = weights
+        candidates = self.world.candidates
+        if candidates is not None:
+            rows = candidates[starts]
+            columns = (rows == ends[:, None]).argmax(axis=1)
+            found = rows[self._ants, columns] == ends
+            self._choice[starts[found], columns[found]] = weights[found]
+
+    def sample(self, weights, visited=None):
+        """Return the column of one move sampled from each row of *weights*.
+
+        :param weights: the (ants x m) weights of the moves
+        :param visited: the (ants x m) mask of moves that may not be taken;
+                        rows whose moves all weigh nothing pick uniformly
+                        among the others (default is None)
+        :return: the sampled column of every row
+        :rtype: :class:`ndarray`
+        """
+        cumdist = np.cumsum(weights, axis=1)
+        total = cumdist[:, -1]
+
+        # An ant whose remaining moves all weigh nothing picks uniformly.
+        stuck = total <= 0
+        if visited is not None and stuck.any():
+            cumdist[stuck] = np.cumsum(~visited[stuck], axis=1)
+            total = cumdist[:, -1]
+
+        threshold = self.rng.random(len(weights)) * total
+        columns = (cumdist <= threshold[:, None]).sum(axis=1)
+        return np.minimum(columns, cumdist.shape[1] - 1)
+
+    def best_remaining(self, ants):
+        """Return the unvisited node with the greatest weight for each of
+        the selected *ants*.
+
+        Only the moves returned by :func:`World.remaining_moves` are
+        weighed: every unvisited node of a dense world, but only a bounded
+        set of the nearest ones of a :class:`~pants.world.SparseWorld`,
+        whose weights would otherwise be computed for every unvisited node.
+
+        :param ants: the boolean mask or indices of the ants
+        :return: the node ID of the best remaining move of each ant
+        :rtype: :class:`ndarray`
+        """
+        ants = self._ants[ants]
+        choices = np.empty(len(ants), dtype=np.intp)
+        for i, ant in enumerate(ants):
+            node = self.current[ant]
+            remaining = self.world.remaining_moves(node, ~self.visited[ant])
+            weights = self.choice[node, remaining]
+            choices[i] = remaining[np.argmax(weights)]
+        return choices
+
+    def advance(self, choices):
+        """Record the move of every ant to the node in *choices*.
+
+        :param choices: the node ID each ant moves to
+        """
+        self.distances += self.world.distances[self.current, choices]
+        self.visited[self._ants, choices] = True
+        self.tours[:, self.moves] = choices
+        self.current[:] = choices
+        self.moves += 1
+
+    def construct(self, starts, choice=None, heuristic=None):
+        """Let every ant complete a tour starting at its node in *starts*.
+
+        :param list starts: the starting node ID of every ant
+        :param choice: the choice info matrix (default is None, which
+                       computes it from the current pheromone)
+        :param heuristic: the heuristic matrix of *choice* (default is None)
+        :return: the (ants x nodes) tours and the distance of each tour,
+                 including the move back to the start
+        :rtype: tuple
+        """
+        self.reset(starts, choice, heuristic)
+        while self.moves < self.tours.shape[1]:
+            self.step()
+        if self.xi:
+            self.decay(self.current, self.tours[:, 0])
+        self.distances += self.world.distances[self.current, self.tours[:, 0]]
+        return self.tours, self.distances
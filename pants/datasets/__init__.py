@@ -1 +1,149 @@
-# http://www.math.uwaterloo.ca/tsp/data/index.html
\ No newline at end of file
+"""
+.. module:: datasets
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides the travelling salesman instances that come with
+               Pants.
+
+The coordinates of every instance are stored as a CSV file of one ``x y`` pair
+per line, taken from http://www.math.uwaterloo.ca/tsp/data/index.html. The
+first time an instance is loaded, the parsed coordinates are cached in a
+``.npy`` file next to the CSV file, from which later loads read them at once.
+
+.. code-block:: python
+
+    from pants import datasets
+
+    data = datasets.load('xqf131')
+    world = World(data.coords)
+    print(data.optimum, data.coords.shape)
+
+"""
+
+import os
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Dataset:
+    """A travelling salesman instance that comes with Pants.
+
+    Only the coordinates are read when a :class:`Dataset` is loaded; the
+    :attr:`nodes` and the :attr:`optimal_tour` are created the first time
+    they are asked for.
+
+    :param str name: the name of the instance
+    :param int dimension: the number of nodes
+    :param str comment: a description of the instance
+    :param float optimum: the length of an optimal tour, with the lengths of
+                          the edges rounded to the nearest integer as in
+                          TSPLIB's ``EUC_2D`` (default is None, which means
+                          unknown)
+    """
+    def __init__(self, name, dimension, comment, optimum=None):
+        self.name = name
+        self.dimension = dimension
+        self.comment = comment
+        self.optimum = optimum
+        self._coords = None
+        self._nodes = None
+        self._optimal_tour = None
+
+    def path(self, extension):
+        """Return the path of the file of the instance with *extension*.
+
+        :param str extension: the extension of the file, such as ``'.csv'``
+        :rtype: str
+        """
+        return os.path.join(HERE, self.name + extension)
+
+    @property
+    def coords(self):
+        """The (nodes x 2) coordinates, as a read-only :class:`ndarray`."""
+        if self._coords is None:
+            self._coords = self.load_coords()
+            self._coords.flags.writeable = False
+        return self._coords
+
+    @property
+    def nodes(self):
+        """The :class:`Node`\\s at the :attr:`coords`."""
+        if self._nodes is None:
+            from ..world import Node, Position
+            self._nodes = [Node(Position(x, y))
+                           for x, y in self.coords.tolist()]
+        return self._nodes
+
+    @property
+    def optimal_tour(self):
+        """The node IDs of an optimal tour, or None if it is unknown."""
+        if self._optimal_tour is None and os.path.isfile(self.path('.tour')):
+            from ..io import read_tour
+            self._optimal_tour = read_tour(self.path('.tour'))
+        return self._optimal_tour
+
+    def load_coords(self):
+        """Read the coordinates, preferring the ``.npy`` cache.
+
+        The cache is written, or rewritten if the CSV file is newer, after
+        parsing the CSV file. A cache that cannot be written, for instance
+        because the package is installed read-only, is simply skipped.
+
+        :return: the (nodes x 2) coordinates
+        :rtype: :class:`ndarray`
+        """
+        csv, cache = self.path('.csv'), self.path('.npy')
+        if not os.path.isfile(csv):
+            raise FileNotFoundError(csv)
+        if os.path.isfile(cache) and \
+                os.path.getmtime(cache) >= os.path.getmtime(csv):
+            coords = np.load(cache)
+        else:
+            coords = np.loadtxt(csv, dtype=np.float64, ndmin=2)
+            self.save_cache(coords, cache)
+        if coords.shape != (self.dimension, 2):
+            raise ValueError('Expected {} nodes in {}, got {}'.format(
+                self.dimension, csv, len(coords)))
+        return coords
+
+    @staticmethod
+    def save_cache(coords, path):
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(temp, 'wb') as f:
+                np.save(f, coords)
+            os.replace(temp, path)
+        except OSError:
+            if os.path.exists(temp):
+                os.unlink(temp)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.name)
+
+
+DATASETS = {
+    dataset.name: dataset for dataset in [
+        Dataset('xqf131', 131,
+                'Bonn VLSI data set with 131 points, contributed by Andre '
+                'Rohe', optimum=564),
+        Dataset('pma343', 343,
+                'Bonn VLSI data set with 343 points, contributed by Andre '
+                'Rohe', optimum=1368),
+        Dataset('usa115475', 115475,
+                '115,474 towns and cities in the United States'),
+    ]
+}
+
+
+def load(name):
+    """Return the :class:`Dataset` with the given *name*.
+
+    :param str name: ``'xqf131'``, ``'pma343'`` or ``'usa115475'``
+    :rtype: :class:`Dataset`
+    """
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError('Unknown dataset {!r}, expected one of {}'.format(
+            name, sorted(DATASETS))) from None
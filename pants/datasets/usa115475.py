@@ -1,33 +1,23 @@
-import os
-import pandas as pd
-from pants import Node, Position
+"""
+NAME : usa115475
+TYPE : TSP
+COMMENT : 115,474 towns and cities in the United States
+COMMENT : Created July 7, 2012, www.math.uwaterloo/tsp/data/usa/
+DIMENSION : 115475
+EDGE_WEIGHT_TYPE : EUC_2D
 
-def load_data():
-    '''
-    NAME: usa115475
-    TYPE: TSP
-    COMMENT: 115,474 towns and cities in the United States
-    COMMENT: Created July 7, 2012, www.math.uwaterloo/tsp/data/usa/
-    DIMENSION: 115475
-    EDGE_WEIGHT_TYPE: EUC_2D
-    NODE_COORD_SECTION
-    '''
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'usa115475.csv')
-    dimensions = 115475
+"""
 
-    if not os.path.isfile(path):
-        raise FileNotFoundError(path)
+from . import load
 
-    print('Load data ...')
-    data = pd.read_csv(path, delimiter=' ', header=None)
 
-    node_list = []
-    for index, pos in data.iterrows():
-        node_list.append(Node(Position(pos[0], pos[1])))
+def load_data(nodes=False):
+    """Return the coordinates of usa115475.
 
-    if dimensions != len(node_list):
-        raise Exception('Failed to load all examples. {} examples expected, got {}.'.format(dimensions, len(node_list)))
-
-    print('Datapoints: {}'.format(dimensions))
-
-    return node_list
\ No newline at end of file
+    :param bool nodes: ``True`` to return a list of :class:`Node`\\s instead
+                       (default is ``False``)
+    :return: the (nodes x 2) coordinates, or the nodes
+    :rtype: :class:`ndarray` or list
+    """
+    dataset = load('usa115475')
+    return dataset.nodes if nodes else dataset.coords
@@ -0,0 +1,487 @@
+"""
+.. module:: io
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for reading and writing TSPLIB files.
+
+`TSPLIB <http://comopt.ifi.uni-heidelberg.de/software/TSPLIB95/>`_ problems
+are read from ``.tsp`` files with :func:`read_tsp`, either as node
+coordinates (``NODE_COORD_SECTION``) or as an explicit matrix of edge weights
+(``EDGE_WEIGHT_SECTION``). The lengths follow the rounding rules of TSPLIB,
+so that tour lengths match the published optima:
+
+.. code-block:: python
+
+    problem = read_tsp('pr1002.tsp')
+    world = problem.world(candidates=20)
+    best = Solver().solve(world)
+    write_tour('pr1002.tour', best.visited, name=problem.name)
+
+The numeric sections are parsed in chunks of lines straight into arrays, so
+even files with millions of nodes are read in seconds and never held in
+memory as text.
+
+"""
+
+import hashlib
+import re
+import warnings
+from itertools import chain, islice
+
+import numpy as np
+
+from .world import World, SparseWorld, Node, Position, euclidean
+
+#: The number of lines parsed at once.
+CHUNK = 1 << 16
+
+# A line that starts with a letter starts a keyword, not numbers.
+_KEYWORD = re.compile(r'^[ \t]*[A-Za-z]', re.MULTILINE)
+
+
+def _nint(x):
+    return np.floor(x + 0.5)
+
+
+def euc_2d(a, b):
+    """Return the ``EUC_2D`` lengths: euclidean, rounded to the nearest
+    integer.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    return _nint(euclidean(a, b))
+
+
+def ceil_2d(a, b):
+    """Return the ``CEIL_2D`` lengths: euclidean, rounded up.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    return np.ceil(euclidean(a, b))
+
+
+def att(a, b):
+    """Return the ``ATT`` pseudo-euclidean lengths.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    r = euclidean(a, b) / np.sqrt(10.0)
+    t = _nint(r)
+    return np.where(t < r, t + 1, t)
+
+
+def man_2d(a, b):
+    """Return the ``MAN_2D`` lengths: manhattan, rounded to the nearest
+    integer.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    delta = np.abs(a - b)
+    return _nint(delta[..., 0] + delta[..., 1])
+
+
+def max_2d(a, b):
+    """Return the ``MAX_2D`` lengths: the larger of the rounded distances
+    along either axis.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    delta = np.abs(a - b)
+    return np.maximum(_nint(delta[..., 0]), _nint(delta[..., 1]))
+
+
+def _radians(x):
+    # TSPLIB's DDD.MM notation: whole degrees, then minutes after the point.
+    # Like the reference implementation, the degrees are truncated.
+    degrees = np.trunc(x)
+    return 3.141592 * (degrees + 5.0 * (x - degrees) / 3.0) / 180.0
+
+
+def geo(a, b):
+    """Return the ``GEO`` lengths: the great circle distances in kilometres
+    between latitudes (``x``) and longitudes (``y``) in ``DDD.MM`` notation,
+    truncated as by TSPLIB.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    a, b = _radians(np.asarray(a)), _radians(np.asarray(b))
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    cosine = np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)
+    return np.trunc(6378.388 * np.arccos(cosine) + 1.0)
+
+
+#: The metrics of the supported ``EDGE_WEIGHT_TYPE``\s with coordinates.
+METRICS = {
+    'EUC_2D': euc_2d,
+    'CEIL_2D': ceil_2d,
+    'ATT': att,
+    'GEO': geo,
+    'MAN_2D': man_2d,
+    'MAX_2D': max_2d,
+}
+
+# The indices filled by every EDGE_WEIGHT_FORMAT of a symmetric matrix, in
+# the order of the weights. A column-wise triangle lists the same weights as
+# the row-wise triangle on the other side of the diagonal.
+_TRIANGLES = {
+    'UPPER_ROW': (np.triu_indices, 1),
+    'LOWER_ROW': (np.tril_indices, -1),
+    'UPPER_DIAG_ROW': (np.triu_indices, 0),
+    'LOWER_DIAG_ROW': (np.tril_indices, 0),
+    'UPPER_COL': (np.tril_indices, -1),
+    'LOWER_COL': (np.triu_indices, 1),
+    'UPPER_DIAG_COL': (np.tril_indices, 0),
+    'LOWER_DIAG_COL': (np.triu_indices, 0),
+}
+
+
+class Explicit:
+    """The metric of a problem with an explicit matrix of edge weights.
+
+    :class:`World`\s of these problems are given nodes whose ``x``
+    coordinate is their ID, by which the lengths are looked up in the
+    *weights*.
+
+    :param weights: the (nodes x nodes) edge weights
+    """
+    def __init__(self, weights):
+        self.weights = weights
+        # Worlds name their stored distances after the qualified name of
+        # the metric, which must therefore tell the matrices apart.
+        self.__qualname__ = '{}.{}'.format(
+            type(self).__qualname__,
+            hashlib.sha1(np.ascontiguousarray(weights)).hexdigest()[:16])
+
+    def __call__(self, a, b):
+        a = np.asarray(a)[..., 0].astype(np.intp)
+        b = np.asarray(b)[..., 0].astype(np.intp)
+        return self.weights[a, b]
+
+
+class Problem:
+    """A TSPLIB problem, as read by :func:`read_tsp`.
+
+    The keywords of the specification part are available in :attr:`header`
+    and the most common ones as attributes. A problem has either
+    :attr:`coords` or :attr:`weights`, depending on its
+    ``EDGE_WEIGHT_TYPE``.
+
+    :param dict header: the keywords of the specification part
+    :param coords: the (nodes x 2) coordinates of the nodes in the order of
+                   their IDs (default is None)
+    :param weights: the (nodes x nodes) edge weights (default is None)
+    :param display: the (nodes x 2) coordinates used to draw a problem with
+                    explicit weights (default is None)
+    """
+    def __init__(self, header, coords=None, weights=None, display=None):
+        self.header = header
+        self.coords = coords
+        self.weights = weights
+        self.display = display
+        self._nodes = None
+
+    @property
+    def name(self):
+        return self.header.get('NAME')
+
+    @property
+    def comment(self):
+        return self.header.get('COMMENT')
+
+    @property
+    def type(self):
+        return self.header.get('TYPE')
+
+    @property
+    def dimension(self):
+        return int(self.header['DIMENSION'])
+
+    @property
+    def edge_weight_type(self):
+        return self.header.get('EDGE_WEIGHT_TYPE')
+
+    @property
+    def edge_weight_format(self):
+        return self.header.get('EDGE_WEIGHT_FORMAT')
+
+    @property
+    def metric(self):
+        """The vectorized length function of the problem, which can be
+        handed to a :class:`World` as its *metric*."""
+        if self.weights is not None:
+            return Explicit(self.weights)
+        try:
+            return METRICS[self.edge_weight_type]
+        except KeyError:
+            raise ValueError('Unsupported EDGE_WEIGHT_TYPE {!r}'.format(
+                self.edge_weight_type)) from None
+
+    @property
+    def nodes(self):
+        """The :class:`Node`\s of the problem, in the order of their IDs."""
+        if self._nodes is None:
+            self._nodes = [Node(Position(x, y))
+                           for x, y in self.positions().tolist()]
+        return self._nodes
+
+    def positions(self):
+        """Return the (nodes x 2) coordinates of the nodes of a
+        :class:`World` of the problem: the :attr:`coords`, or for explicit
+        weights the IDs of the nodes along the ``x`` axis.
+
+        :rtype: :class:`ndarray`
+        """
+        if self.weights is not None:
+            return np.arange(self.dimension)[:, None] * np.array([1.0, 0.0])
+        return self.coords
+
+    def world(self, sparse=False, **kwargs):
+        """Return a :class:`World` whose lengths are those of the problem.
+
+        The *metric* is set to that of the problem, and the *name* and
+        *description* of the world default to the ``NAME`` and ``COMMENT``
+        of the problem.
+
+        :param bool sparse: ``True`` for a :class:`SparseWorld` (default is
+                            ``False``); explicit weights need a dense world
+        :param kwargs: the keyword arguments of the world
+        :rtype: :class:`World`
+        """
+        if sparse and self.weights is not None:
+            raise ValueError('Explicit weights need a dense World')
+        kwargs.setdefault('metric', self.metric)
+        kwargs.setdefault('name', self.name)
+        kwargs.setdefault('description', self.comment)
+        return (SparseWorld if sparse else World)(self.positions(), **kwargs)
+
+    def distances(self, block=1024):
+        """Return the dense matrix of the lengths between all nodes.
+
+        :param int block: number of rows computed at once (default=1024)
+        :rtype: :class:`ndarray`
+        """
+        if self.weights is not None:
+            return self.weights
+        metric, coords = self.metric, self.coords
+        n = len(coords)
+        distances = np.empty((n, n))
+        for lo in range(0, n, block):
+            rows = distances[lo:lo + block]
+            rows[...] = metric(coords[lo:lo + block, None, :], coords)
+            rows[np.arange(len(rows)), np.arange(lo, lo + len(rows))] = 0
+        return distances
+
+    def tour_length(self, tour):
+        """Return the length of the closed *tour*.
+
+        :param tour: the node IDs of the tour
+        :rtype: float
+        """
+        tour = np.asarray(tour, dtype=np.intp)
+        following = np.roll(tour, -1)
+        if self.weights is not None:
+            return float(self.weights[tour, following].sum())
+        return float(self.metric(self.coords[tour],
+                                 self.coords[following]).sum())
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.name)
+
+
+class _Parser:
+    """Reads a TSPLIB file keyword by keyword, and the numeric sections
+    chunk by chunk."""
+    def __init__(self, f, chunk=CHUNK):
+        self.lines = iter(f)
+        self.chunk = chunk
+        self.name = getattr(f, 'name', 'file')
+
+    def keywords(self):
+        """Yield every keyword with its value, which is None for the
+        sections; the caller then reads the section."""
+        while True:
+            # Reading a section may put lines back, so the lines are looked
+            # up again for every keyword.
+            line = next(self.lines, None)
+            if line is None:
+                return
+            line = line.strip()
+            if not line:
+                continue
+            if ':' in line:
+                key, value = line.split(':', 1)
+                key, value = key.strip().upper(), value.strip()
+                yield key, (value if value else None)
+            else:
+                yield line.split()[0].upper(), None
+
+    def numbers(self):
+        """Read numbers until the next keyword or the end of the file.
+
+        :rtype: :class:`ndarray`
+        """
+        parts = []
+        while True:
+            lines = list(islice(self.lines, self.chunk))
+            if not lines:
+                break
+            text = ''.join(lines)
+            match = _KEYWORD.search(text)
+            if match is not None:
+                rest = text[match.start():].splitlines(True)
+                self.lines = chain(rest, self.lines)
+                text = text[:match.start()]
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                try:
+                    parts.append(np.fromstring(text, sep=' '))
+                except (DeprecationWarning, ValueError):
+                    raise ValueError('Malformed numbers in {}'.format(
+                        self.name)) from None
+            if match is not None:
+                break
+        if not parts:
+            return np.zeros(0)
+        return np.concatenate(parts)
+
+    def skip(self):
+        """Skip a section that ends with ``-1``."""
+        for line in self.lines:
+            if line.strip() == '-1':
+                return
+
+
+def _coordinates(numbers, n, name):
+    # Every line holds the ID of the node and its coordinates, and the
+    # lines may come in any order.
+    if n == 0 or len(numbers) % n or len(numbers) // n < 3:
+        raise ValueError('Expected {} nodes with coordinates in {}'.format(
+            n, name))
+    rows = numbers.reshape(n, -1)
+    if rows.shape[1] > 3:
+        raise ValueError('Only two dimensional coordinates are supported')
+    ids = rows[:, 0].astype(np.intp) - 1
+    if not np.array_equal(np.sort(ids), np.arange(n)):
+        raise ValueError('Expected the node IDs 1 to {} in {}'.format(
+            n, name))
+    coords = np.empty((n, 2))
+    coords[ids] = rows[:, 1:]
+    return coords
+
+
+def _matrix(numbers, n, fmt, name):
+    if fmt == 'FULL_MATRIX':
+        if len(numbers) != n * n:
+            raise ValueError('Expected {} weights in {}, got {}'.format(
+                n * n, name, len(numbers)))
+        return numbers.reshape(n, n)
+    try:
+        indices, offset = _TRIANGLES[fmt]
+    except KeyError:
+        raise ValueError('Unsupported EDGE_WEIGHT_FORMAT {!r}'.format(
+            fmt)) from None
+    rows, cols = indices(n, offset)
+    if len(numbers) != len(rows):
+        raise ValueError('Expected {} weights in {}, got {}'.format(
+            len(rows), name, len(numbers)))
+    weights = np.zeros((n, n))
+    weights[rows, cols] = numbers
+    weights[cols, rows] = numbers
+    return weights
+
+
+def read_tsp(path, chunk=CHUNK):
+    """Read a TSPLIB ``.tsp`` file.
+
+    :param str path: the path of the file
+    :param int chunk: the number of lines parsed at once (default is
+                      :data:`CHUNK`)
+    :rtype: :class:`Problem`
+    """
+    header, coords, numbers, display = {}, None, None, None
+    with open(path) as f:
+        parser = _Parser(f, chunk)
+        for key, value in parser.keywords():
+            if value is not None:
+                header[key] = value
+            elif key == 'NODE_COORD_SECTION':
+                coords = parser.numbers()
+            elif key == 'EDGE_WEIGHT_SECTION':
+                numbers = parser.numbers()
+            elif key == 'DISPLAY_DATA_SECTION':
+                display = parser.numbers()
+            elif key == 'FIXED_EDGES_SECTION':
+                parser.skip()
+            elif key == 'EOF':
+                break
+            else:
+                raise ValueError('Unsupported section {} in {}'.format(
+                    key, path))
+    if 'DIMENSION' not in header:
+        raise ValueError('No DIMENSION in {}'.format(path))
+    n = int(header['DIMENSION'])
+    problem = Problem(header)
+    if header.get('EDGE_WEIGHT_TYPE') == 'EXPLICIT':
+        if numbers is None:
+            raise ValueError('No EDGE_WEIGHT_SECTION in {}'.format(path))
+        problem.weights = _matrix(numbers, n,
+                                  header.get('EDGE_WEIGHT_FORMAT'), path)
+        if display is not None:
+            problem.display = _coordinates(display, n, path)
+    else:
+        if coords is None:
+            raise ValueError('No NODE_COORD_SECTION in {}'.format(path))
+        problem.coords = _coordinates(coords, n, path)
+    return problem
+
+
+def read_tour(path):
+    """Read the first tour of a TSPLIB ``.tour`` file.
+
+    :param str path: the path of the file
+    :return: the node IDs of the tour, counted from 0
+    :rtype: :class:`ndarray`
+    """
+    with open(path) as f:
+        parser = _Parser(f)
+        for key, value in parser.keywords():
+            if key == 'TOUR_SECTION' and value is None:
+                ids = parser.numbers().astype(np.intp)
+                end = np.flatnonzero(ids == -1)
+                if len(end):
+                    ids = ids[:end[0]]
+                return ids - 1
+    raise ValueError('No TOUR_SECTION in {}'.format(path))
+
+
+def write_tour(path, tour, name=None, comment=None):
+    """Write a TSPLIB ``.tour`` file.
+
+    :param str path: the path of the file
+    :param tour: the node IDs of the tour, counted from 0
+    :param str name: the ``NAME`` of the tour (default is the file name)
+    :param str comment: the ``COMMENT`` of the tour (default is None)
+    """
+    tour = np.asarray(tour, dtype=np.intp)
+    header = ['NAME : {}'.format(name or path)]
+    if comment is not None:
+        header.append('COMMENT : {}'.format(comment))
+    header += ['TYPE : TOUR', 'DIMENSION : {}'.format(len(tour)),
+               'TOUR_SECTION']
+    with open(path, 'w') as f:
+        f.write('\n'.join(header) + '\n')
+        f.write('\n'.join(map(str, (tour + 1).tolist())))
+        f.write('\n-1\nEOF\n')
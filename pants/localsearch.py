@@ -0,0 +1,358 @@
+"""
+.. module:: localsearch
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for improving the tours constructed by
+               the ants with local search.
+
+"""
+
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from .world import euclidean
+
+
+def improve(world, tour, time_budget=None, neighbours=10, depth=6):
+    """Return a polished copy of the *tour* and its distance.
+
+    The *tour* is first improved with 2-opt and Or-opt moves, and then with
+    Lin-Kernighan moves of up to *depth* exchanges, which escape many of the
+    local optima of 2-opt. This is meant for a final pass over the best tour
+    found by a :class:`Solver`:
+
+    .. code-block:: python
+
+        best = solver.solve(world)
+        tour, distance = improve(world, best.visited, time_budget=5)
+
+    :param World world: the world of the *tour*
+    :param tour: the node IDs of the tour
+    :param float time_budget: the number of seconds after which the search
+                              stops with the best tour found so far (default
+                              is None, which searches until no move helps)
+    :param int neighbours: the number of nearest nodes of every node that the
+                           moves may connect it to (default=10)
+    :param int depth: the greatest number of exchanges of a Lin-Kernighan
+                      move (default=6)
+    :return: the improved tour and the length of the closed tour
+    :rtype: tuple
+    """
+    search = LocalSearch(('2-opt', 'or-opt', 'lk'), neighbours=neighbours,
+                         depth=depth)
+    return search(world, tour, time_budget=time_budget)
+
+
+class LocalSearch:
+    """Improves tours with 2-opt, Or-opt and Lin-Kernighan moves until no
+    move helps.
+
+    Only moves that connect a node to one of its *neighbours* nearest nodes
+    are tried, and every move is evaluated by the change in length of the
+    few edges it replaces, read from the distance matrix of the
+    :class:`World`. Each node has a don't-look bit: a node whose moves were
+    all tried without success is not looked at again until a move changes
+    one of the edges next to it. A :class:`LocalSearch` can be used on its
+    own or handed to a :class:`Solver`, which then improves the tours of its
+    ants before the pheromone is updated.
+
+    A Lin-Kernighan (``'lk'``) move is a chain of up to *depth* 2-opt
+    exchanges that each reconnect the loose end of the previous one, and is
+    kept at the length of the chain that shortens the tour the most. As these
+    moves are much more expensive, they are only tried once the tour cannot
+    be improved by the other moves:
+
+    .. code-block:: python
+
+        search = LocalSearch(neighbours=10)
+        tour, distance = search(world, tour)
+        solver = Solver(local_search=search, local_search_scope='all')
+
+    .. note::
+
+        The moves assume that the distances are symmetric.
+
+    :param tuple moves: the moves to try, any of ``'2-opt'``, ``'or-opt'``
+                        and ``'lk'`` (default is ``('2-opt', 'or-opt')``)
+    :param int neighbours: the number of nearest nodes of every node that the
+                           moves may connect it to (default=8)
+    :param int segment: the greatest number of consecutive nodes moved by
+                        Or-opt (default=3)
+    :param int depth: the greatest number of exchanges of a Lin-Kernighan
+                      move (default=6)
+    """
+    def __init__(self, moves=('2-opt', 'or-opt'), neighbours=8, segment=3,
+                 depth=6):
+        unknown = set(moves) - {'2-opt', 'or-opt', 'lk'}
+        if unknown:
+            raise ValueError('Unknown moves {}'.format(sorted(unknown)))
+        self.moves = tuple(moves)
+        self.neighbours = neighbours
+        self.segment = segment
+        self.depth = depth
+        self._world = None
+        self._neighbours = None
+
+    def __call__(self, world, tour, time_budget=None):
+        """Return the improved *tour* and its distance.
+
+        :param World world: the world of the *tour*
+        :param tour: the node IDs of the tour
+        :param float time_budget: the number of seconds after which the
+                                  search stops with the best tour found so
+                                  far (default is None)
+        :return: the improved tour and the length of the closed tour
+        :rtype: tuple
+        """
+        search = _Search(world, tour, self.neighbour_lists(world),
+                         self.segment, self.depth)
+        if time_budget is not None:
+            search.deadline = time.perf_counter() + time_budget
+        two_opt, or_opt = '2-opt' in self.moves, 'or-opt' in self.moves
+        if two_opt or or_opt:
+            search.run(two_opt, or_opt)
+        if 'lk' in self.moves:
+            search.wake(*search.tour)
+            search.run(two_opt, or_opt, lk=True)
+        tour = np.array(search.tour, dtype=np.intp)
+        distance = world.distances[tour, np.roll(tour, -1)].sum()
+        return tour, float(distance)
+
+    def neighbour_lists(self, world):
+        """Return the nearest *neighbours* of every node of the *world*.
+
+        The candidate lists of the *world* are used if they are long enough,
+        and otherwise created once and kept for later calls.
+
+        :param World world: the world whose neighbour lists are returned
+        :return: the neighbour lists, nearest first
+        :rtype: list
+        """
+        if self._world is not world:
+            candidates = world.candidates
+            if candidates is None or candidates.shape[1] < self.neighbours:
+                candidates = world.create_candidates(self.neighbours)
+            self._neighbours = candidates[:, :self.neighbours].tolist()
+            self._world = world
+        return self._neighbours
+
+
+class _Search:
+    """The state of a single local search: the tour, the position of every
+    node in it, and the queue of nodes whose don't-look bit is off."""
+    epsilon = 1e-10
+    deadline = None
+
+    def __init__(self, world, tour, neighbours, segment, depth=6):
+        self.length = _length_function(world)
+        self.tour = np.asarray(tour).tolist()
+        self.n = len(self.tour)
+        self.position = [0] * self.n
+        for i, node in enumerate(self.tour):
+            self.position[node] = i
+        self.neighbours = neighbours
+        self.segment = segment
+        self.depth = depth
+        self.queue = deque(self.tour)
+        self.queued = [True] * self.n
+
+    def succ(self, node):
+        return self.tour[(self.position[node] + 1) % self.n]
+
+    def pred(self, node):
+        return self.tour[self.position[node] - 1]
+
+    def wake(self, *nodes):
+        for node in nodes:
+            if not self.queued[node]:
+                self.queued[node] = True
+                self.queue.append(node)
+
+    def run(self, two_opt=True, or_opt=True, lk=False):
+        if self.n < 5:
+            return
+        deadline = self.deadline
+        while self.queue:
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+            a = self.queue.popleft()
+            self.queued[a] = False
+            if (two_opt and self.two_opt(a)) or (or_opt and self.or_opt(a)) \
+                    or (lk and self.lin_kernighan(a)):
+                self.wake(a)
+
+    def two_opt(self, a):
+        """Try to replace an edge at *a* and an edge at one of its
+        neighbours with the two edges that reconnect the tour."""
+        length = self.length
+        for succ in (True, False):
+            b = self.succ(a) if succ else self.pred(a)
+            ab = length(a, b)
+            for c in self.neighbours[a]:
+                ac = length(a, c)
+                if ac >= ab:
+                    break
+                d = self.succ(c) if succ else self.pred(c)
+                if c == b or d == a:
+                    continue
+                delta = ac + length(b, d) - ab - length(c, d)
+                if delta < -self.epsilon:
+                    if succ:
+                        self.reverse(self.position[b], self.position[c])
+                    else:
+                        self.reverse(self.position[c], self.position[b])
+                    self.wake(b, c, d)
+                    return True
+        return False
+
+    def or_opt(self, a):
+        """Try to move the segment of up to *segment* nodes that starts at
+        *a* between two neighbouring nodes of either of its ends."""
+        length = self.length
+        first = a
+        for size in range(1, min(self.segment, self.n - 3) + 1):
+            last = self.tour[(self.position[first] + size - 1) % self.n]
+            p, nx = self.pred(first), self.succ(last)
+            inside = set(self.tour[(self.position[first] + i) % self.n]
+                         for i in range(size))
+            gain = length(p, first) + length(last, nx) - length(p, nx)
+            if gain <= self.epsilon:
+                continue
+            for end in (first, last):
+                other = last if end == first else first
+                for c in self.neighbours[end]:
+                    ec = length(end, c)
+                    if ec >= gain:
+                        break
+                    if c in inside:
+                        continue
+                    for x, y in ((c, self.succ(c)), (self.pred(c), c)):
+                        if x in inside or y in inside:
+                            continue
+                        far = y if x == c else x
+                        delta = (ec + length(other, far) - length(x, y) -
+                                 gain)
+                        if delta < -self.epsilon:
+                            # The segment runs from x to y with *end* next
+                            # to c, so it is reversed if *end* comes last.
+                            reverse = (end == first) != (x == c)
+                            self.move(first, size, x, reverse)
+                            self.wake(p, nx, first, last, x, y)
+                            return True
+        return False
+
+    def lin_kernighan(self, t1):
+        """Try a chain of up to *depth* exchanges that starts by removing an
+        edge at *t1* and keeps *t1* as the fixed end of the open path."""
+        length = self.length
+        for t2 in (self.succ(t1), self.pred(t1)):
+            gain = length(t1, t2)
+            added, removed = set(), {_edge(t1, t2)}
+            moves, best, kept = [], self.epsilon, 0
+            while len(moves) < self.depth:
+                forward = self.succ(t1) == t2
+                choice, open_gain = None, self.epsilon
+                for t3 in self.neighbours[t2]:
+                    g = gain - length(t2, t3)
+                    if g <= self.epsilon:
+                        break
+                    t4 = self.pred(t3) if forward else self.succ(t3)
+                    if t3 == t1 or t4 == t2 or _edge(t2, t3) in removed or \
+                            _edge(t3, t4) in added:
+                        continue
+                    g += length(t3, t4)
+                    if g > open_gain:
+                        choice, open_gain = (t3, t4), g
+                if choice is None:
+                    break
+                t3, t4 = choice
+                self.exchange(t1, t2, t3, t4)
+                moves.append((t2, t3, t4))
+                added.add(_edge(t2, t3))
+                removed.add(_edge(t3, t4))
+                gain = open_gain
+                closed = gain - length(t4, t1)
+                if closed > best:
+                    best, kept = closed, len(moves)
+                t2 = t4
+            for t2, t3, t4 in reversed(moves[kept:]):
+                self.exchange(t1, t4, t3, t2)
+            if kept:
+                for move in moves[:kept]:
+                    self.wake(*move)
+                return True
+        return False
+
+    def exchange(self, t1, t2, t3, t4):
+        """Replace the edges (t1, t2) and (t4, t3) with (t2, t3) and (t1, t4),
+        where *t2* follows *t1* and *t3* follows *t4* in the same direction.
+        """
+        if self.succ(t1) == t2:
+            self.reverse(self.position[t2], self.position[t4])
+        else:
+            self.reverse(self.position[t4], self.position[t2])
+
+    def reverse(self, i, j):
+        """Reverse the part of the tour from position *i* forward to *j*,
+        or the rest of the tour instead if that is shorter."""
+        n = self.n
+        size = (j - i) % n + 1
+        if 2 * size > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            size = n - size
+        tour, position = self.tour, self.position
+        if i + size <= n:
+            tour[i:i + size] = tour[i:i + size][::-1]
+            for k in range(i, i + size):
+                position[tour[k]] = k
+            return
+        for _ in range(size // 2):
+            tour[i], tour[j] = tour[j], tour[i]
+            position[tour[i]] = i
+            position[tour[j]] = j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    def move(self, first, size, x, reverse):
+        """Move the *size* nodes starting at *first* right after *x*."""
+        tour, position = self.tour, self.position
+        i = position[first]
+        if i + size > self.n:
+            # Rotate the tour so that the segment does not wrap around.
+            tour[:] = tour[i:] + tour[:i]
+            for j, node in enumerate(tour):
+                position[node] = j
+            i = 0
+        segment = tour[i:i + size]
+        if reverse:
+            segment.reverse()
+        k = position[x]
+        if k > i:
+            tour[i:k + 1] = tour[i + size:k + 1] + segment
+            lo, hi = i, k + 1
+        else:
+            tour[k + 1:i + size] = segment + tour[k + 1:i]
+            lo, hi = k + 1, i + size
+        for j in range(lo, hi):
+            position[tour[j]] = j
+
+
+def _edge(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+def _length_function(world):
+    distances = world.distances
+    if isinstance(distances, np.ndarray):
+        return distances.item
+    if world.lfunc is None:
+        # Looking up single lengths in a sparse matrix is slow, so compute
+        # them from the coordinates, just as the matrix was.
+        if world.metric is not euclidean:
+            metric, coords = world.metric, world.coords
+            return lambda a, b: float(metric(coords[a], coords[b]))
+        xs, ys = world.coords.T.tolist()
+        return lambda a, b: math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+    return lambda a, b: float(distances[a, b])
@@ -0,0 +1,230 @@
+"""
+.. module:: multicolony
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for solving a world with several
+               independent colonies that exchange their best solutions.
+
+"""
+
+import multiprocessing
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from .ant import Ant
+from .solver import Solver, CancellationToken
+
+
+class MultiColonySolver:
+    """This class solves a :class:`World` with an island model of colonies.
+
+    Several independent :class:`Solver`\\s, the islands, each solve their own
+    copy of the :class:`World` in a separate process, and thus keep their own
+    pheromone. Every *migration* iterations, the best solution of each island
+    is sent to its neighbours according to the *topology*: with ``'ring'``
+    each island receives the best solution of the previous island, and with
+    ``'full'`` each island receives the best solution of all other islands.
+    An island adopts a received solution as its global best if it is shorter
+    than its own, so that it is reinforced by the elite :class:`Ant`.
+
+    All keyword arguments not listed below are passed on to every
+    :class:`Solver`. The *params* of a colony override them for that colony
+    only, so the islands may also search with different *alpha*, *beta* or
+    *rho*:
+
+    .. code-block:: python
+
+        solver = MultiColonySolver(colonies=3, migration=10, limit=200,
+                                   params=[dict(beta=2), dict(beta=3),
+                                           dict(beta=5)])
+        best = solver.solve(world)
+
+    Every island checks :func:`Solver.should_stop` before each of its
+    iterations, so its own *limit*, *time_limit*, *max_stall_iterations* and
+    *target_length* end its search. The whole search ends once every island
+    has stopped, once any island reaches the *target_length*, or once it is
+    cancelled with :func:`stop` or the *cancel* token, which are checked at
+    every exchange.
+
+    :param int colonies: the number of colonies (default=4)
+    :param int migration: the number of iterations between two exchanges of
+                          the best solutions (default=10)
+    :param str topology: ``'ring'`` or ``'full'`` (default is ``'ring'``)
+    :param list params: the keyword arguments of each colony's
+                        :class:`Solver` (default is None)
+    :param int seed: seed from which the seeds of the colonies are derived
+                     (default is None)
+    :param cancel: the :class:`~pants.solver.CancellationToken` that stops
+                   the search (default is None, which creates a token that
+                   :func:`stop` cancels)
+    """
+    topologies = ('ring', 'full')
+
+    #: The number of seconds an island is given to exit once the search
+    #: ends, after which it is terminated.
+    join_timeout = 5
+
+    def __init__(self, **kwargs):
+        self.colonies = kwargs.pop('colonies', 4)
+        self.migration = kwargs.pop('migration', 10)
+        self.topology = kwargs.pop('topology', 'ring')
+        self.params = kwargs.pop('params', None) or [{}] * self.colonies
+        if self.topology not in self.topologies:
+            raise ValueError('Unknown topology {!r}'.format(self.topology))
+        if len(self.params) != self.colonies:
+            raise ValueError('Expected params for {} colonies, got {}'.format(
+                self.colonies, len(self.params)))
+        self.cancel = kwargs.pop('cancel', None)
+        self.token = self.cancel or CancellationToken()
+        self.stop_reason = None
+        seeds = np.random.SeedSequence(kwargs.pop('seed', None)).spawn(
+            self.colonies)
+        self.solvers = []
+        for seed, params in zip(seeds, self.params):
+            options = dict(kwargs, seed=seed)
+            options.update(params)
+            self.solvers.append(Solver(**options))
+
+    def solve(self, world):
+        """Return the single shortest path found through the given *world*.
+
+        :param World world: the :class:`World` to solve
+        :return: the single best solution found by any colony
+        :rtype: :class:`Ant`
+        """
+        best = None
+        for best in self.solutions(world):
+            pass
+        return best
+
+    def solutions(self, world):
+        """Return successively shorter paths through the given *world*.
+
+        Each island sends every improvement of its best solution as soon as
+        it is found, and each one is returned if it is shorter than every
+        solution returned before it, so the solutions arrive as they would
+        from :func:`Solver.solutions` rather than once per exchange.
+
+        :param World world: the :class:`World` to solve
+        :return: successively shorter solutions as :class:`Ant`\\s
+        :rtype: list
+        """
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in methods else None)
+        pipes, islands = [], []
+        for solver in self.solvers:
+            parent, child = context.Pipe()
+            island = context.Process(target=_island,
+                                     args=(child, world, solver), daemon=True)
+            island.start()
+            child.close()
+            pipes.append(parent)
+            islands.append(island)
+
+        best = None
+        migrants = [[] for _ in islands]
+        if self.stop_reason is not None and self.cancel is None:
+            self.token.reset()
+        self.stop_reason = 'cancelled' if self.token.cancelled else None
+        try:
+            while self.stop_reason is None:
+                for pipe, incoming in zip(pipes, migrants):
+                    pipe.send((self.migration, incoming))
+                results = [None] * len(pipes)
+                pending = dict(zip(pipes, range(len(pipes))))
+                while pending:
+                    for pipe in wait(list(pending)):
+                        message = pipe.recv()
+                        if message[0] == 'improved':
+                            _, distance, tour = message
+                            if best is None or distance < best.distance:
+                                ant = Ant().initialize(world,
+                                                       start=int(tour[0]))
+                                best = ant.record(tour, distance)
+                                yield best
+                        else:
+                            results[pending.pop(pipe)] = message[1:]
+                migrants = self.migrate([(tour, distance)
+                                         for tour, distance, _ in results])
+                self.stop_reason = self.should_stop(
+                    [reason for _, _, reason in results])
+        finally:
+            for pipe in pipes:
+                try:
+                    pipe.send(None)
+                except (BrokenPipeError, EOFError, OSError):
+                    # The island has already exited.
+                    pass
+                finally:
+                    pipe.close()
+            for island in islands:
+                island.join(self.join_timeout)
+                if island.is_alive():
+                    island.terminate()
+                    island.join()
+
+    def should_stop(self, reasons):
+        """Return the reason to end the search after an exchange, or None
+        to go on.
+
+        :param list reasons: the :attr:`~Solver.stop_reason` of every island
+        :rtype: str
+        """
+        if self.token.cancelled:
+            return 'cancelled'
+        if 'target' in reasons:
+            return 'target'
+        if all(reasons):
+            # Report the reason of most islands, such as 'limit'.
+            return max(reasons, key=reasons.count)
+        return None
+
+    def stop(self):
+        """Stop the running search at the next exchange.
+
+        This may be called from any thread.
+        """
+        self.token.cancel()
+
+    def migrate(self, bests):
+        """Return the solutions each colony receives from the others.
+
+        :param list bests: the best (tour, distance) of every colony
+        :return: the list of (tour, distance) received by every colony
+        :rtype: list
+        """
+        if self.topology == 'ring':
+            return [[bests[i - 1]] for i in range(len(bests))]
+        return [[min((b for j, b in enumerate(bests) if j != i),
+                     key=lambda best: best[1])]
+                for i in range(len(bests))]
+
+
+def _island(pipe, world, solver):
+    solver.initialize(world)
+    try:
+        while True:
+            task = pipe.recv()
+            if task is None:
+                break
+            iterations, migrants = task
+            for tour, distance in migrants:
+                solver.adopt(tour, distance)
+            for _ in range(iterations):
+                # Every island reports a best solution, so it runs at least
+                # one iteration.
+                if solver.global_best is not None and solver.should_stop():
+                    break
+                if solver.step():
+                    best = solver.global_best
+                    pipe.send(('improved', best.distance, best.ids.copy()))
+            best = solver.global_best
+            pipe.send(('done', best.ids.copy(), best.distance,
+                       solver.should_stop() and solver.stop_reason))
+    except (BrokenPipeError, EOFError):
+        # The search has ended without waiting for this island.
+        pass
+    finally:
+        solver.close()
+        pipe.close()
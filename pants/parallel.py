@@ -0,0 +1,260 @@
+"""
+.. module:: parallel
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for constructing the tours of a colony
+               in several processes.
+
+"""
+
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .colony import Colony
+from .world import SparseMatrix
+
+
+class SharedArray(np.ndarray):
+    """A :class:`numpy.ndarray` that lives in shared memory.
+
+    Pickling a :class:`SharedArray` only records the name of its shared
+    memory block, so sending one to another process is cheap and the other
+    process sees every later change made to it in place. Views and results
+    of operations on it are ordinary copies when pickled.
+
+    :param tuple shape: the shape of the array
+    :param dtype: the type of the elements
+    :param str name: the name of an existing shared memory block to attach
+                     to (default is None, which creates a new block)
+    """
+    def __new__(cls, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        if name is None:
+            size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            shm = _attach(name)
+        array = super().__new__(cls, shape, dtype, buffer=shm.buf)
+        array.shm = shm
+        return array
+
+    def __array_finalize__(self, obj):
+        self.shm = None
+
+    def __reduce__(self):
+        if self.shm is None:
+            return np.array, (np.asarray(self),)
+        return SharedArray, (self.shape, self.dtype.str, self.shm.name)
+
+    @classmethod
+    def copy_of(cls, array):
+        """Return a new :class:`SharedArray` holding a copy of *array*."""
+        shared = cls(array.shape, array.dtype)
+        shared[...] = array
+        return shared
+
+    def unlink(self):
+        """Free the shared memory block once every process let go of it."""
+        self.shm.unlink()
+
+
+class MappedArray(np.memmap):
+    """A read-only :class:`numpy.memmap` of a file.
+
+    Pickling a :class:`MappedArray` only records the name of its file and
+    its layout, so another process maps the same file instead of receiving
+    a copy of its contents. Views of it are ordinary copies when pickled.
+    """
+    @classmethod
+    def open(cls, filename, dtype, shape, offset=0, order='C'):
+        """Map the file at *filename* read-only.
+
+        :param str filename: the path of the file
+        :param dtype: the type of the elements
+        :param tuple shape: the shape of the array
+        :param int offset: the position of the first element in the file
+                           (default=0)
+        :param str order: ``'C'`` or ``'F'`` (default is ``'C'``)
+        :rtype: :class:`MappedArray`
+        """
+        array = np.memmap.__new__(cls, filename, dtype=dtype, mode='r',
+                                  offset=offset, shape=shape, order=order)
+        array.layout = (filename, np.dtype(dtype).str, tuple(shape), offset,
+                        order)
+        return array
+
+    @classmethod
+    def of(cls, matrix):
+        """Map the file that backs the memory-mapped *matrix* read-only.
+
+        Changes made to *matrix* that were not written to its file, such as
+        those to a copy-on-write mapping, are not seen.
+
+        :param numpy.memmap matrix: a memory-mapped matrix with a file name
+        :rtype: :class:`MappedArray`
+        """
+        order = 'F' if matrix.flags.f_contiguous and \
+            not matrix.flags.c_contiguous else 'C'
+        return cls.open(matrix.filename, matrix.dtype, matrix.shape,
+                        matrix.offset, order)
+
+    def __array_finalize__(self, obj):
+        super().__array_finalize__(obj)
+        self.layout = None
+
+    def __reduce__(self):
+        if self.layout is None:
+            return np.array, (np.asarray(self),)
+        return MappedArray.open, self.layout
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13, attaching registers the block with the resource
+        # tracker, which would unlink it when this process exits.
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class ParallelColony:
+    """Constructs the tours of a colony in a pool of worker processes.
+
+    The colony is split into one :class:`~pants.colony.Colony` per worker.
+    When the pool starts, every worker receives a copy of the
+    :class:`World` whose distance and pheromone matrices are
+    :class:`SharedArray`\\s, so that they are never pickled again. Distances
+    kept in a file (see the *storage* of :class:`World`) are instead mapped
+    read-only from that file by every worker as a :class:`MappedArray`, so
+    they are never copied at all. Before
+    each construction the pheromone of the world is copied into the shared
+    matrix, every worker computes its choice info from it and builds the
+    tours of its share of the ants, and only the tours (as ``int32``) and
+    their distances are sent back.
+
+    .. code-block:: python
+
+        with ParallelColony(world, 4, alpha=1, beta=3) as colony:
+            tours, distances = colony.construct(starts)
+
+    :param World world: the world to solve
+    :param int workers: the number of worker processes
+    :param float alpha: the relative importance of pheromone (default=1)
+    :param float beta: the relative importance of distance (default=3)
+    :param rng: the random generator that seeds the workers (default is a
+                new :func:`numpy.random.default_rng`)
+    :param float q0: the probability that an ant takes the best move
+                     (default=0)
+    """
+    def __init__(self, world, workers, alpha=1, beta=3, rng=None, q0=0):
+        self.world = world
+        self.workers = workers
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.shared = []
+        clone = copy.copy(world)
+        clone.edges = None
+        clone.distances = self.share(world.distances, readonly=True)
+        clone.pheromone = self.share(world.pheromone)
+        if isinstance(clone.distances, SparseMatrix):
+            clone.distances.default = clone.compute_lengths
+        self.distances = clone.distances
+        self.pheromone = clone.pheromone
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in methods else None)
+        self.pool = ProcessPoolExecutor(workers, mp_context=context,
+                                        initializer=_initialize,
+                                        initargs=(clone, alpha, beta, q0))
+
+    def share(self, matrix, readonly=False):
+        """Return a copy of *matrix* whose arrays live in shared memory.
+
+        :param matrix: the matrix to share
+        :param bool readonly: ``True`` if the workers only read the matrix,
+                              in which case a matrix memory-mapped from a
+                              named file is mapped from that file again
+                              rather than copied (default is ``False``)
+        """
+        if readonly and isinstance(matrix, np.memmap) and \
+                matrix.filename is not None:
+            return MappedArray.of(matrix)
+        if isinstance(matrix, SparseMatrix):
+            shared = matrix.copy()
+            for name in ('indptr', 'indices', 'data', '_keys', '_slots'):
+                setattr(shared, name, self.share(getattr(matrix, name)))
+            return shared
+        shared = SharedArray.copy_of(matrix)
+        self.shared.append(shared)
+        return shared
+
+    def construct(self, starts):
+        """Let every ant complete a tour starting at its node in *starts*.
+
+        :param list starts: the starting node ID of every ant
+        :return: the (ants x nodes) tours and the distance of each tour,
+                 including the move back to the start
+        :rtype: tuple
+        """
+        pheromone = self.world.pheromone
+        if isinstance(pheromone, SparseMatrix):
+            self.pheromone.data[...] = pheromone.data
+            level = pheromone.default
+        else:
+            self.pheromone[...] = pheromone
+            level = None
+        chunks = [chunk for chunk in np.array_split(np.asarray(starts),
+                                                    self.workers) if len(chunk)]
+        seeds = self.rng.integers(2 ** 63, size=len(chunks))
+        results = list(self.pool.map(_construct, chunks, seeds,
+                                     [level] * len(chunks)))
+        tours = np.concatenate([tours for tours, _ in results])
+        distances = np.concatenate([distances for _, distances in results])
+        return tours, distances
+
+    def close(self):
+        """Shut the worker processes down and free the shared memory."""
+        self.pool.shutdown()
+        for shared in self.shared:
+            shared.unlink()
+        self.shared = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_worker = {}
+
+
+def _initialize(world, alpha, beta, q0):
+    _worker['world'] = world
+    _worker['alpha'] = alpha
+    _worker['beta'] = beta
+    _worker['q0'] = q0
+    _worker['heuristic'] = world.heuristic(beta)
+    _worker['choice'] = None
+    _worker['colonies'] = {}
+
+
+def _construct(starts, seed, level):
+    world = _worker['world']
+    if level is not None:
+        world.pheromone.default = level
+    choice = _worker['choice'] = world.choice_info(
+        _worker['alpha'], _worker['heuristic'], out=_worker['choice'])
+    colony = _worker['colonies'].get(len(starts))
+    if colony is None:
+        colony = _worker['colonies'][len(starts)] = Colony(
+            world, len(starts), _worker['alpha'], _worker['beta'],
+            q0=_worker['q0'])
+    colony.rng = np.random.default_rng(seed)
+    tours, distances = colony.construct(starts, choice)
+    return tours.astype(np.int32), distances.copy()
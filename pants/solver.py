@@ -8,11 +8,54 @@
 
 """
 
+import json
+import os
 import random
+import tempfile
+import threading
+import time
 from copy import copy
 
-from .world import World
+import numpy as np
+
+from .world import World, SparseMatrix
 from .ant import Ant
+from .colony import Colony
+from .localsearch import improve
+from .stats import SolverStats
+
+class CancellationToken:
+    """A flag that asks one or more :class:`Solver`\s to stop.
+
+    A :class:`Solver` checks its token between iterations, so calling
+    :func:`cancel` from any thread stops it at the end of the current
+    iteration, after which it returns the best solution found so far. One
+    token may be shared by several solvers to stop them all at once:
+
+    .. code-block:: python
+
+        token = CancellationToken()
+        solver = Solver(cancel=token)
+        threading.Timer(2.0, token.cancel).start()
+        best = solver.solve(world)
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Ask every :class:`Solver` using this token to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """``True`` once :func:`cancel` has been called."""
+        return self._event.is_set()
+
+    def reset(self):
+        """Clear the request to stop, so that the token can stop another
+        run."""
+        self._event.clear()
+
 
 class Solver:
     """This class contains the functionality for finding one or more solutions
@@ -30,7 +73,76 @@ class Solver:
                             (default=10)
     :param float elite: multiplier of the pheromone deposited by the elite
                         :class:`Ant` (default=0.5)
+    :param int seed: seed of the random generator used to construct the tours
+                     (default is None)
+    :param int workers: number of processes that construct the tours of each
+                        iteration in parallel (default=1, which constructs
+                        them in this process)
+    :param callable local_search: improves a tour before the pheromone is
+                                  updated, such as a
+                                  :class:`~pants.localsearch.LocalSearch`
+                                  (default is None)
+    :param str local_search_scope: ``'best'`` to improve only the best tour
+                                   of each iteration, or ``'all'`` to improve
+                                   the tour of every :class:`Ant`
+                                   (default is ``'best'``)
+    :param polish: ``True`` to polish the global best solution with
+                   :func:`~pants.localsearch.improve` once the iterations
+                   are done, or the number of seconds to spend polishing it
+                   (default is ``False``)
+    :param str mode: ``'as'`` for the Ant System, in which the better half of
+                     the :class:`Ant`\s and the elite :class:`Ant` deposit
+                     pheromone, ``'mmas'`` for the MAX-MIN Ant System or
+                     ``'acs'`` for the Ant Colony System (default is
+                     ``'as'``); the MAX-MIN Ant System works best with a much
+                     lower *rho*, such as 0.02, and the Ant Colony System
+                     with *rho* around 0.1 and fewer :class:`Ant`\s
+    :param float p_best: the probability that a converged MAX-MIN colony
+                         constructs the best tour again, which sets the ratio
+                         of the pheromone bounds (default=0.05)
+    :param int gb_every: the number of iterations between two deposits of the
+                         global best solution in the MAX-MIN Ant System, in
+                         between which the iteration best solution deposits
+                         (default is None, which deposits it more often as
+                         the search goes on)
+    :param int stagnation: the number of iterations without improvement after
+                           which the MAX-MIN Ant System reinitializes the
+                           pheromone (default=50)
+    :param float min_branching: the mean lambda-branching factor below which
+                                the MAX-MIN Ant System also reinitializes the
+                                pheromone (default is None, which does not
+                                check it)
+    :param float q0: the probability that an :class:`Ant` of the Ant Colony
+                     System takes the best move instead of a random one
+                     (default=0.9)
+    :param float xi: the fraction of pheromone that decays from an edge
+                     each time an :class:`Ant` of the Ant Colony System
+                     takes it, see :func:`local_update` (default=0.1)
+    :param float time_limit: the number of seconds after which no new
+                             iteration is started (default is None)
+    :param int max_stall_iterations: the number of iterations without
+                                     improvement after which the search stops
+                                     (default is None)
+    :param float target_length: the distance at or below which the search
+                                stops (default is None)
+    :param cancel: the :class:`CancellationToken` that stops the search
+                   (default is None, which creates a token of this
+                   :class:`Solver` that :func:`stop` cancels)
+    :param str checkpoint: the path of the file that the state of the search
+                           is saved to, see :func:`save_checkpoint` (default
+                           is None, which saves no checkpoints)
+    :param int checkpoint_every: the number of iterations between two
+                                 checkpoints; a checkpoint is also saved when
+                                 the search stops (default=10)
+    :param bool stats: ``True`` to time every phase of the iterations and
+                       count the work done in :attr:`stats` (default is
+                       ``False``, which costs nothing)
+    :param int profile: the number of iterations to run under
+                        :mod:`cProfile` and :mod:`tracemalloc`, which also
+                        enables *stats* (default=0)
     """
+    modes = ('as', 'mmas', 'acs')
+
     def __init__(self, **kwargs):
         self.alpha = kwargs.get('alpha', 1)
         self.beta = kwargs.get('beta', 3)
@@ -40,6 +152,77 @@ class Solver:
         self.limit = kwargs.get('limit', 100)
         self.ant_count = kwargs.get('ant_count', 10)
         self.elite = kwargs.get('elite', .5)
+        self.seed = kwargs.get('seed', None)
+        self.rng = np.random.default_rng(self.seed)
+        self.workers = kwargs.get('workers', 1)
+        self.local_search = kwargs.get('local_search', None)
+        self.local_search_scope = kwargs.get('local_search_scope', 'best')
+        if self.local_search_scope not in ('best', 'all'):
+            raise ValueError('Unknown local search scope {!r}'.format(
+                self.local_search_scope))
+        self.polish = kwargs.get('polish', False)
+        self.mode = kwargs.get('mode', 'as')
+        if self.mode not in self.modes:
+            raise ValueError('Unknown mode {!r}'.format(self.mode))
+        self.p_best = kwargs.get('p_best', .05)
+        self.gb_every = kwargs.get('gb_every', None)
+        self.stagnation = kwargs.get('stagnation', 50)
+        self.min_branching = kwargs.get('min_branching', None)
+        self.q0 = kwargs.get('q0', .9)
+        self.xi = kwargs.get('xi', .1)
+        self.time_limit = kwargs.get('time_limit', None)
+        self.max_stall_iterations = kwargs.get('max_stall_iterations', None)
+        self.target_length = kwargs.get('target_length', None)
+        self.cancel = kwargs.get('cancel', None)
+        self.checkpoint = kwargs.get('checkpoint', None)
+        self.checkpoint_every = kwargs.get('checkpoint_every', 10)
+        self.token = self.cancel or CancellationToken()
+        self.started = None
+        self.stop_reason = None
+        self.tau_max = None
+        self.tau_min = None
+        self.stall = 0
+        self.restarts = 0
+        self.since_restart = 0
+        self.world = None
+        self.ants = None
+        self.global_best = None
+        self.iteration = 0
+        self.colony = None
+        self.pool = None
+        self.heuristic = None
+        self.choice_info = None
+        self._heuristic_of = None
+        self._choice_of = None
+        profile = kwargs.get('profile', 0)
+        self.stats = None
+        if kwargs.get('stats', False) or profile:
+            self.stats = SolverStats(profile)
+            self.stats.attach(self)
+
+    #: The keyword arguments that :func:`parameters` returns.
+    parameter_names = (
+        'alpha', 'beta', 'rho', 'Q', 't0', 'limit', 'ant_count', 'elite',
+        'seed', 'workers', 'local_search_scope', 'polish', 'mode', 'p_best',
+        'gb_every', 'stagnation', 'min_branching', 'q0', 'xi', 'time_limit',
+        'max_stall_iterations', 'target_length', 'checkpoint_every')
+
+    def parameters(self):
+        """Return the keyword arguments that create an equivalent
+        :class:`Solver`.
+
+        Only parameters with plain values are returned, so the
+        *local_search*, the *cancel* token and the *checkpoint* path are
+        left out, as is a *seed* that is not an integer. So are *stats* and
+        *profile*, which do not change the search.
+
+        :rtype: dict
+        """
+        params = {name: getattr(self, 'q' if name == 'Q' else name)
+                  for name in self.parameter_names}
+        if not isinstance(params['seed'], (int, type(None))):
+            params['seed'] = None
+        return params
         
     def create_colony(self, world):
         """Create a set of :class:`Ant`\s and initialize them to the given 
@@ -66,19 +249,26 @@ class Solver:
         Essentially, this method re-initializes all :class:`Ant`\s in the
         colony to the :class:`World` that they were initialized to last.
         Internally, this method is called after each iteration of the
-        :class:`Solver`.
+        :class:`Solver`. New starting nodes are drawn at random from the
+        random generator of the :class:`Solver`. The :class:`Ant`\s keep
+        their tour buffers, so nothing is allocated.
         
         :param list colony: the :class:`Ant`\s to reset
         """
-        for ant in colony:
-            ant.initialize(ant.world)
+        if not colony:
+            return
+        world = colony[0].world
+        starts = self.rng.integers(len(world.nodes), size=len(colony))
+        for ant, start in zip(colony, starts.tolist()):
+            ant.initialize(world, start=start)
         
     def aco(self, colony, world):
         """Return the best solution by performing the ACO meta-heuristic.
         
         This method lets every :class:`Ant` in the colony find a solution,
-        updates the pheromone levels according to the solutions found, and
-        returns the `Ant` with the best solution.
+        improves the solutions with the *local_search*, if any, updates the
+        pheromone levels according to the solutions found, and returns the
+        `Ant` with the best solution.
         
         This method is not meant to be called directly. Instead, call either
         :func:`solve` or :func:`solutions`.
@@ -88,49 +278,428 @@ class Solver:
         :rtype: :class:`Ant`
         """
         self.find_solutions(colony)
+        self.improve_solutions(colony)
+        local_best = self.iteration_best(colony)
+        if self.mode == 'acs':
+            self.best_update(local_best)
+            return local_best
         self.evaporate_pheromone_matrix(world)
-        self.global_update(colony)
-        return sorted(colony)[0]
+        if self.mode == 'mmas':
+            self.bounded_update(local_best)
+        else:
+            self.global_update(colony)
+        return local_best
         
+    def initialize(self, world):
+        """Prepare to solve the given *world* from scratch.
+
+        The pheromone of the *world* is reset to *t0*, the colony of
+        :class:`Ant`\s is created, and the global best solution and the
+        iteration counter are cleared. If a previous run has ended, the token
+        of the :class:`Solver` is :func:`~CancellationToken.reset`, while a
+        :func:`stop` made before the first run stops it at once. :func:`solve` and :func:`solutions`
+        call this method themselves; it only needs to be called directly
+        before driving the :class:`Solver` one :func:`step` at a time.
+
+        :param World world: the :class:`World` to solve
+        :return: `self`
+        :rtype: :class:`Solver`
+        """
+        world.reset_pheromone(self.t0)
+        self.world = world
+        if self.stop_reason is not None and self.cancel is None:
+            # The previous run has ended, so a stop() it received must not
+            # stop this one as well. A stop() made before the first run is
+            # kept.
+            self.token.reset()
+        self.started = time.perf_counter()
+        self.stop_reason = None
+        self.update_choice_info(world)
+        self.global_best = None
+        self.iteration = 0
+        self.tau_max = None
+        self.tau_min = None
+        self.stall = 0
+        self.restarts = 0
+        self.since_restart = 0
+        self.ants = self.create_colony(world)
+        if self.stats is not None:
+            self.stats.reset()
+        return self
+
+    def step(self):
+        """Perform a single iteration of the ACO meta-heuristic.
+
+        :return: ``True`` if the iteration improved the global best solution
+        :rtype: bool
+        """
+        self.reset_colony(self.ants)
+        local_best = self.aco(self.ants, self.world)
+        improved = self.global_best is None or local_best < self.global_best
+        if improved:
+            self.global_best = copy(local_best)
+            self.stall = 0
+        else:
+            self.stall += 1
+        self.since_restart += 1
+        if self.mode == 'mmas':
+            if self.stagnated():
+                self.restart()
+        elif self.mode == 'as':
+            self.trace_elite(self.global_best)
+        self.update_choice_info(self.world)
+        self.iteration += 1
+        return improved
+
+    def advance(self):
+        """Perform a single :func:`step`, and save a checkpoint if one is
+        due.
+
+        :return: ``True`` if the iteration improved the global best solution
+        :rtype: bool
+        """
+        improved = self.step()
+        if self.checkpoint is not None and \
+                self.iteration % self.checkpoint_every == 0:
+            self.save_checkpoint(self.checkpoint)
+        return improved
+
+    def adopt(self, tour, distance):
+        """Make a *tour* found elsewhere the global best, if it is shorter.
+
+        :param tour: the node IDs of the tour
+        :param float distance: the length of the closed tour
+        :return: ``True`` if the *tour* became the global best solution
+        :rtype: bool
+        """
+        if self.global_best is not None and \
+                self.global_best.distance <= distance:
+            return False
+        ant = Ant(self.alpha, self.beta).initialize(self.world, start=tour[0])
+        self.global_best = ant.record(tour, distance)
+        return True
+
     def solve(self, world):
         """Return the single shortest path found through the given *world*.
 
+        The search stops after *limit* iterations, or earlier once one of
+        the other stopping criteria is met (see :func:`should_stop`). If it
+        is interrupted by a :exc:`KeyboardInterrupt`, the best solution found
+        so far is returned all the same. The reason the search stopped is
+        kept in :attr:`stop_reason`.
+
         :param World world: the :class:`World` to solve
         :return: the single best solution found
         :rtype: :class:`Ant`
         """
-        world.reset_pheromone(self.t0)
-        global_best = None
-        colony = self.create_colony(world)
-        for i in range(self.limit):
-            self.reset_colony(colony)
-            local_best = self.aco(colony, world)
-            if global_best is None or local_best < global_best:
-                global_best = copy(local_best)
-            self.trace_elite(global_best)
-        return global_best
-    
+        return self.finish(self.solutions(world))
+
+    def finish(self, solutions):
+        """Exhaust the *solutions* and return the best one.
+
+        :param solutions: the iterator returned by :func:`solutions` or
+                          :func:`run`
+        :return: the single best solution found
+        :rtype: :class:`Ant`
+        """
+        try:
+            for _ in solutions:
+                pass
+        except KeyboardInterrupt:
+            self.stop_reason = 'interrupted'
+        return self.global_best
+
+    def save_checkpoint(self, path):
+        """Save the state of the search to the file at *path*.
+
+        The file is a ``.npz`` archive holding the pheromone matrix (only its
+        stored entries and default level for a sparse world), the global
+        best tour and its distance, the iteration counters, the state of the
+        random generator, and the :func:`parameters`. It is written to a
+        temporary file first, which then replaces *path*, so that a run that
+        is killed while saving leaves the previous checkpoint intact.
+
+        :param str path: the path of the checkpoint file
+        """
+        pheromone = self.world.pheromone
+        if isinstance(pheromone, SparseMatrix):
+            level = pheromone.default
+            pheromone = pheromone.data
+        else:
+            level = np.nan
+        best = self.global_best
+        state = {
+            'iteration': self.iteration,
+            'stall': self.stall,
+            'restarts': self.restarts,
+            'since_restart': self.since_restart,
+            'tau_max': self.tau_max,
+            'tau_min': self.tau_min,
+            'elapsed': self.elapsed(),
+            'nodes': len(self.world.nodes),
+            'rng': self.rng.bit_generator.state,
+            'parameters': self.parameters(),
+        }
+        arrays = {
+            'pheromone': pheromone,
+            'level': np.float64(level),
+            'tour': np.asarray([] if best is None else best.ids,
+                               dtype=np.int32),
+            'distance': np.float64(np.nan if best is None else best.distance),
+            'state': np.array(json.dumps(state)),
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    @classmethod
+    def restore(cls, world, path, **kwargs):
+        """Return a :class:`Solver` in the state saved at *path*.
+
+        The :class:`Solver` is created with the saved parameters, updated by
+        any keyword arguments given (such as a larger *limit*, or a
+        *local_search*), and initialized to the *world* with the saved
+        pheromone, global best solution, counters and random generator.
+        :func:`run` then continues the search exactly where it stopped.
+
+        :param World world: the :class:`World` that was being solved
+        :param str path: the path of the checkpoint file
+        :return: the restored :class:`Solver`
+        :rtype: :class:`Solver`
+        """
+        with np.load(path) as data:
+            state = json.loads(str(data['state']))
+            pheromone = data['pheromone']
+            level = float(data['level'])
+            tour = data['tour']
+            distance = float(data['distance'])
+        if state['nodes'] != len(world.nodes):
+            raise ValueError('The checkpoint is for a world of {} nodes, not '
+                             '{}'.format(state['nodes'], len(world.nodes)))
+        params = dict(state['parameters'], checkpoint=path)
+        params.update(kwargs)
+        solver = cls(**params)
+        solver.initialize(world)
+        if isinstance(world.pheromone, SparseMatrix):
+            world.pheromone.data[...] = pheromone
+            world.pheromone.default = level
+        else:
+            world.pheromone[...] = pheromone
+        solver.update_choice_info(world)
+        if len(tour):
+            solver.adopt(tour, distance)
+        for name in ('iteration', 'stall', 'restarts', 'since_restart',
+                     'tau_max', 'tau_min'):
+            setattr(solver, name, state[name])
+        solver.started -= state['elapsed']
+        solver.rng.bit_generator.state = state['rng']
+        return solver
+
+    @classmethod
+    def resume(cls, world, path, **kwargs):
+        """Continue the search saved at *path* and return the single
+        shortest path found.
+
+        See :func:`restore` for the keyword arguments.
+
+        :param World world: the :class:`World` that was being solved
+        :param str path: the path of the checkpoint file
+        :return: the single best solution found
+        :rtype: :class:`Ant`
+        """
+        solver = cls.restore(world, path, **kwargs)
+        return solver.finish(solver.run())
+
     def solutions(self, world):
         """Return successively shorter paths through the given *world*.
 
         Unlike :func:`solve`, this method returns one solution for each 
-        improvement of the best solution found thus far. 
+        improvement of the best solution found thus far. It may be stopped
+        from another thread with :func:`stop`, in which case it ends after
+        the current iteration.
 
         :param World world: the :class:`World` to solve
         :return: successively shorter solutions as :class:`Ant`\s
         :rtype: list
         """
-        world.reset_pheromone(self.t0)
-        global_best = None
-        colony = self.create_colony(world)
-        for i in range(self.limit):
-            self.reset_colony(colony)
-            local_best = self.aco(colony, world)
-            if global_best is None or local_best < global_best:
-                global_best = copy(local_best)
-                yield global_best
-            self.trace_elite(global_best)
-    
+        self.initialize(world)
+        return self.run()
+
+    def run(self):
+        """Return successively shorter paths from the current state on.
+
+        This continues the search of the :class:`World` that the
+        :class:`Solver` was initialized to or restored for (see
+        :func:`restore`), until one of the stopping criteria is met. If a
+        *checkpoint* path is set, the state is saved every
+        *checkpoint_every* iterations and once more when the search stops.
+
+        :return: successively shorter solutions as :class:`Ant`\s
+        :rtype: list
+        """
+        try:
+            while not self.should_stop():
+                if self.advance():
+                    yield self.global_best
+            if self.polish and self.stop_reason != 'cancelled' and \
+                    self.polish_best():
+                yield self.global_best
+            if self.checkpoint is not None:
+                self.save_checkpoint(self.checkpoint)
+        finally:
+            self.close()
+
+    async def solve_async(self, world, executor=None):
+        """Return the single shortest path found through the given *world*,
+        without blocking the event loop.
+
+        This is the coroutine version of :func:`solve`; see
+        :func:`asolutions`.
+
+        :param World world: the :class:`World` to solve
+        :param executor: the :class:`concurrent.futures.Executor` that runs
+                         the iterations (default is None, which uses the
+                         default executor of the event loop)
+        :return: the single best solution found
+        :rtype: :class:`Ant`
+        """
+        async for _ in self.asolutions(world, executor):
+            pass
+        return self.global_best
+
+    async def asolutions(self, world, executor=None):
+        """Return successively shorter paths through the given *world*,
+        without blocking the event loop.
+
+        This is the asynchronous iterator version of :func:`solutions`. Every
+        iteration runs in the *executor* while the event loop goes on, and
+        each improvement is returned as soon as the iteration that found it
+        is done. Cancelling the task that iterates stops the search at the
+        end of the current iteration. Several solves may run at once, each
+        on its own :class:`World`; sharing an executor with a bounded number
+        of threads bounds the number of iterations that run in parallel:
+
+        .. code-block:: python
+
+            executor = ThreadPoolExecutor(max_workers=4)
+            bests = await asyncio.gather(*(
+                Solver().solve_async(world, executor) for world in worlds))
+
+        :param World world: the :class:`World` to solve
+        :param executor: the :class:`concurrent.futures.Executor` that runs
+                         the iterations, which must run them in this process
+                         (default is None, which uses the default executor
+                         of the event loop)
+        :return: successively shorter solutions as :class:`Ant`\s
+        :rtype: async iterator
+        """
+        # Imported here, where an event loop already runs, so that importing
+        # pants does not import asyncio.
+        import asyncio
+        loop = asyncio.get_running_loop()
+        running = loop.run_in_executor(executor, self.initialize, world)
+        try:
+            await asyncio.shield(running)
+            while not self.should_stop():
+                running = loop.run_in_executor(executor, self.advance)
+                if await asyncio.shield(running):
+                    yield self.global_best
+            if self.polish and self.stop_reason != 'cancelled':
+                running = loop.run_in_executor(executor, self.polish_best)
+                if await asyncio.shield(running):
+                    yield self.global_best
+            if self.checkpoint is not None:
+                running = loop.run_in_executor(executor, self.save_checkpoint,
+                                               self.checkpoint)
+                await asyncio.shield(running)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+        finally:
+            # An iteration that is still running must finish before the
+            # worker processes are shut down.
+            if running.done():
+                self.close()
+            else:
+                running.add_done_callback(lambda _: self.close())
+
+    def should_stop(self):
+        """Return ``True`` if the search should stop before the next
+        iteration, and record the reason in :attr:`stop_reason`.
+
+        The search stops when it is cancelled (see :func:`stop`), after
+        *limit* iterations, after *time_limit* seconds, after
+        *max_stall_iterations* iterations without improvement, or once the
+        global best solution is no longer than *target_length*.
+
+        :rtype: bool
+        """
+        best = self.global_best
+        if self.token.cancelled:
+            self.stop_reason = 'cancelled'
+        elif self.iteration >= self.limit:
+            self.stop_reason = 'limit'
+        elif self.time_limit is not None and \
+                self.elapsed() >= self.time_limit:
+            self.stop_reason = 'time_limit'
+        elif self.max_stall_iterations is not None and \
+                self.stall >= self.max_stall_iterations:
+            self.stop_reason = 'stall'
+        elif self.target_length is not None and best is not None and \
+                best.distance <= self.target_length:
+            self.stop_reason = 'target'
+        return self.stop_reason is not None
+
+    def stop(self):
+        """Stop the running search at the end of the current iteration.
+
+        This may be called from any thread.
+        """
+        self.token.cancel()
+
+    def elapsed(self):
+        """Return the number of seconds since the search started.
+
+        :rtype: float
+        """
+        return time.perf_counter() - self.started
+
+    def polish_best(self):
+        """Polish the global best solution with
+        :func:`~pants.localsearch.improve`.
+
+        :return: ``True`` if polishing shortened the global best solution
+        :rtype: bool
+        """
+        budget = None if self.polish is True else self.polish
+        if self.time_limit is not None:
+            remaining = max(self.time_limit - self.elapsed(), 0)
+            budget = remaining if budget is None else min(budget, remaining)
+        best = self.global_best
+        tour, distance = improve(self.world, best.ids, time_budget=budget)
+        if distance >= best.distance:
+            return False
+        self.global_best = copy(best).record(tour, distance)
+        return True
+
+    def close(self):
+        """Shut down the worker processes, if any.
+
+        This is done automatically at the end of :func:`solve` and
+        :func:`solutions`.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
     def round_robin_ants(self, world, count):
         """Returns a list of :class:`Ant`\s distributed to the nodes of the 
         world in a round-robin fashion.
@@ -147,7 +716,7 @@ class Solver:
         :return: the :class:`Ant`\s initialized to nodes in the :class:`World`
         :rtype: list
         """
-        starts = world.nodes
+        starts = world.nodes.tolist()
         n = len(starts)
         return [
             Ant(self.alpha, self.beta).initialize(
@@ -173,7 +742,7 @@ class Solver:
         :rtype: list
         """
         ants = []
-        starts = world.nodes
+        starts = world.nodes.tolist()
         n = len(starts)
         if even:
             # Since the caller wants an even distribution, use a round-robin 
@@ -205,50 +774,155 @@ class Solver:
     def find_solutions(self, ants):
         """Let each :class:`Ant` find a solution.
 
-        Makes each :class:`Ant` move until each can no longer move.
+        The tours of all :class:`Ant`\s are constructed together, in
+        lockstep, by a :class:`~pants.colony.Colony` that is kept between
+        iterations. With more than one of *workers*, the colony is instead
+        split over a :class:`~pants.parallel.ParallelColony`, whose worker
+        processes are kept until :func:`close` is called. Each :class:`Ant`
+        then takes over the tour that was constructed from its starting node.
 
-        .. todo:: 
-        
-            Make the local pheromone update optional and configurable.
+        In the Ant Colony System, the colony applies the local pheromone
+        update after every step. The worker processes cannot share their
+        updates, so with several *workers* the :func:`local_update` is
+        applied to all tours at once after they have been constructed.
 
         :param list ants: the ants to use for solving
         """
-        # This loop occurs exactly as many times as there are ants times nodes,
-        # but that is only because every ant must visit every node. It may be
-        # more efficient to convert it to a counting loop... but what 
-        # flexibility would we loose in terms of extending the solver class?
-        ants_done = 0
-        while ants_done < len(ants):
-            ants_done = 0
-            for ant in ants:
-                if ant.can_move():
-                    edge = ant.move()
-                    # self.local_update(edge)
-                else:
-                    ants_done += 1
+        if not ants:
+            return
+        world = ants[0].world
+        starts = [ant.start for ant in ants]
+        acs = self.mode == 'acs'
+        if self.workers > 1:
+            if self.pool is None or self.pool.world is not world:
+                # Imported here so that importing pants does not import
+                # multiprocessing.
+                from .parallel import ParallelColony
+                self.close()
+                self.pool = ParallelColony(world, self.workers, self.alpha,
+                                           self.beta, rng=self.rng,
+                                           q0=self.q0 if acs else 0)
+            tours, distances = self.pool.construct(starts)
+            if acs:
+                self.local_update(tours)
+        else:
+            colony = self.colony
+            if colony is None or colony.world is not world or \
+                    colony.count != len(ants):
+                colony = self.colony = Colony(world, len(ants), self.alpha,
+                                              self.beta, rng=self.rng)
+            colony.q0, colony.xi = (self.q0, self.xi) if acs else (0, 0)
+            colony.t0 = self.t0
+            if self._choice_of is not world:
+                self.update_choice_info(world)
+            tours, distances = colony.construct(starts, self.choice_info,
+                                                self.heuristic)
+        for ant, tour, distance in zip(ants, tours, distances):
+            ant.record(tour, distance)
+
+    def improve_solutions(self, ants):
+        """Improve the solutions of the *ants* with the *local_search*.
+
+        Depending on the *local_search_scope*, either every :class:`Ant` or
+        only the one with the shortest tour takes over the improved tour.
+
+        :param list ants: the ants whose solutions are improved
+        """
+        if self.local_search is None or not ants:
+            return
+        if self.local_search_scope == 'best':
+            ants = [self.iteration_best(ants)]
+        for ant in ants:
+            tour, distance = self.local_search(ant.world, ant.ids)
+            ant.record(tour, distance)
+
+    def iteration_best(self, ants):
+        """Return the :class:`Ant` with the shortest tour of the *ants*.
+
+        :param list ants: the ants of the iteration
+        :rtype: :class:`Ant`
+        """
+        return min(ants)
+
+    def rank_ants(self, ants):
+        """Return the *ants* from the shortest tour to the longest.
+
+        :param list ants: the ants of the iteration
+        :rtype: list
+        """
+        return sorted(ants)
+
+    def update_choice_info(self, world):
+        """Refresh the choice info matrix from the pheromone of the *world*.
+
+        The heuristic matrix only depends on the *world* and *beta*, so it
+        is computed the first time and reused afterwards. The choice info
+        matrix combines it with the current pheromone, and is refreshed in
+        place once per iteration, after the pheromone has been updated, so
+        that constructing the tours reads the weight of every move from it
+        instead of computing it.
+
+        :param World world: the :class:`World` being solved
+        """
+        if self._heuristic_of != (world, self.beta):
+            self.heuristic = world.heuristic(self.beta)
+            self._heuristic_of = (world, self.beta)
+            self.choice_info = None
+        self.choice_info = world.choice_info(self.alpha, self.heuristic,
+                                             out=self.choice_info)
+        self._choice_of = world
 
     def evaporate_pheromone_matrix(self, world):
-        for edge in world.list_edges():
-            edge.pheromone = (1 - self.rho) * edge.pheromone
+        """Evaporate a fraction *rho* of the pheromone on every edge.
 
-    def local_update(self, edge):
-        """Evaporate some of the pheromone on the given *edge*.
-        
-        .. note:: 
-        
-            This method should never let the pheromone on an edge decrease to 
-            less than its initial level.
+        :param World world: the :class:`World` whose pheromone evaporates
+        """
+        world.pheromone *= 1 - self.rho
+
+    def local_update(self, tours):
+        """Let the pheromone on every edge of the *tours* decay towards *t0*.
+
+        This is the local pheromone update of the Ant Colony System, which
+        removes a fraction *xi* of the pheromone on an edge above *t0* each
+        time an :class:`Ant` takes it.
+
+        .. note::
+
+            This method never lets the pheromone on an edge decrease to less
+            than its initial level.
+
+        :param tours: the tours as sequences of node IDs
+        """
+        tours = np.asarray(tours, dtype=np.intp)
+        if tours.size:
+            starts, ends = tours.ravel(), np.roll(tours, -1, axis=1).ravel()
+            self.world.decay_pheromone(starts, ends, self.xi, self.t0)
+
+    def best_update(self, ant):
+        """Perform the global pheromone update of the Ant Colony System.
+
+        Only the edges of the global best solution, including the iteration
+        best *ant*, evaporate and receive pheromone: each becomes
+        ``(1 - rho) * pheromone + rho * q / distance``.
 
-        :param Edge edge: the :class:`Edge` to be updated
+        :param Ant ant: the best :class:`Ant` of the iteration
         """
-        edge.pheromone = max(self.t0, edge.pheromone * self.rho)
+        best = self.global_best
+        if best is None or ant < best:
+            best = ant
+        tour = np.asarray(best.ids, dtype=np.intp)
+        ends = np.roll(tour, -1)
+        self.world.decay_pheromone(tour, ends, self.rho,
+                                   self.q / best.distance)
 
     def global_update(self, ants):
         """Update the amount of pheromone on each edge according to the fitness
         of solutions that use it.
 
         This accomplishes the global update performed at the end of each
-        solving iteration.
+        solving iteration. The better half of the *ants* deposit *q* divided
+        by their distance on every edge of their tour, after which the level
+        of every edge is clipped to at least *t0*.
 
         .. note::
 
@@ -257,13 +931,100 @@ class Solver:
 
         :param list ants: the ants to use for solving
         """
-        ants = sorted(ants)[:len(ants) // 2]
-        for a in ants:
-            # p = self.q / a.distance
-            for edge in a.path:
-                edge.pheromone = max(
-                    self.t0,
-                    (1 - self.rho) * edge.pheromone + (1 / a.distance)) # (1 - self.rho) * edge.pheromone + p)
+        ants = self.rank_ants(ants)[:len(ants) // 2]
+        if not ants:
+            return
+        world = ants[0].world
+        world.deposit_pheromone([a.ids for a in ants],
+                                [self.q / a.distance for a in ants])
+        world.clip_pheromone(lower=self.t0)
+
+    def update_bounds(self, distance):
+        """Derive the pheromone bounds of the MAX-MIN Ant System from the
+        *distance* of the best solution.
+
+        The upper bound *tau_max* is the level that the pheromone of the
+        edges of the best solution converges to. The lower bound *tau_min*
+        is chosen such that, once converged, an :class:`Ant` constructs the
+        best solution again with probability *p_best*.
+
+        :param float distance: the distance of the best solution
+        """
+        world = self.world
+        choices = len(world.nodes) if world.candidates is None else \
+            world.candidates.shape[1]
+        self.tau_max = self.q / (self.rho * distance)
+        decline = self.p_best ** (1 / len(world.nodes))
+        self.tau_min = min(self.tau_max, self.tau_max * (1 - decline) /
+                           (max(choices / 2 - 1, 1) * decline))
+
+    def bounded_update(self, ant):
+        """Perform the pheromone update of the MAX-MIN Ant System.
+
+        Only a single :class:`Ant` deposits pheromone: the global best one
+        when :func:`deposits_global_best`, and otherwise the iteration best
+        *ant*. The pheromone of every edge is then bounded to
+        [*tau_min*, *tau_max*] in bulk. The bounds follow the best solution,
+        and the pheromone starts at *tau_max* the first time.
+
+        :param Ant ant: the best :class:`Ant` of the iteration
+        """
+        best = self.global_best
+        if best is None or ant < best:
+            best = ant
+        world = ant.world
+        first = self.tau_max is None
+        self.update_bounds(best.distance)
+        if first:
+            world.reset_pheromone(self.tau_max)
+        depositor = best if self.deposits_global_best() else ant
+        world.deposit_pheromone([depositor.ids],
+                                [self.q / depositor.distance])
+        world.clip_pheromone(self.tau_min, self.tau_max)
+
+    def deposits_global_best(self):
+        """Return ``True`` if the global best solution deposits pheromone in
+        this iteration of the MAX-MIN Ant System.
+
+        Unless *gb_every* is given, the global best solution deposits every
+        fifth iteration after 25 iterations since the last restart, every
+        third after 75, every second after 125 and always after 250, which
+        shifts the search from exploration to exploitation.
+
+        :rtype: bool
+        """
+        every = self.gb_every
+        if every is None:
+            t = self.since_restart
+            if t < 25:
+                return False
+            every = 5 if t < 75 else 3 if t < 125 else 2 if t < 250 else 1
+        return self.since_restart % every == 0
+
+    def stagnated(self):
+        """Return ``True`` if the MAX-MIN colony has stagnated.
+
+        The colony has stagnated once the global best solution has not
+        improved for *stagnation* iterations since the last restart, or once
+        the mean lambda-branching factor of the pheromone (see
+        :func:`World.branching_factor`) falls below *min_branching*.
+
+        :rtype: bool
+        """
+        if self.stagnation is not None and \
+                min(self.stall, self.since_restart) >= self.stagnation:
+            return True
+        return self.min_branching is not None and \
+            self.world.branching_factor() < self.min_branching
+
+    def restart(self):
+        """Reinitialize the pheromone of every edge to *tau_max*.
+
+        The global best solution is kept.
+        """
+        self.world.reset_pheromone(self.tau_max)
+        self.restarts += 1
+        self.since_restart = 0
 
     def trace_elite(self, ant):
         """Deposit pheromone along the path of a particular ant.
@@ -280,5 +1041,4 @@ class Solver:
         """
         if self.elite:
             p = self.elite * self.q / ant.distance
-            for edge in ant.path:
-                edge.pheromone += p
+            ant.world.deposit_pheromone([ant.ids], [p])
@@ -0,0 +1,146 @@
+"""
+.. module:: spatial
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides a spatial index for finding the nearest neighbours of
+               every node.
+
+"""
+
+import math
+
+import numpy as np
+
+
+def nearest_neighbours(coords, k):
+    """Return the *k* nearest neighbours of every point in *coords*.
+
+    The points are bucketed into a uniform grid whose cells hold about *k*
+    points each. The neighbours of the points in a cell are searched among the
+    points of the surrounding ring of cells, which is widened until the *k*-th
+    nearest point found is provably closer than anything outside of it. This
+    keeps the work close to O(n * k) instead of the O(n^2) of comparing every
+    pair of points.
+
+    :param coords: the (n x 2) coordinates of the points
+    :param int k: the number of neighbours of every point (capped at n - 1)
+    :return: the (n x k) neighbour indices and their euclidean distances,
+             each row sorted from nearest to farthest
+    :rtype: tuple
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    k = min(k, n - 1)
+    neighbours = np.zeros((n, max(k, 0)), dtype=np.intp)
+    distances = np.zeros((n, max(k, 0)))
+    if k <= 0:
+        return neighbours, distances
+
+    size, shape, cells, order, bounds = _grid(coords, k)
+    ids = cells[:, 0] * shape[1] + cells[:, 1]
+
+    for cell in np.unique(ids):
+        members = order[bounds[cell]:bounds[cell + 1]]
+        cx, cy = divmod(cell, shape[1])
+        ring = 1
+        while True:
+            x0, x1 = max(cx - ring, 0), min(cx + ring, shape[0] - 1)
+            y0, y1 = max(cy - ring, 0), min(cy + ring, shape[1] - 1)
+            pool = np.concatenate([
+                order[bounds[x * shape[1] + y0]:bounds[x * shape[1] + y1 + 1]]
+                for x in range(x0, x1 + 1)
+            ])
+            whole = x0 == 0 and y0 == 0 and x1 == shape[0] - 1 and \
+                y1 == shape[1] - 1
+            if len(pool) > k:
+                delta = coords[members, None, :] - coords[pool]
+                dist = np.hypot(delta[..., 0], delta[..., 1])
+                dist[members[:, None] == pool] = np.inf
+                nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+                found = np.take_along_axis(dist, nearest, axis=1)
+                if whole or found.max() <= ring * size:
+                    break
+            ring += 1
+        rank = np.argsort(found, axis=1)
+        neighbours[members] = np.take_along_axis(pool[nearest], rank, axis=1)
+        distances[members] = np.take_along_axis(found, rank, axis=1)
+    return neighbours, distances
+
+
+def _grid(coords, k):
+    """Bucket the points into a uniform grid whose cells hold about *k*
+    points each.
+
+    :return: the size of the cells, the shape of the grid, the cell of every
+             point, the points sorted by cell and the offset of every cell
+             in that order
+    :rtype: tuple
+    """
+    n = len(coords)
+    low = coords.min(axis=0)
+    span = coords.max(axis=0) - low
+    area = span[0] * span[1]
+    if area > 0:
+        size = math.sqrt(area * k / n)
+    else:
+        size = max(span.max(), 1) * k / n
+    shape = np.floor(span / size).astype(np.intp) + 1
+    cells = np.minimum(np.floor((coords - low) / size).astype(np.intp),
+                       shape - 1)
+
+    # Sort the points by cell so that every column of cells is one slice.
+    ids = cells[:, 0] * shape[1] + cells[:, 1]
+    order = np.argsort(ids, kind='stable')
+    bounds = np.searchsorted(ids[order], np.arange(shape[0] * shape[1] + 1))
+    return size, shape, cells, order, bounds
+
+
+class GridIndex:
+    """A uniform grid over points, for finding the points of a subset that
+    are nearest to one of them.
+
+    The grid is the one :func:`nearest_neighbours` searches, built once, so
+    that a query only looks at the rings of cells around the point until
+    enough points of the subset are provably found.
+
+    :param coords: the (n x 2) coordinates of the points
+    :param int k: the number of points per cell (default=10)
+    """
+    def __init__(self, coords, k=10):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.size, self.shape, self.cells, self.order, self.bounds = \
+            _grid(self.coords, max(k, 1))
+
+    def nearest(self, point, mask, count):
+        """Return the *count* points of the subset nearest to *point*.
+
+        :param int point: the index of the point searched from
+        :param mask: the boolean mask of the points in the subset
+        :param int count: the number of points returned
+        :return: the indices of at most *count* points of the subset, from
+                 nearest to farthest
+        :rtype: :class:`ndarray`
+        """
+        order, bounds, (width, height) = self.order, self.bounds, self.shape
+        cx, cy = self.cells[point]
+        origin = self.coords[point]
+        ring = 0
+        while True:
+            x0, x1 = max(cx - ring, 0), min(cx + ring, width - 1)
+            y0, y1 = max(cy - ring, 0), min(cy + ring, height - 1)
+            pool = np.concatenate([
+                order[bounds[x * height + y0]:bounds[x * height + y1 + 1]]
+                for x in range(x0, x1 + 1)
+            ])
+            pool = pool[mask[pool]]
+            whole = x0 == 0 and y0 == 0 and x1 == width - 1 and \
+                y1 == height - 1
+            if len(pool) >= count or whole:
+                delta = self.coords[pool] - origin
+                dist = np.hypot(delta[:, 0], delta[:, 1])
+                if len(pool) > count:
+                    nearest = np.argpartition(dist, count - 1)[:count]
+                    pool, dist = pool[nearest], dist[nearest]
+                # Points outside of the ring are at least this far away.
+                if whole or dist.max(initial=0) <= ring * self.size:
+                    return pool[np.argsort(dist, kind='stable')]
+            ring += 1
@@ -0,0 +1,237 @@
+"""
+.. module:: stats
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for measuring where a solver spends
+               its time.
+
+A :class:`Solver` created with ``stats=True`` keeps a :class:`SolverStats`
+in its :attr:`~Solver.stats` attribute, which times every phase of the
+iterations and counts the work done by the :class:`Ant`\s. With
+``profile=N``, the first *N* iterations are also run under :mod:`cProfile`
+and :mod:`tracemalloc`:
+
+.. code-block:: python
+
+    solver = Solver(stats=True, profile=5)
+    best = solver.solve(world)
+    print(solver.stats.summary())
+
+The timers are installed by replacing the phase methods of that one
+:class:`Solver` with timed wrappers, so a :class:`Solver` created without
+them runs exactly the same code as before, and their :attr:`stats` is None.
+
+"""
+
+import functools
+import io
+import time
+
+
+class SolverStats:
+    """Cumulative timings and counters of the iterations of a
+    :class:`Solver`.
+
+    The time of a phase includes the phases it calls, so the ranking of the
+    :class:`Ant`\s done by :func:`~Solver.global_update` is counted both in
+    ``global_update`` and in ``rank_ants``. The share of every phase is
+    taken of the total time spent in :func:`~Solver.step`.
+
+    The counters are derived from the size of the colony and of the world
+    after every construction, rather than counted move by move, so that
+    they cost nothing while the tours are built:
+
+    ``moves``
+        the moves chosen by the :class:`Ant`\s, one less than the number of
+        nodes per tour
+    ``length_evaluations``
+        the edge lengths looked up to measure the tours, including the edge
+        back to the start
+    ``weight_evaluations``
+        the entries of the choice info matrix weighed to choose the moves:
+        every node per move, or only the candidates of the current node if
+        the :class:`World` has candidate lists (the rare fallback to the
+        best remaining node is not counted)
+
+    :param int profile: the number of iterations to run under
+                        :mod:`cProfile` and :mod:`tracemalloc` (default=0)
+    """
+    #: The methods of the :class:`Solver` that are timed.
+    phases = ('reset_colony', 'find_solutions', 'improve_solutions',
+              'iteration_best', 'rank_ants', 'evaporate_pheromone_matrix',
+              'global_update', 'bounded_update', 'best_update', 'trace_elite',
+              'restart', 'update_choice_info')
+
+    def __init__(self, profile=0):
+        self.profile = profile
+        self.times = {}
+        self.calls = {}
+        self.reset()
+
+    def reset(self):
+        """Clear all timings, counters and captures."""
+        self.times.clear()
+        self.times.update(dict.fromkeys(self.phases, 0.0))
+        self.calls.clear()
+        self.calls.update(dict.fromkeys(self.phases, 0))
+        self.iterations = 0
+        self.step_time = 0.0
+        self.moves = 0
+        self.length_evaluations = 0
+        self.weight_evaluations = 0
+        self.profiler = None
+        self.profiled = 0
+        self.snapshot = None
+        self.peak_bytes = None
+        self._tracing = False
+
+    def attach(self, solver):
+        """Replace the phase methods and :func:`~Solver.step` of the
+        *solver* with timed wrappers.
+
+        :param Solver solver: the :class:`Solver` to instrument
+        """
+        for name in self.phases:
+            setattr(solver, name, self._timed(name, getattr(solver, name)))
+        find_solutions = solver.find_solutions
+
+        @functools.wraps(find_solutions)
+        def counted(ants):
+            find_solutions(ants)
+            self.count(ants)
+
+        solver.find_solutions = counted
+        solver.step = self._stepped(solver.step)
+
+    def _timed(self, name, method):
+        times, calls, clock = self.times, self.calls, time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times[name] += clock() - start
+                calls[name] += 1
+        return timed
+
+    def _stepped(self, step):
+        clock = time.perf_counter
+
+        @functools.wraps(step)
+        def stepped():
+            capture = self.profiled < self.profile
+            if capture:
+                self.start_capture()
+            start = clock()
+            try:
+                return step()
+            finally:
+                self.step_time += clock() - start
+                self.iterations += 1
+                if capture:
+                    self.stop_capture()
+        return stepped
+
+    def count(self, ants):
+        """Count the work done to construct the tours of the *ants*.
+
+        :param list ants: the :class:`Ant`\s whose tours were constructed
+        """
+        if not ants:
+            return
+        world = ants[0].world
+        n = len(world.nodes)
+        choices = n if world.candidates is None else world.candidates.shape[1]
+        moves = len(ants) * (n - 1)
+        self.moves += moves
+        self.length_evaluations += len(ants) * n
+        self.weight_evaluations += moves * choices
+
+    def start_capture(self):
+        """Start profiling and tracing the memory of an iteration."""
+        # Imported here so that stats without a capture, and importing
+        # pants, do not load the profilers.
+        import cProfile
+        import tracemalloc
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        else:
+            self._tracing = False
+        tracemalloc.reset_peak()
+        self.profiler.enable()
+
+    def stop_capture(self):
+        """Stop profiling and tracing the memory of an iteration."""
+        import tracemalloc
+        self.profiler.disable()
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak_bytes = max(self.peak_bytes or 0, peak)
+        self.profiled += 1
+        if self.profiled == self.profile:
+            self.snapshot = tracemalloc.take_snapshot()
+        if self._tracing:
+            tracemalloc.stop()
+
+    def as_dict(self):
+        """Return the timings and counters as plain values.
+
+        :rtype: dict
+        """
+        return {
+            'iterations': self.iterations,
+            'step_s': self.step_time,
+            'phases': {name: {'calls': self.calls[name],
+                              'seconds': self.times[name]}
+                       for name in self.phases if self.calls[name]},
+            'moves': self.moves,
+            'length_evaluations': self.length_evaluations,
+            'weight_evaluations': self.weight_evaluations,
+            'profiled': self.profiled,
+            'peak_bytes': self.peak_bytes,
+        }
+
+    def summary(self, top=10):
+        """Return a table of the timings and counters, followed by the
+        *top* functions by cumulative time and the *top* lines by memory
+        allocated in the profiled iterations, if any.
+
+        :param int top: the number of functions and lines listed
+                        (default=10)
+        :rtype: str
+        """
+        total = self.step_time or 1
+        lines = ['{} iterations in {:.3f} s'.format(self.iterations,
+                                                   self.step_time),
+                 '{:<28} {:>7} {:>10} {:>12} {:>7}'.format(
+                     'phase', 'calls', 'total s', 'per call ms', 'share')]
+        for name in self.phases:
+            calls = self.calls[name]
+            if calls:
+                seconds = self.times[name]
+                lines.append('{:<28} {:>7} {:>10.4f} {:>12.3f} {:>6.1f}%'
+                             .format(name, calls, seconds,
+                                     1000 * seconds / calls,
+                                     100 * seconds / total))
+        lines.append('moves {:,}  length evaluations {:,}  weight '
+                     'evaluations {:,}'.format(self.moves,
+                                               self.length_evaluations,
+                                               self.weight_evaluations))
+        if self.profiler is not None:
+            import pstats
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream) \
+                .sort_stats('cumulative').print_stats(top)
+            lines.append('')
+            lines.append('profile of {} iterations, peak memory {:,} bytes'
+                         .format(self.profiled, self.peak_bytes or 0))
+            lines.append(stream.getvalue().strip())
+        if self.snapshot is not None:
+            lines.append('')
+            lines.append('top allocations:')
+            for stat in self.snapshot.statistics('lineno')[:top]:
+                lines.append(str(stat))
+        return '\n'.join(lines)
@@ -0,0 +1,25 @@
+from ..world import World, Position
+
+import numpy as np
+
+
+def random_positions(n, seed=0):
+    """Return *n* positions drawn uniformly from the unit square.
+
+    :param int n: the number of positions
+    :param int seed: the seed of the generator (default=0)
+    :rtype: list
+    """
+    rng = np.random.default_rng(seed)
+    return [Position(x, y) for x, y in rng.random((n, 2))]
+
+
+def random_world(n, seed=0, **kwargs):
+    """Return a :class:`World` of :func:`random_positions`.
+
+    :param int n: the number of nodes
+    :param int seed: the seed of the generator (default=0)
+    :param kwargs: the keyword arguments of the :class:`World`
+    :rtype: :class:`World`
+    """
+    return World(random_positions(n, seed), **kwargs)
@@ -1,8 +1,11 @@
 from ..ant import Ant
-from ..world import World, Edge
+from ..world import World, Edge, Position
 import unittest
+import copy
 import unittest.mock
 
+import numpy as np
+
 class AntTest(unittest.TestCase):
     @unittest.mock.patch('__main__.World')
     def setUp(self, MockWorld):
@@ -105,6 +108,91 @@ class AntTest(unittest.TestCase):
         self.assertEqual(ant.distance, clone.distance)
         self.assertEqual(ant.path, clone.path)
         self.assertEqual(ant.uid, clone.uid)
+
+
+
+class AntTourTest(unittest.TestCase):
+    def setUp(self):
+        self.world = World([Position(0, 0), Position(1, 0), Position(1, 1),
+                            Position(0, 1)])
+
+    def test_ant_visits_every_node_once(self):
+        ant = Ant().initialize(self.world, start=0)
+        while ant.can_move():
+            ant.move()
+        self.assertEqual(sorted(ant.visited), [0, 1, 2, 3])
+        self.assertEqual(len(ant.path), 4)
+
+    def test_ant_distance_is_sum_of_matrix_lengths(self):
+        ant = Ant().initialize(self.world, start=0)
+        while ant.can_move():
+            ant.move()
+        tour = ant.visited + [ant.start]
+        expected = sum(self.world.distances[a, b]
+                       for a, b in zip(tour, tour[1:]))
+        self.assertAlmostEqual(ant.distance, expected)
+
+    def test_ant_choose_move_prefers_pheromone(self):
+        self.world.pheromone[0, 1] = 1e6
+        ant = Ant(alpha=1, beta=0).initialize(self.world, start=0)
+        self.assertEqual(ant.choose_move([1, 2, 3]), 1)
+
+    def test_ant_choose_move_only_among_candidates(self):
+        world = World(self.world._nodes, candidates=1)
+        ant = Ant().initialize(world, start=0)
+        self.assertEqual(ant.choose_move([1, 2, 3]), world.candidates[0][0])
+
+    def test_ant_choose_move_falls_back_to_best_remaining(self):
+        world = World(self.world._nodes, candidates=1)
+        world.pheromone[0, 2] = 1e6
+        ant = Ant().initialize(world, start=0)
+        remaining = [n for n in (1, 2, 3) if n != world.candidates[0][0]]
+        self.assertEqual(ant.choose_move(remaining), 2)
+
+    def test_ant_choose_move_keeps_filtered_choices(self):
+        world = World([Position(x, 0) for x in (0, 1, 3, 6, 10)],
+                      candidates=1)
+        ant = Ant().initialize(world, start=4)
+        ant.make_move(2)
+        # As many choices as remaining moves, but without the candidate 1.
+        choices = [0, 3, 4]
+        self.assertEqual(len(choices), len(ant.remaining_moves()))
+        self.assertEqual(world.candidates[2].tolist(), [1])
+        self.assertIn(ant.choose_move(choices), choices)
+
+    def test_ant_unvisited_shrinks_as_it_moves(self):
+        ant = Ant().initialize(self.world, start=2)
+        self.assertEqual(sorted(ant.unvisited), [0, 1, 3])
+        ant.make_move(0)
+        self.assertEqual(sorted(ant.remaining_moves().tolist()), [1, 3])
+        self.assertEqual(ant.visited_mask.tolist(), [True, False, True, False])
+        self.assertEqual(ant.visited, [2, 0])
+        self.assertEqual(ant.node, 0)
+
+    def test_ant_reuses_its_buffers(self):
+        ant = Ant().initialize(self.world, start=0)
+        while ant.can_move():
+            ant.move()
+        buffer = ant._tour
+        ant.initialize(self.world, start=3)
+        self.assertIs(ant._tour, buffer)
+        self.assertEqual(ant.visited, [3])
+        self.assertEqual(sorted(ant.unvisited), [0, 1, 2])
+        self.assertEqual(ant.path, [])
+        self.assertTrue(ant.can_move())
+
+    def test_ant_copy_shares_no_buffer(self):
+        ant = Ant().initialize(self.world).record([1, 2, 3, 0], 4)
+        best = copy.copy(ant)
+        self.assertEqual(best.uid, ant.uid)
+        ant.initialize(self.world, start=0)
+        while ant.can_move():
+            ant.move()
+        ant.record([0, 3, 2, 1], 4)
+        self.assertEqual(best.visited, [1, 2, 3, 0])
+        self.assertEqual(best.ids.dtype, np.int32)
+        self.assertEqual(len(best.path), 4)
+        self.assertEqual(best.initialize(self.world, start=1).visited, [1])
         
 
 if __name__ == '__main__':
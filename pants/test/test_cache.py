@@ -0,0 +1,90 @@
+from ..cache import LengthCache
+from ..world import World, SparseWorld
+from . import random_positions
+import unittest
+
+import numpy as np
+
+
+class CountingLength:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, a, b):
+        self.calls += 1
+        return abs(a[0] - b[0]) + 2 * abs(a[1] - b[1])
+
+
+class LengthCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.lfunc = CountingLength()
+
+    def test_cache_memoizes_pairs(self):
+        cache = LengthCache(self.lfunc)
+        self.assertEqual(cache((0, 0), (1, 1)), 3)
+        self.assertEqual(cache((0, 0), (1, 1)), 3)
+        self.assertEqual(self.lfunc.calls, 1)
+        self.assertEqual(cache.cache_info(), (1, 1, None, 1))
+
+    def test_cache_keeps_directions_apart(self):
+        cache = LengthCache(self.lfunc)
+        cache((0, 0), (1, 1))
+        cache((1, 1), (0, 0))
+        self.assertEqual(self.lfunc.calls, 2)
+
+    def test_symmetric_cache_shares_directions(self):
+        cache = LengthCache(self.lfunc, symmetric=True)
+        cache((0, 0), (1, 1))
+        cache((1, 1), (0, 0))
+        self.assertEqual(self.lfunc.calls, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_bounded_cache_evicts_least_recently_used(self):
+        cache = LengthCache(self.lfunc, maxsize=2)
+        cache((0, 0), (1, 0))
+        cache((0, 0), (2, 0))
+        cache((0, 0), (1, 0))
+        cache((0, 0), (3, 0))
+        self.assertEqual(len(cache), 2)
+        cache((0, 0), (1, 0))
+        self.assertEqual(self.lfunc.calls, 3)
+        cache((0, 0), (2, 0))
+        self.assertEqual(self.lfunc.calls, 4)
+
+    def test_cache_clear(self):
+        cache = LengthCache(self.lfunc)
+        cache((0, 0), (1, 0))
+        cache.cache_clear()
+        self.assertEqual(cache.cache_info(), (0, 0, None, 0))
+
+
+class WorldCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(20)
+        self.lfunc = CountingLength()
+
+    def test_symmetric_world_calls_lfunc_for_half_the_pairs(self):
+        w = World(self.positions, lambda a, b: self.lfunc(a, b) +
+                  self.lfunc(b, a), symmetric=True)
+        self.assertEqual(self.lfunc.calls, 2 * 20 * 19 // 2)
+        self.assertTrue(np.array_equal(w.distances, w.distances.T))
+
+    def test_world_cache_is_used_by_edges(self):
+        w = World(self.positions, self.lfunc, cache=True)
+        calls = self.lfunc.calls
+        a, b = w.data(0), w.data(1)
+        self.assertEqual(w.cache(a.position, b.position), w.length(0, 1))
+        self.assertEqual(self.lfunc.calls, calls)
+        self.assertEqual(w.cache.hits, 1)
+
+    def test_sparse_world_cache_bounds_on_demand_lengths(self):
+        w = SparseWorld(self.positions, self.lfunc, candidates=3,
+                        cache_size=100)
+        w.distances[0]
+        w.distances[0]
+        self.assertLessEqual(len(w.cache), 100)
+        self.assertGreater(w.cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+from ..colony import Colony
+from . import random_world
+import unittest
+
+import numpy as np
+
+
+class ColonyTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(12)
+        self.colony = Colony(self.world, 5, rng=np.random.default_rng(1))
+
+    def test_colony_tours_are_permutations(self):
+        tours, _ = self.colony.construct([0, 1, 2, 3, 4])
+        for tour in tours:
+            self.assertEqual(sorted(tour), list(range(12)))
+
+    def test_colony_tours_begin_at_starts(self):
+        tours, _ = self.colony.construct([4, 4, 0, 11, 7])
+        self.assertEqual(list(tours[:, 0]), [4, 4, 0, 11, 7])
+
+    def test_colony_distances_include_move_back_to_start(self):
+        tours, distances = self.colony.construct([0] * 5)
+        for tour, distance in zip(tours, distances):
+            expected = self.world.distances[tour, np.roll(tour, -1)].sum()
+            self.assertAlmostEqual(distance, expected)
+
+    def test_colony_weights_ignore_visited_nodes(self):
+        self.colony.reset([0] * 5)
+        self.colony.step()
+        weights = self.colony.weights()
+        self.assertTrue(np.all(weights[self.colony.visited] == 0))
+        self.assertTrue(np.all(weights[~self.colony.visited] > 0))
+
+    def test_colony_follows_dominant_pheromone(self):
+        self.world.reset_pheromone(1e-9)
+        for a in range(12):
+            self.world.pheromone[a, (a + 1) % 12] = 1
+        colony = Colony(self.world, 3, alpha=1, beta=0)
+        tours, _ = colony.construct([0, 5, 9])
+        for tour in tours:
+            self.assertTrue(np.all(np.diff(tour) % 12 == 1))
+
+    def test_colony_reads_weights_from_choice_info(self):
+        choice = np.ones((12, 12))
+        choice[:, 7] = 1e12
+        self.colony.reset([0] * 5, choice)
+        self.assertTrue(np.all(self.colony.step() == 7))
+
+    def test_colony_without_pheromone_still_completes(self):
+        self.world.reset_pheromone(0)
+        tours, _ = self.colony.construct([0] * 5)
+        for tour in tours:
+            self.assertEqual(sorted(tour), list(range(12)))
+
+
+class ColonySystemTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(12)
+
+    def test_colony_with_q0_takes_best_move(self):
+        colony = Colony(self.world, 4, q0=1)
+        choice = self.world.choice_info(1, self.world.heuristic(3))
+        colony.reset([0, 3, 5, 7], choice)
+        weights = colony.weights()
+        moves = colony.step()
+        self.assertEqual(list(moves), list(weights.argmax(axis=1)))
+
+    def test_colony_decays_pheromone_of_taken_edges(self):
+        self.world.reset_pheromone(1)
+        colony = Colony(self.world, 3, xi=0.5, t0=0.2,
+                        rng=np.random.default_rng(0))
+        heuristic = self.world.heuristic(3)
+        choice = self.world.choice_info(1, heuristic)
+        tours, _ = colony.construct([0, 4, 8], choice, heuristic)
+        taken = np.zeros((12, 12), dtype=bool)
+        for tour in tours:
+            taken[tour, np.roll(tour, -1)] = True
+        levels = self.world.pheromone
+        self.assertTrue(np.all(levels[taken] < 1))
+        self.assertTrue(np.all(levels[taken] >= 0.2))
+        self.assertTrue(np.all(levels[~taken & ~np.eye(12, dtype=bool)] == 1))
+        self.assertTrue(np.allclose(choice, levels * heuristic))
+
+    def test_colony_decays_shared_edge_once_per_ant(self):
+        self.world.reset_pheromone(1)
+        colony = Colony(self.world, 2, q0=1, xi=0.5, t0=0.2)
+        heuristic = self.world.heuristic(3)
+        choice = self.world.choice_info(1, heuristic)
+        colony.reset([0, 0], choice, heuristic)
+        moves = colony.step()
+        self.assertEqual(moves[0], moves[1])
+        self.assertAlmostEqual(self.world.pheromone[0, moves[0]],
+                               0.25 + 0.75 * 0.2)
+        self.assertAlmostEqual(choice[0, moves[0]],
+                               0.4 * heuristic[0, moves[0]])
+
+
+class CandidateColonyTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(40, candidates=3)
+        self.colony = Colony(self.world, 6, rng=np.random.default_rng(1))
+
+    def test_colony_tours_with_candidates_are_permutations(self):
+        tours, _ = self.colony.construct(range(6))
+        for tour in tours:
+            self.assertEqual(sorted(tour), list(range(40)))
+
+    def test_colony_moves_to_unvisited_candidate(self):
+        self.colony.reset(range(6))
+        starts = self.colony.current.copy()
+        choices = self.colony.step()
+        for start, choice in zip(starts, choices):
+            self.assertIn(choice, self.world.candidates[start])
+
+    def test_colony_falls_back_to_best_remaining(self):
+        self.world.pheromone[0, 39] = 1e9
+        self.colony.reset([0] * 6)
+        self.colony.visited[:, self.world.candidates[0]] = True
+        choices = self.colony.step()
+        self.assertTrue(np.all(choices == 39))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+from .. import datasets
+from ..datasets import Dataset, xqf131
+from ..world import Node
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+
+class DatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for extension in ('.csv', '.tour'):
+            shutil.copy(os.path.join(datasets.HERE, 'xqf131' + extension),
+                        self.directory.name)
+        patcher = mock.patch.object(datasets, 'HERE', self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def test_coords_are_parsed_and_cached(self):
+        coords = Dataset('xqf131', 131, '').coords
+        self.assertEqual(coords.shape, (131, 2))
+        self.assertEqual(list(coords[0]), [0, 13])
+        cache = os.path.join(self.directory.name, 'xqf131.npy')
+        self.assertTrue(np.array_equal(np.load(cache), coords))
+        with mock.patch.object(np, 'loadtxt') as loadtxt:
+            again = Dataset('xqf131', 131, '').coords
+        loadtxt.assert_not_called()
+        self.assertTrue(np.array_equal(again, coords))
+
+    def test_nodes_are_created_lazily(self):
+        dataset = Dataset('xqf131', 131, '')
+        self.assertIsNone(dataset._nodes)
+        nodes = dataset.nodes
+        self.assertEqual(len(nodes), 131)
+        self.assertIsInstance(nodes[0], Node)
+        self.assertEqual(tuple(nodes[5].position), tuple(dataset.coords[5]))
+
+    def test_optimal_tour_has_recorded_length(self):
+        dataset = Dataset('xqf131', 131, '', optimum=564)
+        tour, coords = dataset.optimal_tour, dataset.coords
+        self.assertEqual(sorted(tour), list(range(131)))
+        delta = coords[tour] - coords[np.roll(tour, -1)]
+        length = np.rint(np.hypot(delta[:, 0], delta[:, 1])).sum()
+        self.assertEqual(length, dataset.optimum)
+
+    def test_wrong_dimension(self):
+        with self.assertRaises(ValueError):
+            Dataset('xqf131', 130, '').coords
+
+    def test_unknown_dataset(self):
+        with self.assertRaises(ValueError):
+            datasets.load('abc')
+
+
+class ShippedDatasetTest(unittest.TestCase):
+    def test_load_data_returns_coords_or_nodes(self):
+        self.assertEqual(xqf131.load_data().shape, (131, 2))
+        self.assertEqual(len(xqf131.load_data(nodes=True)), 131)
+
+    def test_pma343_optimum(self):
+        dataset = datasets.load('pma343')
+        self.assertEqual(dataset.optimum, 1368)
+        self.assertEqual(len(dataset.optimal_tour), 343)
+
+
+if __name__ == '__main__':
+    unittest.main()
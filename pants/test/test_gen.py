@@ -11,7 +11,7 @@ from pants.datasets import xqf131, pma343
 from pants import World, Edge, Node, Position
 from pants import Solver
 
-TEST_COORDS = pma343.load_data()
+TEST_COORDS = pma343.load_data(nodes=True)
 
 def dist(a, b):
     """Return the distance between two points represeted as a 2-tuple."""
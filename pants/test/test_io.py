@@ -0,0 +1,162 @@
+from .. import io
+from ..datasets import load
+from ..world import World, SparseWorld
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+BURMA14 = [
+    (16.47, 96.10), (16.47, 94.44), (20.09, 92.54), (22.39, 93.37),
+    (25.23, 97.24), (22.00, 96.05), (20.47, 97.02), (17.20, 96.29),
+    (16.30, 97.38), (14.05, 98.12), (16.53, 97.38), (21.52, 95.59),
+    (19.41, 97.13), (20.09, 94.55),
+]
+BURMA14_TOUR = [1, 2, 14, 3, 4, 5, 6, 12, 7, 13, 8, 11, 9, 10]
+
+
+class FileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def write_coords(self, name, coords, kind, shuffle=False):
+        lines = ['{} {} {}'.format(i + 1, x, y)
+                 for i, (x, y) in enumerate(coords)]
+        if shuffle:
+            lines = lines[1::2] + lines[::2]
+        return self.write(name, '\n'.join([
+            'NAME : {}'.format(name),
+            'COMMENT : a test',
+            'TYPE : TSP',
+            'DIMENSION : {}'.format(len(coords)),
+            'EDGE_WEIGHT_TYPE : {}'.format(kind),
+            'NODE_COORD_SECTION'] + lines + ['EOF', '']))
+
+
+class ReadTspTest(FileTest):
+    def test_euc_2d_matches_the_optimum(self):
+        data = load('xqf131')
+        path = self.write_coords('xqf131.tsp', data.coords, 'EUC_2D',
+                                 shuffle=True)
+        problem = io.read_tsp(path, chunk=7)
+        self.assertEqual(problem.name, 'xqf131.tsp')
+        self.assertEqual(problem.comment, 'a test')
+        self.assertEqual(problem.dimension, 131)
+        self.assertTrue(np.array_equal(problem.coords, data.coords))
+        self.assertEqual(problem.tour_length(data.optimal_tour), 564)
+
+    def test_geo_matches_the_optimum(self):
+        path = self.write_coords('burma14.tsp', BURMA14, 'GEO')
+        problem = io.read_tsp(path)
+        tour = np.array(BURMA14_TOUR) - 1
+        self.assertEqual(problem.tour_length(tour), 3323)
+        world = problem.world()
+        self.assertEqual(world.distances[tour, np.roll(tour, -1)].sum(),
+                         3323)
+        self.assertTrue(np.array_equal(world.distances, problem.distances()))
+
+    def test_rounding(self):
+        origin = np.zeros(2)
+        self.assertEqual(io.euc_2d(origin, np.array([3., 4.4])), 5)
+        self.assertEqual(io.euc_2d(origin, np.array([0, 2.5])), 3)
+        self.assertEqual(io.ceil_2d(origin, np.array([3., 4.1])), 6)
+        self.assertEqual(io.att(origin, np.array([np.sqrt(1000), 0])), 10)
+        self.assertEqual(io.att(origin, np.array([33., 0])), 11)
+        self.assertEqual(io.man_2d(origin, np.array([1.2, 1.4])), 3)
+        self.assertEqual(io.max_2d(origin, np.array([1.2, 2.6])), 3)
+
+    def test_explicit_formats(self):
+        full = np.array([[0, 1, 2, 3], [1, 0, 4, 5], [2, 4, 0, 6],
+                         [3, 5, 6, 0]])
+        weights = {
+            'FULL_MATRIX': full.ravel(),
+            'UPPER_ROW': [1, 2, 3, 4, 5, 6],
+            'LOWER_ROW': [1, 2, 4, 3, 5, 6],
+            'UPPER_DIAG_ROW': [0, 1, 2, 3, 0, 4, 5, 0, 6, 0],
+            'LOWER_DIAG_ROW': [0, 1, 0, 2, 4, 0, 3, 5, 6, 0],
+            'UPPER_COL': [1, 2, 4, 3, 5, 6],
+            'LOWER_COL': [1, 2, 3, 4, 5, 6],
+        }
+        for fmt, numbers in weights.items():
+            numbers = ' '.join(map(str, numbers))
+            # The weights may be spread over the lines in any way.
+            numbers = numbers[:5] + '\n' + numbers[5:]
+            path = self.write('explicit.tsp', '\n'.join([
+                'NAME: explicit',
+                'TYPE: TSP',
+                'DIMENSION: 4',
+                'EDGE_WEIGHT_TYPE: EXPLICIT',
+                'EDGE_WEIGHT_FORMAT: {}'.format(fmt),
+                'EDGE_WEIGHT_SECTION',
+                numbers,
+                'DISPLAY_DATA_SECTION',
+                '1 0 0', '2 1 0', '3 1 1', '4 0 1',
+                'EOF']))
+            problem = io.read_tsp(path)
+            self.assertTrue(np.array_equal(problem.weights, full), fmt)
+            self.assertEqual(problem.display.tolist(),
+                             [[0, 0], [1, 0], [1, 1], [0, 1]])
+            world = problem.world(candidates=2)
+            self.assertTrue(np.array_equal(world.distances, full))
+            self.assertEqual(world.candidates.tolist(),
+                             [[1, 2], [0, 2], [0, 1], [0, 1]])
+            with self.assertRaises(ValueError):
+                problem.world(sparse=True)
+
+    def test_errors(self):
+        path = self.write_coords('short.tsp', BURMA14, 'EUC_2D')
+        with open(path) as f:
+            text = f.read().replace('DIMENSION : 14', 'DIMENSION : 15')
+        with self.assertRaises(ValueError):
+            io.read_tsp(self.write('short.tsp', text))
+        with self.assertRaises(ValueError):
+            io.read_tsp(self.write('bad.tsp', text.replace('16.47', '1x')))
+        path = self.write_coords('xray.tsp', BURMA14, 'XRAY1')
+        with self.assertRaises(ValueError):
+            io.read_tsp(path).metric
+
+
+class SparseTest(FileTest):
+    def test_sparse_world_uses_the_metric(self):
+        path = self.write_coords('burma14.tsp', BURMA14, 'GEO')
+        problem = io.read_tsp(path)
+        world = problem.world(sparse=True, candidates=4)
+        self.assertIsInstance(world, SparseWorld)
+        distances = problem.distances()
+        self.assertEqual(world.distances[0, 13], distances[0, 13])
+        rows = world.distances.indices.reshape(14, -1)
+        lengths = np.take_along_axis(distances, rows, axis=1)
+        self.assertTrue((np.diff(lengths, axis=1) >= 0).all())
+
+
+class TourTest(FileTest):
+    def test_round_trip(self):
+        tour = np.random.default_rng(0).permutation(20)
+        path = os.path.join(self.directory.name, 'random.tour')
+        io.write_tour(path, tour, name='random', comment='shuffled')
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[:5], ['NAME : random', 'COMMENT : shuffled',
+                                     'TYPE : TOUR', 'DIMENSION : 20',
+                                     'TOUR_SECTION'])
+        self.assertEqual(lines[5], str(tour[0] + 1))
+        self.assertEqual(lines[-2:], ['-1', 'EOF'])
+        self.assertTrue(np.array_equal(io.read_tour(path), tour))
+
+    def test_world_of_the_problem(self):
+        data = load('xqf131')
+        path = self.write_coords('xqf131.tsp', data.coords, 'EUC_2D')
+        world = io.read_tsp(path).world(name='rounded')
+        self.assertIsInstance(world, World)
+        self.assertEqual(world.name, 'rounded')
+        self.assertEqual(world.description, 'a test')
+        tour = data.optimal_tour
+        self.assertEqual(world.distances[tour, np.roll(tour, -1)].sum(), 564)
@@ -0,0 +1,95 @@
+from ..localsearch import LocalSearch, improve
+from ..solver import Solver
+from ..world import World, SparseWorld, Position
+from . import random_world
+import unittest
+
+import numpy as np
+
+
+def tour_length(world, tour):
+    tour = np.asarray(tour)
+    return world.distances[tour, np.roll(tour, -1)].sum()
+
+
+class LocalSearchTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.positions = [Position(x, y) for x, y in rng.random((60, 2))]
+        self.world = World(self.positions)
+        self.tour = rng.permutation(60)
+
+    def check(self, world, moves):
+        before = tour_length(world, self.tour)
+        tour, distance = LocalSearch(moves)(world, self.tour)
+        self.assertEqual(sorted(tour), list(range(60)))
+        self.assertAlmostEqual(distance, tour_length(world, tour))
+        self.assertLess(distance, before / 2)
+        return tour, distance
+
+    def test_two_opt(self):
+        self.check(self.world, ('2-opt',))
+
+    def test_or_opt(self):
+        self.check(self.world, ('or-opt',))
+
+    def test_improved_tour_is_local_optimum(self):
+        tour, distance = self.check(self.world, ('2-opt', 'or-opt'))
+        _, other = LocalSearch()(self.world, tour)
+        self.assertAlmostEqual(distance, other)
+
+    def test_or_opt_moves_misplaced_node(self):
+        world = World([Position(x, 0) for x in range(10)])
+        tour = [0, 1, 2, 7, 3, 4, 5, 6, 8, 9]
+        tour, distance = LocalSearch(('or-opt',))(world, tour)
+        self.assertAlmostEqual(distance, 18)
+
+    def test_sparse_world(self):
+        world = SparseWorld(self.positions, candidates=8)
+        self.check(world, ('2-opt', 'or-opt'))
+
+    def test_lin_kernighan_improves_two_opt(self):
+        tour, distance = LocalSearch()(self.world, self.tour)
+        polished, shorter = improve(self.world, tour)
+        self.assertEqual(sorted(polished), list(range(60)))
+        self.assertAlmostEqual(shorter, tour_length(self.world, polished))
+        self.assertLessEqual(shorter, distance)
+        _, only = LocalSearch(('lk',))(self.world, self.tour)
+        self.assertLess(only, tour_length(self.world, self.tour) / 2)
+
+    def test_improve_respects_time_budget(self):
+        tour, distance = improve(self.world, self.tour, time_budget=0)
+        self.assertEqual(list(tour), list(self.tour))
+
+    def test_unknown_move(self):
+        with self.assertRaises(ValueError):
+            LocalSearch(('3-opt',))
+
+
+class SolverLocalSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(80, 1)
+
+    def test_local_search_shortens_solution(self):
+        plain = Solver(limit=5, seed=0).solve(self.world)
+        for scope in ('best', 'all'):
+            best = Solver(limit=5, seed=0, local_search=LocalSearch(),
+                          local_search_scope=scope).solve(self.world)
+            self.assertLess(best.distance, plain.distance)
+            self.assertAlmostEqual(best.distance,
+                                   tour_length(self.world, best.visited))
+
+    def test_polish_best_solution(self):
+        plain = Solver(limit=3, seed=0).solve(self.world)
+        best = Solver(limit=3, seed=0, polish=True).solve(self.world)
+        self.assertLess(best.distance, plain.distance)
+        self.assertAlmostEqual(best.distance,
+                               tour_length(self.world, best.visited))
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            Solver(local_search_scope='some')
+
+
+if __name__ == '__main__':
+    unittest.main()
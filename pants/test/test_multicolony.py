@@ -0,0 +1,118 @@
+from ..multicolony import MultiColonySolver
+from . import random_world
+import threading
+import time
+import unittest
+
+import numpy as np
+
+
+def _fail(world, tour):
+    raise RuntimeError('island failed')
+
+
+class MultiColonySolverTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(20)
+
+    def test_solutions_improve_and_are_tours(self):
+        solver = MultiColonySolver(colonies=3, migration=4, limit=10,
+                                   ant_count=5, seed=0)
+        solutions = list(solver.solutions(self.world))
+        self.assertTrue(solutions)
+        distances = [ant.distance for ant in solutions]
+        self.assertEqual(distances, sorted(distances, reverse=True))
+        for ant in solutions:
+            self.assertEqual(sorted(ant.visited), list(range(20)))
+            tour = np.asarray(ant.visited)
+            self.assertAlmostEqual(ant.distance, self.world.distances[
+                tour, np.roll(tour, -1)].sum())
+
+    def test_seed_is_reproducible(self):
+        kwargs = dict(colonies=2, migration=3, limit=6, ant_count=4, seed=1,
+                      topology='full')
+        first = MultiColonySolver(**kwargs).solve(self.world)
+        second = MultiColonySolver(**kwargs).solve(self.world)
+        self.assertEqual(list(first.visited), list(second.visited))
+
+    def test_params_override_each_colony(self):
+        solver = MultiColonySolver(colonies=2, beta=2,
+                                   params=[dict(rho=0.5), dict(beta=5)])
+        self.assertEqual([s.beta for s in solver.solvers], [2, 5])
+        self.assertEqual([s.rho for s in solver.solvers], [0.5, 0.8])
+
+    def test_each_island_stops_at_its_own_limit(self):
+        solver = MultiColonySolver(colonies=2, migration=4, limit=10,
+                                   params=[dict(limit=3), dict(limit=6)],
+                                   ant_count=4, seed=0)
+        best = solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'limit')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_time_limit_ends_the_search(self):
+        solver = MultiColonySolver(colonies=2, migration=5, limit=10 ** 9,
+                                   time_limit=0.5, ant_count=4, seed=0)
+        start = time.perf_counter()
+        best = solver.solve(self.world)
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(solver.stop_reason, 'time_limit')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_target_length_ends_the_search(self):
+        solver = MultiColonySolver(colonies=2, migration=2, limit=10 ** 9,
+                                   target_length=10 ** 6, seed=0)
+        solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'target')
+
+    def test_stop_from_another_thread(self):
+        solver = MultiColonySolver(colonies=2, migration=2, limit=10 ** 9,
+                                   ant_count=4, seed=0)
+        timer = threading.Timer(0.5, solver.stop)
+        timer.start()
+        best = solver.solve(self.world)
+        timer.join()
+        self.assertEqual(solver.stop_reason, 'cancelled')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_stop_before_run(self):
+        solver = MultiColonySolver(colonies=2, migration=2, limit=4,
+                                   ant_count=4, seed=0)
+        solver.stop()
+        self.assertEqual(list(solver.solutions(self.world)), [])
+        self.assertEqual(solver.stop_reason, 'cancelled')
+        self.assertIsNotNone(solver.solve(self.world))
+        self.assertEqual(solver.stop_reason, 'limit')
+
+    def test_solutions_are_streamed_between_exchanges(self):
+        world = random_world(60, 1)
+        solver = MultiColonySolver(colonies=2, migration=300, limit=300,
+                                   ant_count=10, seed=0)
+        start = time.perf_counter()
+        solutions = solver.solutions(world)
+        next(solutions)
+        first = time.perf_counter() - start
+        for _ in solutions:
+            pass
+        self.assertLess(first, (time.perf_counter() - start) / 2)
+
+    def test_dead_island_raises_its_error(self):
+        solver = MultiColonySolver(colonies=2, migration=2, limit=4,
+                                   params=[{}, dict(local_search=_fail)],
+                                   local_search_scope='all', seed=0)
+        with self.assertRaises(EOFError):
+            solver.solve(self.world)
+
+    def test_ring_and_full_migration(self):
+        bests = [('a', 3), ('b', 1), ('c', 2)]
+        ring = MultiColonySolver(colonies=3).migrate(bests)
+        self.assertEqual(ring, [[('c', 2)], [('a', 3)], [('b', 1)]])
+        full = MultiColonySolver(colonies=3, topology='full').migrate(bests)
+        self.assertEqual(full, [[('b', 1)], [('c', 2)], [('b', 1)]])
+
+    def test_unknown_topology(self):
+        with self.assertRaises(ValueError):
+            MultiColonySolver(topology='star')
+
+
+if __name__ == '__main__':
+    unittest.main()
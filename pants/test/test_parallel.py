@@ -0,0 +1,109 @@
+from ..parallel import SharedArray, MappedArray, ParallelColony
+from ..solver import Solver
+from ..world import World, SparseWorld
+from . import random_positions
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+
+class SharedArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.array = SharedArray.copy_of(np.arange(6.0).reshape(2, 3))
+
+    def tearDown(self):
+        self.array.unlink()
+
+    def test_shared_array_pickles_by_reference(self):
+        data = pickle.dumps(self.array)
+        self.assertLess(len(data), self.array.nbytes + 50)
+        other = pickle.loads(data)
+        self.array[1, 2] = 42
+        self.assertEqual(other[1, 2], 42)
+
+    def test_shared_array_views_pickle_as_copies(self):
+        view = pickle.loads(pickle.dumps(self.array[1]))
+        self.array[1, 0] = -1
+        self.assertEqual(view[0], 3)
+
+
+class MappedArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'array.npy')
+        np.save(self.path, np.arange(1200.0).reshape(30, 40))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_mapped_array_pickles_by_file_name(self):
+        array = MappedArray.of(np.load(self.path, mmap_mode='c'))
+        data = pickle.dumps(array)
+        self.assertLess(len(data), array.nbytes)
+        other = pickle.loads(data)
+        self.assertIsInstance(other, MappedArray)
+        self.assertEqual(other.tolist(), np.load(self.path).tolist())
+        self.assertFalse(other.flags.writeable)
+
+    def test_mapped_array_views_pickle_as_copies(self):
+        array = MappedArray.of(np.load(self.path, mmap_mode='r'))
+        view = pickle.loads(pickle.dumps(array[1]))
+        self.assertEqual(view.tolist(), list(range(40, 80)))
+
+
+class ParallelColonyTest(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(25)
+
+    def test_parallel_colony_tours_are_permutations(self):
+        world = World(self.positions)
+        with ParallelColony(world, 2, rng=np.random.default_rng(0)) as colony:
+            tours, distances = colony.construct(range(5))
+        self.assertEqual(tours.dtype, np.int32)
+        self.assertEqual(list(tours[:, 0]), list(range(5)))
+        for tour, distance in zip(tours, distances):
+            self.assertEqual(sorted(tour), list(range(25)))
+            self.assertAlmostEqual(
+                distance, world.distances[tour, np.roll(tour, -1)].sum())
+
+    def test_parallel_colony_sees_pheromone_updates(self):
+        world = World(self.positions)
+        with ParallelColony(world, 2, beta=0) as colony:
+            world.reset_pheromone(1e-9)
+            for a in range(25):
+                world.pheromone[a, (a + 1) % 25] = 1
+            tours, _ = colony.construct([0, 10, 20])
+        for tour in tours:
+            self.assertTrue(np.all(np.diff(tour) % 25 == 1))
+
+    def test_parallel_colony_maps_stored_distances(self):
+        with tempfile.TemporaryDirectory() as storage:
+            world = World(self.positions, storage=storage)
+            with ParallelColony(world, 2,
+                                rng=np.random.default_rng(0)) as colony:
+                self.assertIsInstance(colony.distances, MappedArray)
+                self.assertEqual(colony.shared, [colony.pheromone])
+                tours, distances = colony.construct(range(4))
+            for tour, distance in zip(tours, distances):
+                self.assertEqual(sorted(tour), list(range(25)))
+                self.assertAlmostEqual(distance, World(self.positions)
+                                       .distances[tour, np.roll(tour, -1)]
+                                       .sum())
+
+    def test_solver_with_workers_on_sparse_world(self):
+        world = SparseWorld(self.positions, candidates=5)
+        best = Solver(limit=3, ant_count=4, workers=2, seed=0).solve(world)
+        self.assertEqual(sorted(best.visited), list(range(25)))
+
+    def test_solver_with_workers_in_colony_system(self):
+        world = World(self.positions)
+        solver = Solver(mode='acs', limit=3, ant_count=4, workers=2, seed=0)
+        best = solver.solve(world)
+        self.assertEqual(sorted(best.visited), list(range(25)))
+
+
+if __name__ == '__main__':
+    unittest.main()
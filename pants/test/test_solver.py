@@ -1,10 +1,18 @@
 from ..ant import Ant
-from ..world import World, Edge, Node
-from ..solver import Solver
+from ..world import World, SparseWorld, Edge, Node, Position
+from ..solver import Solver, CancellationToken
+from . import random_positions, random_world
 
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import unittest
 from unittest import mock
 
+import numpy as np
+
 class SolverTest(unittest.TestCase):
     def setUp(self):
         self.nodes = [Node(name='a'), Node(name='b')]
@@ -49,7 +57,363 @@ class SolverTest(unittest.TestCase):
                 "Ants were not placed on nodes to start evenly")
         self.assertEqual(sum(ants_on.values()), ant_count,
                 "Not all ants were placed on a node to start")
-        
-        
+
+
+
+class PheromoneUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.world = World([Position(0, 0), Position(1, 0), Position(1, 1),
+                            Position(0, 1)])
+        self.world.reset_pheromone(1)
+
+    def make_ant(self, tour):
+        ant = Ant().initialize(self.world, start=tour[0])
+        for node in tour[1:]:
+            ant.make_move(node)
+        ant.make_move(None)
+        return ant
+
+    def test_evaporation_scales_every_edge(self):
+        solver = Solver(rho=0.25)
+        solver.evaporate_pheromone_matrix(self.world)
+        self.assertTrue(np.allclose(self.world.pheromone,
+                                    0.75 * (1 - np.eye(4))))
+
+    def test_global_update_deposits_on_tour_edges_of_better_half(self):
+        solver = Solver(Q=2, t0=0)
+        best = self.make_ant([0, 1, 2, 3])
+        worst = self.make_ant([0, 2, 1, 3])
+        solver.global_update([worst, best])
+        self.assertAlmostEqual(self.world.pheromone[3, 0], 1 + 2 / 4)
+        self.assertAlmostEqual(self.world.pheromone[0, 2], 1)
+
+    def test_global_update_clips_to_t0(self):
+        solver = Solver(t0=0.5)
+        self.world.reset_pheromone(0.1)
+        ants = [self.make_ant([0, 1, 2, 3]), self.make_ant([0, 1, 2, 3])]
+        solver.global_update(ants)
+        self.assertTrue(np.all(self.world.pheromone + np.eye(4) >= 0.5))
+        self.assertTrue(np.all(np.diag(self.world.pheromone) == 0))
+
+    def test_trace_elite_accumulates_repeated_edges(self):
+        solver = Solver(elite=1, Q=4)
+        ant = self.make_ant([0, 1, 2, 3])
+        solver.trace_elite(ant)
+        solver.trace_elite(ant)
+        self.assertAlmostEqual(self.world.pheromone[1, 2], 3)
+
+
+
+class SolveTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(15)
+
+    def test_solve_returns_complete_tour(self):
+        best = Solver(limit=5, seed=0).solve(self.world)
+        self.assertEqual(sorted(best.visited), list(range(15)))
+        tour = np.array(best.visited)
+        expected = self.world.distances[tour, np.roll(tour, -1)].sum()
+        self.assertAlmostEqual(best.distance, expected)
+
+    def test_solve_is_reproducible_with_seed(self):
+        a = Solver(limit=5, seed=3, ant_count=0).solve(self.world)
+        b = Solver(limit=5, seed=3, ant_count=0).solve(self.world)
+        self.assertEqual(a.visited, b.visited)
+
+    def test_solve_sparse_world(self):
+        world = SparseWorld(self.world._nodes, candidates=4)
+        best = Solver(limit=5, seed=0).solve(world)
+        self.assertEqual(sorted(best.visited), list(range(15)))
+        self.assertAlmostEqual(best.distance,
+                               self.world.distances[best.visited,
+                                                    np.roll(best.visited, -1)
+                                                    ].sum())
+
+    def test_choice_info_refreshed_from_pheromone(self):
+        solver = Solver(alpha=1, beta=1)
+        self.world.reset_pheromone(2)
+        solver.update_choice_info(self.world)
+        heuristic = solver.heuristic
+        self.world.pheromone *= 3
+        solver.update_choice_info(self.world)
+        self.assertIs(solver.heuristic, heuristic)
+        self.assertTrue(np.allclose(solver.choice_info,
+                                    self.world.pheromone * heuristic))
+
+    def test_heuristic_recomputed_for_new_beta(self):
+        solver = Solver(beta=1)
+        solver.update_choice_info(self.world)
+        solver.beta = 2
+        solver.update_choice_info(self.world)
+        self.assertTrue(np.allclose(solver.heuristic,
+                                    self.world.heuristic(2)))
+
+    def test_solutions_improve(self):
+        distances = [a.distance for a in Solver(limit=10).solutions(self.world)]
+        self.assertEqual(distances, sorted(distances, reverse=True))
+
+
+class MaxMinTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(20)
+
+    def test_pheromone_stays_within_bounds(self):
+        solver = Solver(mode='mmas', rho=0.1, limit=10, seed=0)
+        best = solver.solve(self.world)
+        self.assertAlmostEqual(solver.tau_max, 1 / (0.1 * best.distance))
+        self.assertLess(solver.tau_min, solver.tau_max)
+        off = ~np.eye(20, dtype=bool)
+        levels = self.world.pheromone[off]
+        self.assertTrue(np.all(levels >= solver.tau_min - 1e-12))
+        self.assertTrue(np.all(levels <= solver.tau_max + 1e-12))
+
+    def test_global_best_schedule(self):
+        solver = Solver(mode='mmas')
+        solver.since_restart = 10
+        self.assertFalse(solver.deposits_global_best())
+        solver.since_restart = 300
+        self.assertTrue(solver.deposits_global_best())
+        solver.gb_every = 4
+        solver.since_restart = 8
+        self.assertTrue(solver.deposits_global_best())
+        solver.since_restart = 9
+        self.assertFalse(solver.deposits_global_best())
+
+    def test_stagnation_reinitializes_pheromone(self):
+        solver = Solver(mode='mmas', stagnation=3, limit=30, seed=0)
+        solver.initialize(self.world)
+        for _ in range(30):
+            solver.step()
+            if solver.since_restart == 0:
+                off = ~np.eye(20, dtype=bool)
+                self.assertTrue(np.allclose(self.world.pheromone[off],
+                                            solver.tau_max))
+        self.assertGreater(solver.restarts, 0)
+
+    def test_mmas_on_sparse_world(self):
+        world = SparseWorld(self.world._nodes, candidates=5)
+        solver = Solver(mode='mmas', rho=0.1, limit=10, seed=0,
+                        min_branching=1.5)
+        best = solver.solve(world)
+        self.assertEqual(sorted(best.visited), list(range(20)))
+        self.assertTrue(np.all(world.pheromone.data <= solver.tau_max))
+        self.assertLessEqual(world.pheromone.default, solver.tau_max)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Solver(mode='xyz')
+
+
+class ColonySystemTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(20)
+
+    def test_only_global_best_edges_change(self):
+        solver = Solver(mode='acs', rho=0.1, xi=0, t0=0.01, ant_count=4)
+        solver.initialize(self.world)
+        solver.step()
+        tour = np.array(solver.global_best.visited)
+        best = np.zeros((20, 20), dtype=bool)
+        best[tour, np.roll(tour, -1)] = True
+        expected = 0.9 * 0.01 + 0.1 / solver.global_best.distance
+        self.assertTrue(np.allclose(self.world.pheromone[best], expected))
+        off = ~best & ~np.eye(20, dtype=bool)
+        self.assertTrue(np.allclose(self.world.pheromone[off], 0.01))
+
+    def test_local_update_decays_towards_t0(self):
+        solver = Solver(xi=0.5, t0=0.2)
+        solver.initialize(self.world)
+        self.world.reset_pheromone(1)
+        solver.local_update([list(range(20))])
+        self.assertAlmostEqual(self.world.pheromone[3, 4], 0.6)
+        self.assertAlmostEqual(self.world.pheromone[19, 0], 0.6)
+        self.assertAlmostEqual(self.world.pheromone[4, 3], 1)
+
+    def test_acs_solve(self):
+        for world in (self.world, SparseWorld(self.world._nodes,
+                                              candidates=5)):
+            best = Solver(mode='acs', limit=10, seed=0).solve(world)
+            self.assertEqual(sorted(best.visited), list(range(20)))
+            tour = np.array(best.visited)
+            self.assertAlmostEqual(best.distance, self.world.distances[
+                tour, np.roll(tour, -1)].sum())
+
+
+class StoppingTest(unittest.TestCase):
+    def setUp(self):
+        self.world = random_world(20)
+
+    def test_stops_at_limit(self):
+        solver = Solver(limit=4, seed=0)
+        solver.solve(self.world)
+        self.assertEqual(solver.iteration, 4)
+        self.assertEqual(solver.stop_reason, 'limit')
+
+    def test_time_limit(self):
+        solver = Solver(limit=10 ** 6, time_limit=0.2, seed=0)
+        best = solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'time_limit')
+        self.assertLess(solver.elapsed(), 5)
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_max_stall_iterations(self):
+        solver = Solver(limit=10 ** 6, max_stall_iterations=5, seed=0)
+        solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'stall')
+        self.assertEqual(solver.stall, 5)
+
+    def test_target_length(self):
+        target = Solver(limit=3, seed=0).solve(self.world).distance
+        solver = Solver(limit=100, target_length=target, seed=0)
+        best = solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'target')
+        self.assertLessEqual(best.distance, target)
+        self.assertLessEqual(solver.iteration, 3)
+
+    def test_cancellation_token(self):
+        token = CancellationToken()
+        solver = Solver(limit=10 ** 6, cancel=token, seed=0)
+        for count, ant in enumerate(solver.solutions(self.world)):
+            if count == 1:
+                token.cancel()
+        self.assertEqual(solver.stop_reason, 'cancelled')
+        self.assertIsNotNone(solver.global_best)
+
+    def test_stop_from_another_thread(self):
+        solver = Solver(limit=10 ** 6, seed=0)
+        timer = threading.Timer(0.2, solver.stop)
+        timer.start()
+        best = solver.solve(self.world)
+        timer.join()
+        self.assertEqual(solver.stop_reason, 'cancelled')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_stop_before_run(self):
+        solver = Solver(limit=3, seed=0)
+        solver.stop()
+        self.assertEqual(list(solver.solutions(self.world)), [])
+        self.assertEqual(solver.stop_reason, 'cancelled')
+        self.assertEqual(solver.iteration, 0)
+        best = solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'limit')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_shared_token_is_not_reset(self):
+        token = CancellationToken()
+        solver = Solver(limit=3, seed=0, cancel=token)
+        solver.solve(self.world)
+        token.cancel()
+        self.assertEqual(list(solver.solutions(self.world)), [])
+        self.assertTrue(token.cancelled)
+
+    def test_interrupted_solve_returns_best_so_far(self):
+        solver = Solver(limit=10, seed=0)
+        step = solver.step
+        def interrupt():
+            if solver.iteration == 3:
+                raise KeyboardInterrupt
+            return step()
+        solver.step = interrupt
+        best = solver.solve(self.world)
+        self.assertEqual(solver.stop_reason, 'interrupted')
+        self.assertEqual(sorted(best.visited), list(range(20)))
+
+
+class AsyncTest(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(20)
+
+    def test_solve_async_matches_solve(self):
+        world = World(self.positions)
+        best = asyncio.run(Solver(limit=5, seed=0).solve_async(world))
+        expected = Solver(limit=5, seed=0).solve(world)
+        self.assertEqual(best.visited, expected.visited)
+
+    def test_asolutions_improve(self):
+        async def collect():
+            solver = Solver(limit=10, seed=0)
+            return [ant.distance async for ant in
+                    solver.asolutions(World(self.positions))]
+        distances = asyncio.run(collect())
+        self.assertTrue(distances)
+        self.assertEqual(distances, sorted(distances, reverse=True))
+
+    def test_concurrent_solves_with_bounded_executor(self):
+        async def solve_all(executor):
+            return await asyncio.gather(*(
+                Solver(limit=5, seed=seed).solve_async(
+                    World(self.positions), executor)
+                for seed in range(4)))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            bests = asyncio.run(solve_all(executor))
+        for best in bests:
+            self.assertEqual(sorted(best.visited), list(range(20)))
+
+    def test_cancel_stops_at_iteration_boundary(self):
+        solver = Solver(limit=10 ** 6, seed=0)
+
+        async def run():
+            task = asyncio.ensure_future(
+                solver.solve_async(World(self.positions)))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        asyncio.run(run())
+        self.assertTrue(solver.token.cancelled)
+        self.assertEqual(sorted(solver.global_best.visited), list(range(20)))
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(20)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.npz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_resume(self, make_world, **kwargs):
+        world = make_world()
+        expected = Solver(limit=10, seed=4, **kwargs).solve(world)
+        pheromone = np.array(world.pheromone.data if hasattr(
+            world.pheromone, 'data') else world.pheromone)
+
+        world = make_world()
+        Solver(limit=6, seed=4, checkpoint=self.path, **kwargs).solve(world)
+        world = make_world()
+        best = Solver.resume(world, self.path, limit=10)
+        resumed = np.array(world.pheromone.data if hasattr(
+            world.pheromone, 'data') else world.pheromone)
+        self.assertEqual(best.visited, expected.visited)
+        self.assertEqual(best.distance, expected.distance)
+        self.assertTrue(np.array_equal(resumed, pheromone))
+
+    def test_resume_continues_exactly(self):
+        self.check_resume(lambda: World(self.positions))
+
+    def test_resume_mmas_on_sparse_world(self):
+        self.check_resume(lambda: SparseWorld(self.positions, candidates=5),
+                          mode='mmas', rho=0.1)
+
+    def test_checkpoints_are_written_periodically(self):
+        solver = Solver(limit=5, seed=0, checkpoint=self.path,
+                        checkpoint_every=2)
+        solver.initialize(World(self.positions))
+        solver.advance()
+        self.assertFalse(os.path.exists(self.path))
+        solver.advance()
+        restored = Solver.restore(World(self.positions), self.path)
+        self.assertEqual(restored.iteration, 2)
+        self.assertEqual(restored.global_best.distance,
+                         solver.global_best.distance)
+        self.assertEqual(os.listdir(self.directory.name), ['run.npz'])
+
+    def test_restore_rejects_other_world(self):
+        Solver(limit=1, checkpoint=self.path).solve(World(self.positions))
+        with self.assertRaises(ValueError):
+            Solver.restore(World(self.positions[:10]), self.path)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
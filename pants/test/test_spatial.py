@@ -0,0 +1,43 @@
+from ..spatial import nearest_neighbours
+import unittest
+
+import numpy as np
+
+
+class NearestNeighboursTest(unittest.TestCase):
+    def brute_force(self, coords, k):
+        delta = coords[:, None, :] - coords
+        dist = np.hypot(delta[..., 0], delta[..., 1])
+        np.fill_diagonal(dist, np.inf)
+        return np.sort(dist, axis=1)[:, :k]
+
+    def test_neighbours_match_brute_force(self):
+        coords = np.random.default_rng(0).random((500, 2))
+        _, distances = nearest_neighbours(coords, 8)
+        self.assertTrue(np.allclose(distances, self.brute_force(coords, 8)))
+
+    def test_neighbours_of_clustered_points(self):
+        rng = np.random.default_rng(1)
+        coords = np.concatenate([rng.random((100, 2)),
+                                 rng.random((100, 2)) + 50])
+        _, distances = nearest_neighbours(coords, 5)
+        self.assertTrue(np.allclose(distances, self.brute_force(coords, 5)))
+
+    def test_neighbours_of_collinear_points(self):
+        coords = np.c_[np.zeros(20), np.arange(20)]
+        neighbours, _ = nearest_neighbours(coords, 2)
+        self.assertEqual(sorted(neighbours[0]), [1, 2])
+        self.assertEqual(sorted(neighbours[10]), [9, 11])
+
+    def test_neighbours_exclude_the_point_itself(self):
+        coords = np.random.default_rng(2).random((50, 2))
+        neighbours, _ = nearest_neighbours(coords, 4)
+        self.assertFalse(np.any(neighbours == np.arange(50)[:, None]))
+
+    def test_neighbours_capped_at_other_points(self):
+        neighbours, _ = nearest_neighbours([(0, 0), (1, 0), (2, 0)], 10)
+        self.assertEqual(neighbours.shape, (3, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
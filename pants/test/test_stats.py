@@ -0,0 +1,77 @@
+from ..world import World, SparseWorld
+from ..solver import Solver
+from ..stats import SolverStats
+from . import random_positions
+
+import unittest
+
+
+class SolverStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(20)
+
+    def test_disabled_by_default(self):
+        solver = Solver(limit=2, seed=0)
+        self.assertIsNone(solver.stats)
+        self.assertNotIn('step', vars(solver))
+        self.assertNotIn('find_solutions', vars(solver))
+
+    def test_stats_do_not_change_the_search(self):
+        plain = Solver(limit=5, seed=0).solve(World(self.positions))
+        timed = Solver(limit=5, seed=0, stats=True).solve(
+            World(self.positions))
+        self.assertEqual(timed.distance, plain.distance)
+        self.assertEqual(timed.ids.tolist(), plain.ids.tolist())
+
+    def test_phases_are_timed(self):
+        solver = Solver(limit=4, ant_count=6, seed=0, stats=True)
+        solver.solve(World(self.positions))
+        stats = solver.stats
+        self.assertEqual(stats.iterations, 4)
+        for name in ('find_solutions', 'iteration_best', 'rank_ants',
+                     'evaporate_pheromone_matrix', 'global_update',
+                     'trace_elite'):
+            self.assertEqual(stats.calls[name], 4)
+            self.assertGreater(stats.times[name], 0)
+        self.assertEqual(stats.calls['bounded_update'], 0)
+        self.assertLessEqual(stats.times['find_solutions'], stats.step_time)
+        self.assertIn('find_solutions', stats.as_dict()['phases'])
+        self.assertNotIn('bounded_update', stats.as_dict()['phases'])
+
+    def test_counters(self):
+        solver = Solver(limit=3, ant_count=6, seed=0, stats=True)
+        solver.solve(World(self.positions))
+        stats = solver.stats
+        self.assertEqual(stats.moves, 3 * 6 * 19)
+        self.assertEqual(stats.length_evaluations, 3 * 6 * 20)
+        self.assertEqual(stats.weight_evaluations, 3 * 6 * 19 * 20)
+
+    def test_counters_with_candidates(self):
+        solver = Solver(limit=2, ant_count=4, mode='mmas', seed=0, stats=True)
+        solver.solve(SparseWorld(self.positions, candidates=5))
+        self.assertEqual(solver.stats.weight_evaluations, 2 * 4 * 19 * 5)
+        self.assertEqual(solver.stats.calls['bounded_update'], 2)
+
+    def test_initialize_resets_the_stats(self):
+        solver = Solver(limit=3, seed=0, stats=True)
+        solver.solve(World(self.positions))
+        solver.solve(World(self.positions))
+        self.assertEqual(solver.stats.iterations, 3)
+
+    def test_profile_captures_iterations(self):
+        solver = Solver(limit=4, seed=0, profile=2)
+        solver.solve(World(self.positions))
+        stats = solver.stats
+        self.assertIsInstance(stats, SolverStats)
+        self.assertEqual(stats.iterations, 4)
+        self.assertEqual(stats.profiled, 2)
+        self.assertGreater(stats.peak_bytes, 0)
+        self.assertIsNotNone(stats.snapshot)
+        summary = stats.summary()
+        self.assertIn('4 iterations', summary)
+        self.assertIn('find_solutions', summary)
+        self.assertIn('profile of 2 iterations', summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from .. import viz
+from ..world import World, Node, Position
+from ..ant import Ant
+import subprocess
+import sys
+import unittest
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class ImportTest(unittest.TestCase):
+    def test_import_pants_skips_optional_modules(self):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, pants; print(" ".join(sorted(sys.modules)))'])
+        modules = {name.split('.')[0] for name in output.decode().split()}
+        for name in ('matplotlib', 'pandas', 'asyncio', 'multiprocessing',
+                     'concurrent', 'cProfile', 'pstats', 'tracemalloc'):
+            self.assertNotIn(name, modules)
+        for name in ('pants.viz', 'pants.parallel', 'pants.multicolony'):
+            self.assertNotIn(name, output.decode().split())
+
+
+class VizTest(unittest.TestCase):
+    def setUp(self):
+        self.world = World([Node(Position(x, y))
+                            for x, y in [(0, 0), (1, 0), (1, 1), (0, 1)]])
+
+    @unittest.skipIf(plt is None, 'needs matplotlib')
+    def test_plot_tour(self):
+        ant = Ant().initialize(self.world).record([0, 1, 2, 3], 4)
+        ax = ant.plot_tour(show=False)
+        line = ax.lines[-1]
+        self.assertEqual(list(line.get_xdata()), [0, 1, 1, 0, 0])
+        self.assertEqual(list(line.get_ydata()), [0, 0, 1, 1, 0])
+        self.assertIs(self.world.plot_nodes(ax=ax, show=False), ax)
+        plt.close('all')
+
+    @unittest.skipIf(pandas is None, 'needs pandas')
+    def test_pheromone_frame(self):
+        self.world.reset_pheromone(0.5)
+        frame = viz.pheromone_frame(self.world)
+        self.assertEqual(frame.shape, (4, 4))
+        self.assertEqual(frame.iloc[0, 1], 0.5)
@@ -1,6 +1,14 @@
-from ..world import World, Edge
+from ..world import World, SparseWorld, SparseMatrix, Edge, Node, Position
+from ..solver import Solver
+from ..colony import Colony
+from . import random_positions
+import functools
 import unittest
 import math
+import os
+import tempfile
+
+import numpy as np
 
 class WorldTest(unittest.TestCase):
     def setUp(self):
@@ -125,7 +133,357 @@ class EdgeEquality(EdgeTest):
         e1 = Edge(self.nodeA, self.nodeB)
         e2 = Edge(self.nodeB, self.nodeA)
         self.assertNotEqual(e1, e2)
-            
+
+
+
+class DenseStorage(unittest.TestCase):
+    def setUp(self):
+        self.positions = [Position(0, 0), Position(3, 0), Position(0, 4)]
+
+    def test_world_distances_default_to_euclidean(self):
+        w = World(self.positions)
+        self.assertEqual(w.distances.shape, (3, 3))
+        self.assertEqual(w.distances[1, 2], 5)
+        self.assertTrue(np.all(np.diag(w.distances) == 0))
+
+    def test_world_distances_computed_from_lfunc(self):
+        w = World(self.positions, lambda a, b: abs(a[0] - b[0]))
+        self.assertEqual(w.distances[1, 0], 3)
+        self.assertEqual(w.distances[2, 0], 0)
+
+    def test_world_distances_honor_dtype(self):
+        w = World(self.positions, dtype=np.float32)
+        self.assertEqual(w.distances.dtype, np.float32)
+        self.assertEqual(w.pheromone.dtype, np.float32)
+
+    def test_world_nodes_are_indices(self):
+        World(self.positions)
+        w = World(self.positions)
+        self.assertEqual(w.nodes.tolist(), [0, 1, 2])
+        self.assertIs(w.nodes, w.nodes)
+        with self.assertRaises(ValueError):
+            w.nodes[0] = 1
+        self.assertEqual(w.data(2).position, (0, 4))
+
+    def test_world_from_coords_creates_nodes_lazily(self):
+        coords = np.array([[0, 0], [3, 0], [0, 4]])
+        w = World(coords)
+        self.assertEqual(w.nodes.tolist(), [0, 1, 2])
+        self.assertEqual(w.distances[1, 2], 5)
+        self.assertEqual(w._nodes.created, {})
+        node = w.data(2)
+        self.assertEqual(node.position, (0, 4))
+        self.assertIs(w.data(2), node)
+        self.assertEqual(len(w._nodes.created), 1)
+        self.assertIs(w.find_note_by_id(node.uid), node)
+        with self.assertRaises(ValueError):
+            World(np.zeros((3, 3)))
+
+    def test_world_finds_nodes_by_uid(self):
+        nodes = [Node(p) for p in self.positions]
+        w = World(nodes)
+        self.assertIs(w.find_note_by_id(nodes[1].uid), nodes[1])
+        self.assertIsNone(w.find_note_by_id(-1))
+
+    def test_node_and_edge_equality(self):
+        node = Node(Position(1, 2))
+        self.assertEqual(node, node)
+        self.assertNotEqual(node, Node(Position(1, 2)))
+        self.assertEqual(Position(1, 2), Position(1, 2))
+        self.assertEqual(len({node, node}), 1)
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+        w = World(self.positions)
+        self.assertEqual(w.edges[0, 1], w.data(0, 1))
+        self.assertNotEqual(w.edges[0, 1], w.edges[1, 0])
+
+    def test_world_edge_view_reads_matrices(self):
+        w = World(self.positions)
+        edge = w.data(1, 2)
+        self.assertEqual(edge.length, 5)
+        self.assertEqual(edge.start, w.data(1))
+        self.assertIsNone(w.data(1, 1))
+        self.assertEqual(len(w.edges), 6)
+
+    def test_world_edge_view_writes_pheromone(self):
+        w = World(self.positions)
+        w.edges[0, 1].pheromone = 7
+        self.assertEqual(w.pheromone[0, 1], 7)
+        self.assertEqual(w.edges[0, 1].pheromone, 7)
+
+    def test_world_reset_pheromone_keeps_diagonal_empty(self):
+        w = World(self.positions)
+        w.reset_pheromone(2)
+        self.assertTrue(np.all(np.diag(w.pheromone) == 0))
+        self.assertEqual(w.pheromone[2, 1], 2)
+
+
+class ChoiceInfo(unittest.TestCase):
+    def setUp(self):
+        self.world = World([Position(0, 0), Position(2, 0), Position(0, 4)])
+
+    def test_world_heuristic_is_inverse_length_to_beta(self):
+        heuristic = self.world.heuristic(2)
+        self.assertAlmostEqual(heuristic[0, 1], 0.25)
+        self.assertAlmostEqual(heuristic[0, 0], 1)
+
+    def test_world_choice_info_matches_edge_weight(self):
+        self.world.pheromone[1, 2] = 3
+        choice = self.world.choice_info(2, self.world.heuristic(3))
+        self.assertAlmostEqual(choice[1, 2],
+                               self.world.edges[1, 2].weight(alpha=2, beta=3))
+
+    def test_world_choice_info_reuses_out(self):
+        heuristic = self.world.heuristic(1)
+        out = np.empty_like(heuristic)
+        self.assertIs(self.world.choice_info(1, heuristic, out=out), out)
+
+
+class MemmapStorage(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(30)
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_world_distances_are_memory_mapped(self):
+        world = World(self.positions, storage=self.storage)
+        self.assertIsInstance(world.distances, np.memmap)
+        self.assertTrue(np.allclose(world.distances,
+                                    World(self.positions).distances))
+
+    def test_world_distances_file_is_reused(self):
+        World(self.positions, storage=self.storage)
+        files = os.listdir(self.storage)
+        self.assertEqual(len(files), 1)
+        calls = []
+        def lfunc(a, b):
+            calls.append((a, b))
+            return 1
+        World(self.positions, storage=self.storage)
+        World(self.positions, lfunc, storage=self.storage)
+        World(self.positions, lfunc, storage=self.storage)
+        self.assertEqual(len(os.listdir(self.storage)), 2)
+        self.assertEqual(len(calls), 30 * 29 + 2 * World.digest_samples)
+
+    def test_world_distances_files_differ_by_bound_arguments(self):
+        def scaled(a, b, s):
+            return s * math.hypot(a[0] - b[0], a[1] - b[1])
+        small = World(self.positions, functools.partial(scaled, s=1.0),
+                      storage=self.storage)
+        large = World(self.positions, functools.partial(scaled, s=1000.0),
+                      storage=self.storage)
+        self.assertEqual(len(os.listdir(self.storage)), 2)
+        self.assertTrue(np.allclose(large.distances, 1000 * small.distances))
+        World(self.positions, lambda a, b: 1, storage=self.storage)
+        World(self.positions, lambda a, b: 2, storage=self.storage)
+        self.assertEqual(len(os.listdir(self.storage)), 4)
+
+    def test_world_storage_key(self):
+        World(self.positions, lambda a, b: 1, storage=self.storage,
+              storage_key='ones')
+        world = World(self.positions, lambda a, b: 2, storage=self.storage,
+                      storage_key='ones')
+        self.assertEqual(len(os.listdir(self.storage)), 1)
+        self.assertEqual(world.distances[0, 1], 1)
+
+    def test_world_memmap_pheromone(self):
+        world = World(self.positions, storage=self.storage,
+                      memmap_pheromone=True)
+        self.assertIsInstance(world.pheromone, np.memmap)
+        self.assertIsInstance(world.heuristic(2), np.memmap)
+        dense = World(self.positions)
+        self.assertTrue(np.allclose(world.heuristic(2), dense.heuristic(2)))
+        best = Solver(limit=2, seed=0).solve(world)
+        self.assertEqual(sorted(best.visited), list(range(30)))
+
+    def test_world_decays_repeated_edges_once_per_occurrence(self):
+        world = World(self.positions)
+        world.reset_pheromone(1)
+        levels = world.decay_pheromone([0, 0, 1], [1, 1, 2], 0.5, 0.2)
+        self.assertTrue(np.allclose(levels, [0.4, 0.4, 0.6]))
+        self.assertAlmostEqual(world.pheromone[0, 1], 0.4)
+        self.assertAlmostEqual(world.pheromone[1, 2], 0.6)
+
+    def test_world_memmap_pheromone_requires_storage(self):
+        with self.assertRaises(ValueError):
+            World(self.positions, memmap_pheromone=True)
+
+
+class BranchingFactor(unittest.TestCase):
+    def setUp(self):
+        self.world = World([Position(i, i % 3) for i in range(6)])
+
+    def test_branching_factor_of_uniform_pheromone(self):
+        self.world.reset_pheromone(1)
+        self.assertEqual(self.world.branching_factor(), 5)
+
+    def test_branching_factor_of_converged_pheromone(self):
+        self.world.reset_pheromone(0.01)
+        self.world.deposit_pheromone([range(6)], [1])
+        self.assertEqual(self.world.branching_factor(), 1)
+        self.assertTrue(np.all(np.diag(self.world.pheromone) == 0))
+
+    def test_branching_factor_leaves_the_pheromone_alone(self):
+        rng = np.random.default_rng(0)
+        self.world.pheromone[...] = rng.random((6, 6))
+        pheromone = self.world.pheromone.copy()
+        factor = self.world.branching_factor()
+        self.assertEqual(self.world.branching_factor(block=4), factor)
+        self.assertTrue(np.array_equal(self.world.pheromone, pheromone))
+
+
+class CandidateLists(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(30)
+
+    def test_world_without_candidates(self):
+        self.assertIsNone(World(self.positions).candidates)
+
+    def test_world_candidates_are_nearest_by_length(self):
+        w = World(self.positions, candidates=4)
+        self.assertEqual(w.candidates.shape, (30, 4))
+        for node in w.nodes:
+            lengths = np.sort(w.distances[node])[1:5]
+            self.assertTrue(np.allclose(
+                w.distances[node, w.candidates[node]], lengths))
+
+
+
+class SparseStorage(unittest.TestCase):
+    def setUp(self):
+        self.positions = random_positions(60)
+        self.dense = World(self.positions, candidates=5)
+        self.sparse = SparseWorld(self.positions, candidates=5)
+
+    def test_sparse_world_stores_only_candidate_edges(self):
+        self.assertEqual(len(self.sparse.distances.data), 60 * 5)
+        self.assertEqual(len(self.sparse.pheromone.data), 60 * 5)
+
+    def test_sparse_world_candidates_match_dense(self):
+        self.assertTrue(np.array_equal(self.sparse.candidates,
+                                       self.dense.candidates))
+
+    def test_sparse_world_computes_other_lengths_on_demand(self):
+        rows = np.arange(60)[:, None]
+        self.assertTrue(np.allclose(self.sparse.distances[rows, rows.T],
+                                    self.dense.distances))
+        self.assertAlmostEqual(self.sparse.length(0, 59),
+                               self.dense.length(0, 59))
+
+    def test_sparse_world_lengths_from_lfunc(self):
+        manhattan = lambda a, b: abs(a[0] - b[0]) + abs(a[1] - b[1])
+        w = SparseWorld(self.positions, manhattan, candidates=5)
+        a, b = self.positions[0].position, self.positions[1].position
+        self.assertAlmostEqual(w.length(0, 1), manhattan(a, b))
+        for node in (0, 30):
+            lengths = w.distances[node, w.candidates[node]]
+            self.assertTrue(np.all(np.diff(lengths) >= 0))
+
+    def test_sparse_world_deposit_drops_missing_edges(self):
+        self.sparse.reset_pheromone(1)
+        tour = list(range(60))
+        self.sparse.deposit_pheromone([tour], [2])
+        stored = self.sparse.pheromone.locate(tour, np.roll(tour, -1)) >= 0
+        self.assertEqual((self.sparse.pheromone.data == 3).sum(), stored.sum())
+
+    def test_sparse_world_choice_info_matches_dense(self):
+        self.dense.reset_pheromone(0.5)
+        self.sparse.reset_pheromone(0.5)
+        dense = self.dense.choice_info(2, self.dense.heuristic(3))
+        sparse = self.sparse.choice_info(2, self.sparse.heuristic(3))
+        off = ~np.eye(60, dtype=bool)
+        self.assertTrue(np.allclose(sparse.toarray()[off], dense[off]))
+
+    def test_sparse_world_pheromone_evaporates_and_clips(self):
+        self.sparse.reset_pheromone(1)
+        self.sparse.pheromone *= 0.5
+        self.sparse.clip_pheromone(lower=0.75)
+        self.assertTrue(np.all(self.sparse.pheromone.data == 0.75))
+
+    def test_sparse_world_evaporation_matches_dense(self):
+        self.dense.reset_pheromone(1)
+        self.sparse.reset_pheromone(1)
+        self.dense.deposit_pheromone([range(60)], [2])
+        self.sparse.deposit_pheromone([range(60)], [2])
+        solver = Solver(rho=0.3)
+        solver.evaporate_pheromone_matrix(self.dense)
+        solver.evaporate_pheromone_matrix(self.sparse)
+        stored = np.zeros((60, 60), dtype=bool)
+        rows = np.repeat(np.arange(60), 5)
+        stored[rows, self.sparse.candidates.ravel()] = True
+        stored[np.arange(60), np.roll(np.arange(60), -1)] = True
+        stored |= np.eye(60, dtype=bool)
+        sparse = self.sparse.pheromone.toarray()
+        self.assertTrue(np.allclose(sparse[~stored], 0.7))
+        self.assertTrue(np.allclose(sparse[~stored],
+                                    self.dense.pheromone[~stored]))
+
+    def test_sparse_world_remaining_moves_are_nearest_unvisited(self):
+        rng = np.random.default_rng(1)
+        coords = rng.random((3000, 2))
+        world = SparseWorld(coords, candidates=5)
+        unvisited = np.ones(3000, dtype=bool)
+        unvisited[0] = False
+        unvisited[world.candidates[0]] = False
+        moves = world.remaining_moves(0, unvisited)
+        self.assertEqual(len(moves), 5)
+        self.assertTrue(np.all(unvisited[moves]))
+        lengths = np.hypot(*(coords - coords[0]).T)
+        lengths[~unvisited] = np.inf
+        self.assertEqual(moves[0], np.argmin(lengths))
+        self.assertTrue(np.array_equal(np.sort(moves),
+                                       np.sort(np.argsort(lengths)[:5])))
+
+    def test_sparse_world_fallback_computes_few_lengths(self):
+        rng = np.random.default_rng(1)
+        world = SparseWorld(rng.random((3000, 2)), candidates=5)
+        computed = []
+        compute_lengths = world.compute_lengths
+        def counted(rows, cols):
+            computed.append(np.size(rows))
+            return compute_lengths(rows, cols)
+        world.compute_lengths = counted
+        colony = Colony(world, 1)
+        colony.reset([0])
+        colony.visited[:, world.candidates[0]] = True
+        choice = colony.best_remaining(np.array([True]))[0]
+        self.assertFalse(colony.visited[0, choice])
+        self.assertLessEqual(sum(computed), 5)
+
+
+class SparseMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.matrix = SparseMatrix((3, 3), np.array([0, 2, 3, 3]),
+                                   np.array([2, 0, 1]),
+                                   np.array([1., 2., 3.]), default=-1)
+
+    def test_sparse_matrix_reads_stored_and_default_entries(self):
+        self.assertEqual(self.matrix[0, 2], 1)
+        self.assertEqual(self.matrix[0, 1], -1)
+        self.assertEqual(self.matrix.toarray().tolist(),
+                         [[2, -1, 1], [-1, 3, -1], [-1, -1, -1]])
+
+    def test_sparse_matrix_broadcasts_like_ndarray(self):
+        values = self.matrix[np.array([[0], [1]]), np.array([0, 1])]
+        self.assertEqual(values.tolist(), [[2, -1], [-1, 3]])
+
+    def test_sparse_matrix_drops_writes_to_missing_entries(self):
+        self.matrix[[0, 2], [0, 2]] = 9
+        self.assertEqual(self.matrix[0, 0], 9)
+        self.assertEqual(self.matrix[2, 2], -1)
+
+    def test_sparse_matrix_scales_default(self):
+        self.matrix *= 0.5
+        self.assertEqual(self.matrix.toarray().tolist(),
+                         [[1, -.5, .5], [-.5, 1.5, -.5], [-.5, -.5, -.5]])
+        self.matrix.default = lambda rows, cols: rows + cols
+        self.matrix *= 2
+        self.matrix *= 3
+        self.assertEqual(self.matrix[2, 1], 18)
+
             
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+.. module:: viz
+    :platform: Linux, Unix, Windows
+    :synopsis: Provides functionality for drawing worlds and tours, and for
+               showing their pheromone.
+
+Drawing needs `matplotlib <https://matplotlib.org>`_ and showing the
+pheromone as a table needs `pandas <https://pandas.pydata.org>`_. Neither is
+needed by the rest of Pants, so neither is imported until one of these
+functions is called; ``import pants`` itself does not even import this
+module. The ``plot_*`` and ``print_pheromone_matrix`` methods of
+:class:`World` and :class:`Ant` call these functions:
+
+.. code-block:: python
+
+    from pants import viz
+
+    best = solver.solve(world)
+    ax = viz.plot_nodes(world, show=False)
+    viz.plot_tour(world, best.visited, ax=ax)
+
+"""
+
+import numpy as np
+
+
+def _pyplot():
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise ImportError('Plotting needs matplotlib') from None
+    return plt
+
+
+def _pandas():
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError('Showing the pheromone needs pandas') from None
+    return pd
+
+
+def plot_nodes(world, ax=None, show=True):
+    """Draw the nodes of the *world*.
+
+    :param World world: the world whose nodes are drawn
+    :param ax: the :class:`matplotlib.axes.Axes` to draw on (default is None,
+               which draws on the current axes)
+    :param bool show: ``True`` to show the figure once it is drawn
+                      (default is ``True``)
+    :return: the axes drawn on
+    """
+    plt = _pyplot()
+    ax = ax or plt.gca()
+    ax.plot(world.coords[:, 0], world.coords[:, 1], marker='o', color='r',
+            ls='')
+    if show:
+        plt.show()
+    return ax
+
+
+def plot_tour(world, tour, ax=None, show=True):
+    """Draw the closed *tour* through the nodes of the *world*.
+
+    :param World world: the world of the *tour*
+    :param tour: the node IDs of the tour
+    :param ax: the :class:`matplotlib.axes.Axes` to draw on (default is None,
+               which draws on the current axes)
+    :param bool show: ``True`` to show the figure once it is drawn
+                      (default is ``True``)
+    :return: the axes drawn on
+    """
+    plt = _pyplot()
+    ax = ax or plt.gca()
+    tour = np.asarray(tour, dtype=np.intp)
+    points = world.coords[np.append(tour, tour[:1])]
+    ax.plot(points[:, 0], points[:, 1], color='b')
+    ax.scatter(points[:-1, 0], points[:-1, 1], marker='o', color='r')
+    if show:
+        plt.show()
+    return ax
+
+
+def pheromone_frame(world):
+    """Return the pheromone of every edge of the *world* as a table.
+
+    :param World world: the world whose pheromone is returned
+    :rtype: :class:`pandas.DataFrame`
+    """
+    pheromone = world.get_pheromone_matrix()
+    if not isinstance(pheromone, np.ndarray):
+        pheromone = pheromone.toarray()
+    return _pandas().DataFrame(pheromone)
+
+
+def print_pheromone_matrix(world):
+    """Print the pheromone of every edge of the *world* as a table.
+
+    :param World world: the world whose pheromone is printed
+    """
+    print(pheromone_frame(world))
@@ -6,26 +6,57 @@
 .. moduleauthor:: Robert Grant <rhgrant10@gmail.com>
 
 """
-import matplotlib.pyplot as plt
+import hashlib
+import operator
+import os
+import tempfile
+
 import numpy as np
-import pandas as pd
+
+from .cache import LengthCache
+from .spatial import nearest_neighbours, GridIndex
+
+
+def euclidean(a, b):
+    """Return the euclidean distances between two arrays of coordinates.
+
+    This is the default *metric* of a :class:`World`.
+
+    :param a: coordinates whose last axis holds ``x`` and ``y``
+    :param b: coordinates broadcastable against *a*
+    :rtype: :class:`ndarray`
+    """
+    delta = a - b
+    return np.hypot(delta[..., 0], delta[..., 1])
+
 
 class World:
     """The nodes and edges of a particular problem.
 
     Each :class:`World` is created from a list of nodes, a length function, and
     optionally, a name and a description. Additionally, each :class:`World` has
-    a UID. The length function must accept nodes as its first two parameters,
-    and is responsible for returning the distance between them. It is the 
-    responsibility of the :func:`create_edges` to generate the required
-    :class:`Edge`\s and initialize them with the correct *length* as returned
-    by the length function.
+    a UID. The length function must accept node positions as its first two
+    parameters, and is responsible for returning the distance between them. If
+    no length function is given, the euclidean distance between the positions
+    is used.
+
+    All pairwise lengths are computed exactly once by :func:`create_distances`
+    and stored in the dense :attr:`distances` matrix, while the pheromone
+    levels live in the :attr:`pheromone` matrix of the same shape. Both are
+    indexed by node ID. :class:`Edge`\s are not stored at all; they are
+    lightweight views onto these matrices that are only created when they are
+    asked for.
     
     Once created, :class:`World` objects convert the actual nodes into node
     IDs, since solving does not rely on the actual data in the nodes. These are
     accessible via the :attr:`nodes` property. To access the actual nodes,
     simply pass an ID obtained from :attr:`nodes` to the :func:`data` method,
     which will return the node associated with the specified ID.
+
+    The positions of the nodes are kept in the (nodes x 2) :attr:`coords`
+    array, from which a :class:`World` can also be created directly. Its
+    :class:`Node`\s are then only created when they are asked for, so that
+    worlds of millions of nodes never hold millions of Python objects.
     
     :class:`Edge`\s are accessible in much the same way, except two node IDs
     must be passed to the :func:`data` method to indicate which nodes start and
@@ -48,21 +79,62 @@ class World:
     should *not* be called between iterations of the :class:`Solver` because it
     effectively erases the memory of the :class:`Ant` colony solving it.
         
-    :param list nodes: a list of nodes
+    :param list nodes: a list of nodes, a list of positions, or a (nodes x 2)
+                       array of coordinates
     :param callable lfunc: a function that calculates the distance between
                            two nodes
+    :param callable metric: a vectorized length function used when no
+                            *lfunc* is given; it is called with two
+                            broadcastable arrays of coordinates, whose last
+                            axis holds ``x`` and ``y``, and returns the
+                            lengths between them (default is
+                            :func:`euclidean`); see :mod:`pants.io` for the
+                            TSPLIB metrics
     :param str name: the name of the world (default is "world#", where
                      "#" is the ``uid`` of the world)
     :param str description: a description of the world (default is None)
+    :param dtype: the floating point type of the :attr:`distances` and
+                  :attr:`pheromone` matrices (default is ``numpy.float64``)
+    :param int candidates: the number of nearest neighbours kept in the
+                           candidate list of every node (default is None,
+                           which disables candidate lists)
+    :param bool symmetric: ``True`` if the length function returns the same
+                           length in both directions, so that it only needs
+                           to be called for half of the pairs (default is
+                           ``False``)
+    :param bool cache: ``True`` to memoize the length function with a
+                       :class:`~pants.cache.LengthCache`, which is then
+                       available as :attr:`cache` (default is ``False``)
+    :param int cache_size: the maximum number of lengths kept by the cache
+                           (default is None, which keeps every length)
+    :param str storage: a directory in which the :attr:`distances` matrix is
+                        kept as a memory-mapped ``.npy`` file, so that it
+                        does not need to fit in memory (default is None,
+                        which keeps it in memory); see :func:`create_distances`
+    :param str storage_key: identifies what the length function computes in
+                            the name of the *storage* file instead of the
+                            lengths sampled by :func:`digest` (default is
+                            None)
+    :param bool memmap_pheromone: ``True`` to also back the :attr:`pheromone`
+                                  matrix and the matrices derived from it
+                                  (see :func:`create_matrix`) with temporary
+                                  files in the *storage* directory (default
+                                  is ``False``)
     """
     uid = 0
 
-    def __init__(self, nodes, lfunc, **kwargs):
+    def __init__(self, nodes, lfunc=None, **kwargs):
         self.uid = self.__class__.uid
         self.__class__.uid += 1
         self.name = kwargs.get('name', 'world{}'.format(self.uid))
         self.description = kwargs.get('description', None)
-        if all(isinstance(n, Node) for n in nodes):
+        if isinstance(nodes, np.ndarray):
+            if nodes.ndim != 2 or nodes.shape[1] != 2:
+                raise ValueError('Expected (nodes x 2) coordinates, got the '
+                                 'shape {}'.format(nodes.shape))
+            self.coords = np.array(nodes, dtype=np.float64)
+            self._nodes = NodeList(self.coords)
+        elif all(isinstance(n, Node) for n in nodes):
             self._nodes = nodes
         elif all(isinstance(n, Position) for n in nodes):
             self._nodes = []
@@ -70,46 +142,340 @@ class World:
                 self._nodes.append(Node(pos))
         else:
             raise Exception('Type of nodes not known!')
+        if not isinstance(self._nodes, NodeList):
+            self.coords = np.array([node.position for node in self._nodes],
+                                   dtype=np.float64).reshape(-1, 2)
+        self._ids = np.arange(len(self._nodes))
+        self._ids.flags.writeable = False
+        self._uids = None
+        self.symmetric = kwargs.get('symmetric', False)
+        self.cache = None
+        if lfunc is not None and (kwargs.get('cache', False) or
+                                  kwargs.get('cache_size') is not None):
+            lfunc = self.cache = LengthCache(
+                lfunc, maxsize=kwargs.get('cache_size'),
+                symmetric=self.symmetric)
         self.lfunc = lfunc
+        self.metric = kwargs.get('metric', None) or euclidean
+        self.dtype = np.dtype(kwargs.get('dtype', np.float64))
+        self.storage = kwargs.get('storage', None)
+        self.storage_key = kwargs.get('storage_key', None)
+        self.memmap_pheromone = kwargs.get('memmap_pheromone', False)
+        if self.memmap_pheromone and self.storage is None:
+            raise ValueError('memmap_pheromone requires a storage directory')
+        if self.storage is None:
+            self.distances = self.create_distances()
+        else:
+            self.distances = self.load_distances()
+        self.pheromone = self.create_pheromone()
+        self.reset_pheromone(0.1)
         self.edges = self.create_edges()
-        
+        k = kwargs.get('candidates', None)
+        self.candidates = None if k is None else self.create_candidates(k)
+
     @property
     def nodes(self):
-        """Node IDs."""
-        # return list(range(len(self._nodes)))
-        node_list = []
-        for node in self._nodes:
-            node_list.append(node.uid)
-        return node_list
+        """Node IDs, as a read-only :class:`ndarray` that is created once."""
+        return self._ids
+
+    def positions(self):
+        """Return the positions of the nodes, as handed to the length
+        function.
+
+        :rtype: list
+        """
+        if isinstance(self._nodes, NodeList):
+            return [tuple(xy) for xy in self.coords.tolist()]
+        return [node.position for node in self._nodes]
+
+    def create_distances(self, block=1024, out=None):
+        """Compute the length of every edge into a dense matrix.
+
+        Without a length function the lengths are computed by the *metric*
+        straight from :attr:`coords`, *block* rows at a time so that the
+        temporary arrays stay small. Otherwise, the length function is called
+        exactly once for every pair of distinct nodes, or once for every
+        unordered pair if the world is *symmetric*. Either way the matrix is
+        filled in row order, which keeps the writes to a memory-mapped *out*
+        sequential.
+
+        :param int block: number of rows computed at once (default=1024)
+        :param out: the (nodes x nodes) matrix to store the lengths in
+                    (default is None, which creates a new one)
+        :return: the lengths between all pairs of node IDs
+        :rtype: :class:`ndarray`
+        """
+        n = len(self._nodes)
+        if out is None:
+            out = np.zeros((n, n), dtype=self.dtype)
+        distances = out
+        if self.lfunc is None:
+            for lo in range(0, n, block):
+                rows = distances[lo:lo + block]
+                rows[...] = self.metric(self.coords[lo:lo + block, None, :],
+                                        self.coords)
+                rows[np.arange(len(rows)), np.arange(lo, lo + len(rows))] = 0
+        else:
+            positions = self.positions()
+            for m, a in enumerate(positions):
+                for n, b in enumerate(positions):
+                    if m == n or self.symmetric and n < m:
+                        continue
+                    distances[m, n] = self.lfunc(a, b)
+            if self.symmetric:
+                upper = np.triu_indices(len(positions), 1)
+                distances.T[upper] = distances[upper]
+        return distances
+
+    def load_distances(self):
+        """Return the :attr:`distances` matrix memory-mapped from the
+        *storage* directory.
+
+        The file is named after a :func:`digest` of the coordinates, the
+        length function or metric, *symmetric* and *dtype*, so worlds built
+        from the same nodes, in this or any other process or run, map the
+        same file instead of computing the lengths again. A missing file
+        is computed by :func:`create_distances` into a temporary file, which
+        then takes its name, so that other processes never map an incomplete
+        matrix. The matrix is mapped copy-on-write: changes made to it stay
+        private to the world.
+
+        Rows are stored one after the other, so reading the row of a node
+        reads a contiguous range of the file.
+
+        :return: the lengths between all pairs of node IDs
+        :rtype: :class:`numpy.memmap`
+        """
+        path = os.path.join(self.storage, 'distances-{}.npy'.format(
+            self.digest()))
+        if not os.path.exists(path):
+            n = len(self._nodes)
+            fd, temp = tempfile.mkstemp(dir=self.storage, suffix='.npy')
+            os.close(fd)
+            try:
+                out = np.lib.format.open_memmap(temp, mode='w+',
+                                                dtype=self.dtype, shape=(n, n))
+                self.create_distances(out=out)
+                out.flush()
+                del out
+                os.replace(temp, path)
+            except BaseException:
+                os.unlink(temp)
+                raise
+        return np.load(path, mmap_mode='c')
+
+    def digest(self):
+        """Return a digest that identifies the :attr:`distances` matrix.
+
+        Besides the coordinates, *symmetric* and *dtype*, the digest covers
+        what the length function or metric computes: its qualified name, and
+        either the *storage_key* given for the world or the lengths of a
+        fixed sample of :attr:`digest_samples` pairs of nodes. Two
+        :func:`functools.partial` objects or lambdas with the same name but
+        other results therefore never share a file.
+
+        :rtype: str
+        """
+        lfunc = self.lfunc
+        if isinstance(lfunc, LengthCache):
+            lfunc = lfunc.lfunc
+        if lfunc is None and self.metric is not euclidean:
+            lfunc = self.metric
+        if lfunc is None:
+            name = ''
+        else:
+            name = '{}.{}'.format(getattr(lfunc, '__module__', ''),
+                                  getattr(lfunc, '__qualname__',
+                                          type(lfunc).__qualname__))
+        digest = hashlib.sha1(self.coords.tobytes())
+        digest.update('{}|{}|{}'.format(name, self.symmetric,
+                                        self.dtype.str).encode())
+        if self.storage_key is not None:
+            digest.update('|{}'.format(self.storage_key).encode())
+        elif lfunc is not None:
+            digest.update(self.sample_lengths(lfunc).tobytes())
+        return '{}-{}'.format(len(self._nodes), digest.hexdigest()[:16])
+
+    #: The number of lengths computed by :func:`digest`.
+    digest_samples = 32
+
+    def sample_lengths(self, lfunc):
+        """Return the lengths computed by *lfunc* for a fixed sample of
+        :attr:`digest_samples` pairs of distinct nodes.
+
+        The pairs only depend on the number of nodes.
+
+        :param callable lfunc: the length function, or a metric if the
+                               world has no length function
+        :rtype: :class:`ndarray`
+        """
+        n = len(self._nodes)
+        if n < 2:
+            return np.zeros(0, dtype=self.dtype)
+        rng = np.random.default_rng(n)
+        rows = rng.integers(n, size=self.digest_samples)
+        cols = (rows + rng.integers(1, n, size=self.digest_samples)) % n
+        if self.lfunc is None:
+            lengths = lfunc(self.coords[rows], self.coords[cols])
+        elif isinstance(self._nodes, NodeList):
+            lengths = [lfunc(tuple(a), tuple(b)) for a, b in
+                       zip(self.coords[rows].tolist(),
+                           self.coords[cols].tolist())]
+        else:
+            nodes = self._nodes
+            lengths = [lfunc(nodes[a].position, nodes[b].position)
+                       for a, b in zip(rows.tolist(), cols.tolist())]
+        return np.asarray(lengths, dtype=self.dtype)
+
+    def create_matrix(self):
+        """Return a new, uninitialized matrix shaped like :attr:`distances`.
+
+        With *memmap_pheromone*, the matrix is backed by an anonymous
+        temporary file in the *storage* directory, which is removed once the
+        matrix is no longer used. This is used for the :attr:`pheromone` and
+        for the heuristic and choice info matrices, so that none of the
+        (nodes x nodes) matrices needs to fit in memory.
+
+        :rtype: :class:`ndarray`
+        """
+        n = len(self._nodes)
+        if not self.memmap_pheromone:
+            return np.empty((n, n), dtype=self.dtype)
+        backing = tempfile.TemporaryFile(dir=self.storage)
+        return np.memmap(backing, dtype=self.dtype, mode='w+', shape=(n, n))
+
+    def create_pheromone(self):
+        """Return the matrix that holds the pheromone of every edge.
+
+        :rtype: :class:`ndarray`
+        """
+        return self.create_matrix()
 
     def create_edges(self):
-        """Create edges from the nodes.
-        
+        """Create the edge accessor of the world.
+
         The job of this method is to map node ID pairs to :class:`Edge`
         instances that describe the edge between the nodes at the given
-        indices. Note that all of the :class:`Edge`\s are created within this
-        method.
-        
-        :return: a mapping of node ID pairs to :class:`Edge` instances.
+        indices. Note that no :class:`Edge` is created here; each lookup
+        returns a fresh view onto :attr:`distances` and :attr:`pheromone`.
+
+        :return: a mapping of node ID pairs to :class:`Edge` views.
+        :rtype: :class:`EdgeView`
+        """
+        return EdgeView(self)
+
+    def create_candidates(self, k, block=1024):
+        """Create the candidate list of every node.
+
+        The candidate list of a node holds its *k* nearest neighbours, which
+        are the only moves :class:`Ant`\s consider as long as any of them is
+        unvisited. The neighbours are found with a spatial index over
+        :attr:`coords` and then ordered by their length in :attr:`distances`.
+        With a *metric* other than :func:`euclidean`, whose lengths need not
+        follow the coordinates, they are instead selected from the rows of
+        :attr:`distances`, *block* rows at a time.
+
+        :param int k: the number of candidates of every node
+        :param int block: number of rows searched at once (default=1024)
+        :return: the (nodes x k) candidate node IDs
         :rtype: :class:`ndarray`
         """
-        # edges = {}
-        edges = np.ndarray((len(self._nodes), len(self._nodes)), dtype=np.object)
-        for m in self._nodes:
-            for n in self._nodes:
-                if m != n:
-                    edge = Edge(m, n, lfunc=self.lfunc)
-                    edges[m.uid, n.uid] = edge
+        if self.lfunc is None and self.metric is not euclidean:
+            n = len(self._nodes)
+            k = min(k, n - 1)
+            neighbours = np.empty((n, k), dtype=np.intp)
+            for lo in range(0, n, block):
+                rows = np.array(self.distances[lo:lo + block], dtype=float)
+                ids = np.arange(lo, lo + len(rows))
+                rows[ids - lo, ids] = np.inf
+                neighbours[lo:lo + block] = np.argpartition(
+                    rows, k - 1, axis=1)[:, :k]
+        else:
+            neighbours, _ = nearest_neighbours(self.coords, k)
+        lengths = np.take_along_axis(self.distances, neighbours, axis=1)
+        rank = np.argsort(lengths, axis=1, kind='stable')
+        return np.take_along_axis(neighbours, rank, axis=1)
+
+    def heuristic(self, beta, block=1024):
+        """Return the heuristic information of every edge raised to *beta*.
 
-        return edges
+        The heuristic information of an edge is the inverse of its length.
+        As in :func:`Edge.weight`, edges without length are treated as having
+        a length of one. It only depends on the world and *beta*, so it
+        needs to be computed just once per solve. It is computed *block*
+        rows at a time into a matrix from :func:`create_matrix`.
+
+        :param float beta: the relative importance of distance
+        :param int block: number of rows computed at once (default=1024)
+        :return: the heuristic matrix
+        :rtype: :class:`ndarray`
+        """
+        heuristic = self.create_matrix()
+        for lo in range(0, len(heuristic), block):
+            lengths = self.distances[lo:lo + block]
+            rows = heuristic[lo:lo + block]
+            np.divide(1, np.where(lengths == 0, 1, lengths), out=rows)
+            np.power(rows, beta, out=rows)
+        return heuristic
+
+    def choice_info(self, alpha, heuristic, out=None):
+        """Return the weight of every edge given the current pheromone.
+
+        The weight of an edge is its pheromone raised to *alpha* multiplied
+        by its *heuristic*, as returned by :func:`heuristic`.
+
+        :param float alpha: the relative importance of pheromone
+        :param heuristic: the heuristic matrix
+        :param out: a matrix to store the result in (default is None)
+        :return: the choice info matrix
+        :rtype: :class:`ndarray`
+        """
+        if out is None:
+            out = self.create_matrix()
+        if alpha == 1:
+            return np.multiply(self.pheromone, heuristic, out=out)
+        out = np.power(self.pheromone, alpha, out=out)
+        out *= heuristic
+        return out
+
+    def gather_candidates(self, matrix):
+        """Return the entries of *matrix* on the edges of the candidate lists.
+
+        :param matrix: a matrix shaped like :attr:`distances`
+        :return: the (nodes x k) entries, aligned with :attr:`candidates`
+        :rtype: :class:`ndarray`
+        """
+        return np.take_along_axis(matrix, self.candidates, axis=1)
+
+    def remaining_moves(self, node, unvisited):
+        """Return the moves weighed once every candidate of *node* has been
+        visited.
+
+        The weights of all edges are stored, so every unvisited node is
+        weighed.
+
+        :param int node: the ID of the current node
+        :param unvisited: the boolean mask of the unvisited node IDs
+        :return: the node IDs of the moves
+        :rtype: :class:`ndarray`
+        """
+        return np.flatnonzero(unvisited)
 
     def list_edges(self):
-        edges = []
-        for m in self._nodes:
-            for n in self._nodes:
-                if m != n:
-                    edges.append(self.edges[m.uid, n.uid])
-        return edges
+        """Return views of all edges between distinct nodes.
+
+        :rtype: list
+        """
+        return list(self.edges)
+
+    def length(self, idx, idy):
+        """Return the length of the edge between two node IDs.
+
+        :param int idx: the id of the first node
+        :param int idy: the id of the second node
+        :rtype: float
+        """
+        return self.distances[idx, idy]
         
     def reset_pheromone(self, level=0.01):
         """Reset the amount of pheromone on every edge to some base *level*.
@@ -121,9 +487,98 @@ class World:
         :param float level: amount of pheromone to set on each edge 
                             (default=0.01)
         """
-        for index, edge in np.ndenumerate(self.edges):
-            if isinstance(edge, Edge):
-                edge.pheromone = level
+        self.pheromone.fill(level)
+        np.fill_diagonal(self.pheromone, 0)
+
+    def deposit_pheromone(self, tours, amounts):
+        """Deposit pheromone along the edges of closed tours.
+
+        Every tour is a sequence of node IDs that implicitly returns to its
+        first node. The edges of all tours are gathered into two index arrays
+        so that the deposit is a single scatter-add; edges used by several
+        tours receive the sum of their amounts.
+
+        :param list tours: the tours as sequences of node IDs
+        :param list amounts: the pheromone deposited on each edge of the
+                             corresponding tour
+        """
+        tours = [np.asarray(tour, dtype=np.intp) for tour in tours]
+        if not tours:
+            return
+        starts = np.concatenate(tours)
+        ends = np.concatenate([np.roll(tour, -1) for tour in tours])
+        amounts = np.repeat(amounts, [len(tour) for tour in tours])
+        np.add.at(self.pheromone, (starts, ends), amounts)
+
+    def decay_pheromone(self, starts, ends, xi, level):
+        """Let the pheromone of some edges decay towards a *level*.
+
+        This is the local pheromone update of the Ant Colony System: the
+        pheromone of every edge from *starts* to *ends* becomes
+        ``(1 - xi) * pheromone + xi * level``. An edge given *k* times, as
+        when several ants take it in the same step, decays *k* times:
+        ``(1 - xi) ** k * pheromone + (1 - (1 - xi) ** k) * level``.
+
+        :param starts: the node IDs the edges start at
+        :param ends: the node IDs the edges end at
+        :param float xi: the fraction of pheromone that decays
+        :param float level: the level the pheromone decays towards
+        :return: the new pheromone level of every edge
+        :rtype: :class:`ndarray`
+        """
+        columns = self.pheromone.shape[1]
+        keys = (np.asarray(starts, dtype=np.int64) * columns
+                + np.asarray(ends, dtype=np.int64))
+        keys, inverse, counts = np.unique(keys, return_inverse=True,
+                                          return_counts=True)
+        starts, ends = np.divmod(keys, columns)
+        kept = (1 - xi) ** counts
+        levels = kept * self.pheromone[starts, ends] + (1 - kept) * level
+        self.pheromone[starts, ends] = levels
+        return levels[inverse.reshape(-1)]
+
+    def clip_pheromone(self, lower=None, upper=None):
+        """Bound the pheromone on every edge to [*lower*, *upper*] in place.
+
+        :param float lower: minimum pheromone level (default is None)
+        :param float upper: maximum pheromone level (default is None)
+        """
+        np.clip(self.pheromone, lower, upper, out=self.pheromone)
+        np.fill_diagonal(self.pheromone, 0)
+
+    def branching_factor(self, fraction=0.05, block=1024):
+        """Return the mean lambda-branching factor of the pheromone.
+
+        The lambda-branching factor of a node counts its edges whose
+        pheromone is at least its least level plus *fraction* of the range
+        of its levels. It nears the number of edges that the ants still
+        consider, and drops towards one or two as the colony converges. Only
+        the candidate edges are counted if the world has candidate lists.
+
+        :param float fraction: the lambda of the factor (default=0.05)
+        :param int block: number of rows counted at once (default=1024)
+        :rtype: float
+        """
+        if self.candidates is not None:
+            levels = self.gather_candidates(self.pheromone)
+            lowest = levels.min(axis=1)
+            highest = levels.max(axis=1)
+            threshold = lowest + fraction * (highest - lowest)
+            return float((levels >= threshold[:, None]).sum(axis=1).mean())
+        n = len(self.pheromone)
+        count = 0
+        for lo in range(0, n, block):
+            # A copy of the rows, so that the least level can skip the
+            # diagonal without touching the pheromone.
+            rows = np.array(self.pheromone[lo:lo + block])
+            diagonal = (np.arange(len(rows)), np.arange(lo, lo + len(rows)))
+            rows[diagonal] = np.inf
+            lowest = rows.min(axis=1)
+            rows[diagonal] = 0
+            highest = rows.max(axis=1)
+            threshold = lowest + fraction * (highest - lowest)
+            count += int(np.count_nonzero(rows >= threshold[:, None]))
+        return count / n
 
     def data(self, idx, idy=None):
         """Return the node data of a single id or the edge data of two ids.
@@ -140,8 +595,7 @@ class World:
         """
         try:
             if idy is None:
-                # return self._nodes[idx]
-                return self.find_note_by_id(idx)
+                return self._nodes[idx]
             else:
                 return self.edges[idx, idy]
         except IndexError:
@@ -150,13 +604,23 @@ class World:
     def find_note_by_id(self, id):
         """Return the node of a single id.
 
-        :param int id: the id of the node
-        :return: the node with ID *id*
+        The nodes are indexed by their ``uid`` on the first call, so that
+        later calls take constant time.
+
+        :param int id: the ``uid`` of the node
+        :return: the node with ID *id*, or None if there is none
         :rtype: :class:`Node`
         """
-        for node in self._nodes:
-            if node.uid is id:
-                return node
+        nodes = self._nodes
+        if isinstance(nodes, NodeList):
+            # Only the nodes created so far can have been asked for.
+            if self._uids is None or len(self._uids) != len(nodes.created):
+                self._uids = {node.uid: idx
+                              for idx, node in nodes.created.items()}
+        elif self._uids is None:
+            self._uids = {node.uid: idx for idx, node in enumerate(nodes)}
+        idx = self._uids.get(id)
+        return None if idx is None else nodes[idx]
 
     def get_pheromone_matrix(self):
         """Create pheromone matrix from the edges.
@@ -164,25 +628,439 @@ class World:
         :return: pheromone matrix
         :rtype: :class:`ndarray`
         """
-        # matrix = np.zeros((len(self._nodes), len(self._nodes)), dtype=np.float)
-        matrix = np.ndarray((len(self._nodes), len(self._nodes)), dtype=np.float)
-        for m in self.nodes:
-            for n in self.nodes:
-                a, b = self.data(m), self.data(n)
-                if a != b:
-                    matrix[m, n] = self.data(m, n).pheromone
-                else:
-                    matrix[m, n] = 0.0
+        return self.pheromone.copy()
+
+    def print_pheromone_matrix(self):
+        """Print the pheromone matrix as a table; see
+        :func:`pants.viz.print_pheromone_matrix`."""
+        from . import viz
+        viz.print_pheromone_matrix(self)
+
+    def plot_nodes(self, **kwargs):
+        """Draw the nodes; see :func:`pants.viz.plot_nodes`."""
+        from . import viz
+        return viz.plot_nodes(self, **kwargs)
+
+
+class SparseWorld(World):
+    """A :class:`World` that only stores the edges of its candidate lists.
+
+    A dense :class:`World` needs memory for the square of its node count,
+    which is out of reach for instances with tens of thousands of nodes.
+    A :class:`SparseWorld` instead keeps a sparse candidate graph: the
+    *candidates* nearest neighbours of every node are found with a spatial
+    index, and only the lengths and pheromone of those edges are stored, in
+    :class:`SparseMatrix` objects that share their CSR structure. Memory is
+    therefore proportional to the node count times *candidates*.
+
+    The :attr:`distances` and :attr:`pheromone` matrices are indexed exactly
+    like those of a dense :class:`World`, so :class:`Ant`\s, the
+    :class:`~pants.colony.Colony` and the :class:`~pants.solver.Solver` work
+    on it unchanged. The length of an edge outside of the candidate graph is
+    computed on demand from :attr:`coords` (or by the length function), while
+    its pheromone starts at the level of the last :func:`reset_pheromone` and
+    evaporates and is clipped like that of every other edge, but receives no
+    deposits.
+    The candidate graph is found by the euclidean distance between the
+    :attr:`coords`, and then ordered by the length function or *metric*.
+
+    :param list nodes: a list of nodes
+    :param callable lfunc: a function that calculates the distance between
+                           two nodes (default is the euclidean distance)
+    :param int candidates: the number of nearest neighbours stored for every
+                           node (default=10)
+    """
+    def __init__(self, nodes, lfunc=None, **kwargs):
+        if kwargs.get('storage') is not None:
+            raise ValueError('A SparseWorld is always kept in memory')
+        kwargs.setdefault('candidates', 10)
+        self.k = kwargs['candidates']
+        self._positions = None
+        self._grid = None
+        super().__init__(nodes, lfunc, **kwargs)
+
+    def create_pheromone(self):
+        """Return the matrix that holds the pheromone of every edge.
+
+        :rtype: :class:`SparseMatrix`
+        """
+        return self.distances.copy()
+
+    def create_distances(self):
+        """Compute the lengths of the edges of the candidate graph.
+
+        :return: the lengths of the candidate edges, in the order of
+                 increasing length within every row
+        :rtype: :class:`SparseMatrix`
+        """
+        n = len(self._nodes)
+        neighbours, lengths = nearest_neighbours(self.coords, self.k)
+        rows = np.repeat(np.arange(n), neighbours.shape[1])
+        if self.lfunc is not None or self.metric is not euclidean:
+            lengths = self.compute_lengths(rows, neighbours.ravel())
+            lengths = lengths.reshape(neighbours.shape)
+            rank = np.argsort(lengths, axis=1, kind='stable')
+            neighbours = np.take_along_axis(neighbours, rank, axis=1)
+            lengths = np.take_along_axis(lengths, rank, axis=1)
+        indptr = np.arange(n + 1) * neighbours.shape[1]
+        return SparseMatrix((n, n), indptr, neighbours.ravel(),
+                            lengths.ravel().astype(self.dtype),
+                            default=self.compute_lengths)
+
+    def compute_lengths(self, rows, cols):
+        """Compute the lengths between pairs of node IDs on demand.
+
+        :param rows: the IDs of the start nodes
+        :param cols: the IDs of the end nodes
+        :return: the length of every pair
+        :rtype: :class:`ndarray`
+        """
+        rows, cols = np.broadcast_arrays(np.asarray(rows), np.asarray(cols))
+        if self.lfunc is None:
+            return self.metric(self.coords[rows], self.coords[cols])
+        lengths = np.zeros(rows.shape)
+        if self._positions is None:
+            self._positions = self.positions()
+        positions = self._positions
+        for i, (m, n) in enumerate(zip(rows.flat, cols.flat)):
+            if m != n:
+                lengths.flat[i] = self.lfunc(positions[m], positions[n])
+        return lengths
+
+    def create_candidates(self, k):
+        """Return the candidate lists stored in the candidate graph.
+
+        :param int k: the number of candidates of every node (at most the
+                      number stored)
+        :return: the (nodes x k) candidate node IDs
+        :rtype: :class:`ndarray`
+        """
+        n = len(self._nodes)
+        return self.distances.indices.reshape(n, -1)[:, :k]
+
+    def heuristic(self, beta):
+        """Return the heuristic information of every edge raised to *beta*.
+
+        The heuristic of the stored edges is computed at once, while that of
+        any other edge is computed on demand from its length.
+
+        :param float beta: the relative importance of distance
+        :return: the heuristic matrix
+        :rtype: :class:`SparseMatrix`
+        """
+        def power(lengths):
+            return (1 / np.where(lengths == 0, 1, lengths)) ** beta
+
+        heuristic = self.distances.copy()
+        heuristic.data = power(heuristic.data)
+        heuristic.default = lambda rows, cols: power(
+            self.compute_lengths(rows, cols))
+        return heuristic
+
+    def choice_info(self, alpha, heuristic, out=None):
+        """Return the weight of every edge given the current pheromone.
+
+        Edges outside of the candidate graph weigh their heuristic times the
+        pheromone level they stay at.
+
+        :param float alpha: the relative importance of pheromone
+        :param SparseMatrix heuristic: the heuristic matrix
+        :param SparseMatrix out: a matrix to store the result in (default is
+                                 None)
+        :return: the choice info matrix
+        :rtype: :class:`SparseMatrix`
+        """
+        if out is None:
+            out = heuristic.copy()
+        np.power(self.pheromone.data, alpha, out=out.data)
+        out.data *= heuristic.data
+        level = self.pheromone.default ** alpha
+        default = heuristic.default
+        out.default = lambda rows, cols: level * default(rows, cols)
+        return out
+
+    def gather_candidates(self, matrix):
+        """Return the entries of *matrix* on the edges of the candidate lists.
+
+        Since the candidate lists are the stored entries, this is a view of
+        the data of *matrix* rather than a lookup.
+
+        :param SparseMatrix matrix: a matrix sharing the structure of
+                                    :attr:`distances`
+        :return: the (nodes x k) entries, aligned with :attr:`candidates`
+        :rtype: :class:`ndarray`
+        """
+        n = len(self._nodes)
+        return matrix.data.reshape(n, -1)[:, :self.candidates.shape[1]]
+
+    #: The number of unvisited nodes up to which :func:`remaining_moves`
+    #: weighs all of them.
+    remaining_limit = 256
+
+    def remaining_moves(self, node, unvisited):
+        """Return the moves weighed once every candidate of *node* has been
+        visited.
+
+        The weights of edges outside of the candidate graph are computed on
+        demand, so rather than all of the unvisited nodes, only the
+        *candidates* unvisited nodes nearest to *node* are weighed, as found
+        by a :class:`~pants.spatial.GridIndex` built on first use. Since every
+        such edge carries the same pheromone, the nearest of them is also the
+        heaviest under the euclidean metric. All unvisited nodes are weighed
+        once no more than :attr:`remaining_limit` are left.
+
+        :param int node: the ID of the current node
+        :param unvisited: the boolean mask of the unvisited node IDs
+        :return: the node IDs of the moves
+        :rtype: :class:`ndarray`
+        """
+        if np.count_nonzero(unvisited) <= self.remaining_limit:
+            return np.flatnonzero(unvisited)
+        if self._grid is None:
+            self._grid = GridIndex(self.coords, self.k)
+        return self._grid.nearest(node, unvisited, self.k)
+
+    def reset_pheromone(self, level=0.01):
+        """Reset the amount of pheromone on every edge to some base *level*.
+
+        :param float level: amount of pheromone to set on each edge 
+                            (default=0.01)
+        """
+        self.pheromone.fill(level)
+
+    def deposit_pheromone(self, tours, amounts):
+        """Deposit pheromone along the edges of closed tours.
+
+        Deposits on edges outside of the candidate graph are dropped.
+
+        :param list tours: the tours as sequences of node IDs
+        :param list amounts: the pheromone deposited on each edge of the
+                             corresponding tour
+        """
+        tours = [np.asarray(tour, dtype=np.intp) for tour in tours]
+        if not tours:
+            return
+        starts = np.concatenate(tours)
+        ends = np.concatenate([np.roll(tour, -1) for tour in tours])
+        amounts = np.repeat(amounts, [len(tour) for tour in tours])
+        slots = self.pheromone.locate(starts, ends)
+        found = slots >= 0
+        np.add.at(self.pheromone.data, slots[found], amounts[found])
+
+    def clip_pheromone(self, lower=None, upper=None):
+        """Bound the pheromone on every edge to [*lower*, *upper*] in place.
+
+        :param float lower: minimum pheromone level (default is None)
+        :param float upper: maximum pheromone level (default is None)
+        """
+        np.clip(self.pheromone.data, lower, upper, out=self.pheromone.data)
+        if not callable(self.pheromone.default):
+            self.pheromone.default = float(np.clip(self.pheromone.default,
+                                                   lower, upper))
+
+
+class SparseMatrix:
+    """A square matrix of which only some entries are stored, in CSR form.
+
+    The stored entries of row ``i`` are ``data[indptr[i]:indptr[i + 1]]``,
+    and their column indices are the same slice of *indices*. Entries are
+    read and written with the same ``matrix[rows, cols]`` indexing as a
+    :class:`numpy.ndarray`, including broadcasting, and ``matrix[rows]``
+    returns complete rows. Entries that are not stored read as *default*,
+    which is either a constant or a callable that receives the row and
+    column indices of the missing entries; writes to them are dropped.
+
+    :param tuple shape: the shape of the matrix
+    :param indptr: the offsets of the rows in *indices* and *data*
+    :param indices: the column index of every stored entry
+    :param data: the value of every stored entry
+    :param default: the value or function of the entries that are not
+                    stored (default=0)
+    """
+    def __init__(self, shape, indptr, indices, data, default=0):
+        self.shape = shape
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.default = default
+        rows = np.repeat(np.arange(shape[0]), np.diff(indptr))
+        keys = rows.astype(np.int64) * shape[1] + indices
+        self._slots = np.argsort(keys, kind='stable')
+        self._keys = keys[self._slots]
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def locate(self, rows, cols):
+        """Return the position in *data* of every entry, or -1 if it is not
+        stored.
+
+        :param rows: the row indices
+        :param cols: the column indices
+        :rtype: :class:`ndarray`
+        """
+        keys = np.asarray(rows, dtype=np.int64) * self.shape[1] + cols
+        found = np.minimum(np.searchsorted(self._keys, keys),
+                           len(self._keys) - 1)
+        return np.where(self._keys[found] == keys, self._slots[found], -1)
+
+    def _broadcast(self, key):
+        if not isinstance(key, tuple):
+            rows = np.asarray(key)[..., None]
+            return np.broadcast_arrays(rows, np.arange(self.shape[1]))
+        return np.broadcast_arrays(*(np.asarray(k) for k in key))
 
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            return self.rows(key)
+        if np.ndim(key[0]) == 0 and np.ndim(key[1]) == 1:
+            return self.row(*key)
+        rows, cols = self._broadcast(key)
+        slots = self.locate(rows, cols)
+        found = slots >= 0
+        values = np.empty(rows.shape, dtype=self.dtype)
+        values[found] = self.data[slots[found]]
+        if not found.all():
+            missing = ~found
+            if callable(self.default):
+                values[missing] = self.default(rows[missing], cols[missing])
+            else:
+                values[missing] = self.default
+        return values[()]
+
+    def row(self, row, cols):
+        """Return the entries of a single *row* in the columns *cols*.
+
+        Only the few stored entries of the row are searched, which is much
+        cheaper than locating every entry.
+
+        :param int row: the row index
+        :param cols: the column indices
+        :rtype: :class:`ndarray`
+        """
+        cols = np.asarray(cols)
+        if callable(self.default):
+            values = np.asarray(self.default(np.full(cols.shape, row), cols),
+                                dtype=self.dtype)
+        else:
+            values = np.full(cols.shape, self.default, dtype=self.dtype)
+        lo, hi = self.indptr[row], self.indptr[row + 1]
+        stored = self.indices[lo:hi]
+        order = np.argsort(stored)
+        found = np.minimum(np.searchsorted(stored[order], cols), hi - lo - 1)
+        if hi > lo:
+            hit = stored[order][found] == cols
+            values[hit] = self.data[lo:hi][order][found[hit]]
+        return values
+
+    def rows(self, rows):
+        """Return complete rows of the matrix.
+
+        Rather than looking up every entry, the rows are filled with the
+        default and the few stored entries of each row are scattered over
+        them.
+
+        :param rows: the row index or indices
+        :return: the rows, with the shape of *rows* plus the column count
+        :rtype: :class:`ndarray`
+        """
+        rows = np.asarray(rows)
+        flat = rows.reshape(-1)
+        cols = np.arange(self.shape[1])
+        if callable(self.default):
+            values = self.default(flat[:, None], cols).astype(self.dtype)
+        else:
+            values = np.full((len(flat), self.shape[1]), self.default,
+                             dtype=self.dtype)
+        for i, row in enumerate(flat):
+            lo, hi = self.indptr[row], self.indptr[row + 1]
+            values[i, self.indices[lo:hi]] = self.data[lo:hi]
+        return values.reshape(rows.shape + (self.shape[1],))
+
+    def __setitem__(self, key, value):
+        rows, cols = self._broadcast(key)
+        slots = self.locate(rows, cols)
+        found = slots >= 0
+        self.data[slots[found]] = np.broadcast_to(value, rows.shape)[found]
+
+    def __imul__(self, factor):
+        """Scale every entry by *factor*, including those that are not
+        stored.
+
+        A constant default is scaled along with the stored entries, and a
+        callable default is replaced by one that scales its results.
+        """
+        self.data *= factor
+        if callable(self.default):
+            self.default = _Scaled.of(self.default, factor)
+        else:
+            self.default *= factor
+        return self
+
+    def fill(self, value):
+        """Set every stored entry and the default to *value*."""
+        self.data.fill(value)
+        self.default = value
+
+    def copy(self):
+        """Return a copy that shares the sparsity structure."""
+        matrix = self.__class__.__new__(self.__class__)
+        matrix.__dict__.update(self.__dict__)
+        matrix.data = self.data.copy()
         return matrix
 
-    def print_pheromone_matrix(self):
-        print(pd.DataFrame(self.get_pheromone_matrix()))
+    def toarray(self):
+        """Return the matrix as a dense :class:`numpy.ndarray`."""
+        return self[np.arange(self.shape[0])]
+
+
+class _Scaled:
+    """The default of a :class:`SparseMatrix` scaled by a constant factor."""
+    def __init__(self, function, factor):
+        self.function = function
+        self.factor = factor
+
+    @classmethod
+    def of(cls, function, factor):
+        if isinstance(function, cls):
+            return cls(function.function, function.factor * factor)
+        return cls(function, factor)
+
+    def __call__(self, rows, cols):
+        return self.factor * np.asarray(self.function(rows, cols))
+
+
+class EdgeView:
+    """Mapping of node ID pairs to :class:`Edge` views of a :class:`World`.
+
+    Indexing with a pair of node IDs returns a new :class:`Edge` bound to the
+    matrices of the world, or ``None`` if both IDs refer to the same node.
+    Iterating yields the edges between all pairs of distinct nodes.
+
+    :param World world: the world whose edges are viewed
+    """
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, key):
+        idx, idy = key
+        if idx == idy:
+            return None
+        world = self.world
+        return Edge(world._nodes[idx], world._nodes[idy],
+                    lfunc=world.lfunc, world=world, index=(idx, idy))
+
+    def __iter__(self):
+        n = len(self.world._nodes)
+        for idx in range(n):
+            for idy in range(n):
+                if idx != idy:
+                    yield self[idx, idy]
 
-    def plot_nodes(self):
-        points = [pos.position for pos in self._nodes]
-        plt.plot(*zip(*points), marker='o', color='r', ls='')
-        plt.show()
+    def __len__(self):
+        n = len(self.world._nodes)
+        return n * n - n
 
 
 class Edge:
@@ -192,32 +1070,66 @@ class Edge:
     and *pheromone* properties. *length* represents the static, *a priori*
     information, whereas *pheromone* level represents the dynamic, *a
     posteriori* information.
+
+    An :class:`Edge` created with a *world* and an *index* is a view: its
+    *length* and *pheromone* are read from (and written to) the matrices of
+    that world. Otherwise it stands on its own, and its *length* is obtained
+    from *lfunc*.
     
     :param node start: the node at the start of the :class:`Edge`
     :param node end: the node at the end of the :class:`Edge`
-    :param float length: the length of the :class:`Edge` (default=1)
+    :param callable lfunc: the length function of the :class:`Edge`
     :param float pheromone: the amount of pheromone on the :class:`Edge` 
                             (default=0.1)
+    :param World world: the world viewed by the :class:`Edge` (default is
+                        None)
+    :param tuple index: the node IDs of *start* and *end* in *world*
+                        (default is None)
     """
-    # def __init__(self, start, end, length=None, pheromone=None):
-    def __init__(self, start, end, lfunc, pheromone=None):
+    __slots__ = ('start', 'end', 'lfunc', 'world', 'index', '_pheromone')
+
+    def __init__(self, start, end, lfunc=None, pheromone=None, world=None,
+                 index=None):
         self.start = start
         self.end = end
         self.lfunc = lfunc
-        # self.length = 1 if length is None else length
-        self.pheromone = 0.1 if pheromone is None else pheromone
+        self.world = world
+        self.index = index
+        if world is None:
+            self._pheromone = 0.1 if pheromone is None else pheromone
+        elif pheromone is not None:
+            self.pheromone = pheromone
 
     def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
-        return False
+        if not isinstance(other, self.__class__):
+            return False
+        if self.world is not None or other.world is not None:
+            return self.world is other.world and self.index == other.index
+        return (self.start == other.start and self.end == other.end and
+                self.lfunc == other.lfunc and
+                self._pheromone == other._pheromone)
+
+    @property
+    def pheromone(self):
+        if self.world is None:
+            return self._pheromone
+        return self.world.pheromone[self.index]
+
+    @pheromone.setter
+    def pheromone(self, value):
+        if self.world is None:
+            self._pheromone = value
+        else:
+            self.world.pheromone[self.index] = value
 
     @property
     def length(self):
-        return self.lfunc(self.start.position, self.end.position)
+        if self.world is None:
+            return self.lfunc(self.start.position, self.end.position)
+        return self.world.distances[self.index]
 
     def __len__(self):
-        return self.lfunc(self.start.position, self.end.position)
+        return self.length
 
     def weight(self, **kwargs):
         """Calculate the weight of the edge, given alpha and beta.
@@ -247,21 +1159,31 @@ class Edge:
 
 class Node:
     """This class represents nodes.
+
+    Two nodes are equal if they have the same ``uid``, *position*, name and
+    description.
     """
-    uid = 0
+    __slots__ = ('uid', '_position', 'name', 'description')
+    counter = 0
 
     def __init__(self, position, **kwargs):
-        self.uid = self.__class__.uid
-        self.__class__.uid += 1
+        self.uid = Node.counter
+        Node.counter += 1
         self._position = position
         self.name = kwargs.get('name', 'node{}'.format(self.uid))
         self.description = kwargs.get('description', None)
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return (self.uid == other.uid and
+                    self._position == other._position and
+                    self.name == other.name and
+                    self.description == other.description)
         return False
 
+    def __hash__(self):
+        return hash(self.uid)
+
     @property
     def position(self):
         return self._position.position
@@ -270,15 +1192,55 @@ class Node:
 class Position:
     """This class represents the position of a node.
     """
+    __slots__ = ('_x', '_y')
+
     def __init__(self, x, y):
         self._x = x
         self._y = y
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._x == other._x and self._y == other._y
         return False
 
+    def __hash__(self):
+        return hash((self._x, self._y))
+
     @property
     def position(self):
         return self._x, self._y
+
+
+class NodeList:
+    """The read-only sequence of the :class:`Node`\s of a :class:`World`
+    created from an array of coordinates.
+
+    Every :class:`Node` is created the first time it is asked for, and the
+    same one is returned after that.
+
+    :param coords: the (nodes x 2) coordinates of the nodes
+    """
+    def __init__(self, coords):
+        self.coords = coords
+        self.created = {}
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = operator.index(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('node ID out of range')
+        node = self.created.get(idx)
+        if node is None:
+            node = self.created[idx] = Node(Position(*self.coords[idx]
+                                                     .tolist()))
+        return node
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
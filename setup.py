@@ -10,7 +10,8 @@ setup(
     version="0.5.2",
     author="Robert Grant",
     author_email="rhgrant10@gmail.com",
-    packages=["pants", "pants.test"],
+    packages=["pants", "pants.datasets", "pants.test"],
+    package_data={"pants.datasets": ["*.csv", "*.tour"]},
     scripts=["bin/pants-demo"],
     url="http://pypi.python.org/pypi/ACO-Pants",
     license="LICENSE.txt",